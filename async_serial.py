@@ -0,0 +1,354 @@
+import os
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+
+try:
+    import termios
+except ImportError:
+    termios = None  # not available on Windows; the threaded backend is used there
+
+import config
+from serial_comm import SerialComm
+from capture_process import CaptureComm
+from tx_writer import TxWriter, TxRequest
+from reconnect import Backoff, DeviceWatcher, claim_port, release_port
+
+def open_port(path, baud):
+    """Open a tty (or pty slave) non-blocking, raw 8N1 at `baud`; returns the fd"""
+    speed = getattr(termios, f"B{baud}", None)
+    if speed is None:
+        raise ValueError(f"Unsupported baud rate {baud}")
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        iflag, oflag, cflag, lflag, _, _, cc = termios.tcgetattr(fd)
+        iflag &= ~(termios.IGNBRK | termios.BRKINT | termios.PARMRK | termios.ISTRIP |
+                   termios.INLCR | termios.IGNCR | termios.ICRNL | termios.IXON | termios.IXOFF)
+        oflag &= ~termios.OPOST
+        lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG | termios.IEXTEN)
+        cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB)
+        cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+        cc[termios.VMIN] = 0
+        cc[termios.VTIME] = 0
+        termios.tcsetattr(fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, speed, speed, cc])
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+class AsyncIOLoop:
+    """
+    One asyncio event loop on one daemon thread, shared by every
+    AsyncSerialComm. Work for Tk is put on a single queue; the GUI
+    drains it with drain_ui() from an after() timer.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.ui_queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call(self, callback, *args):
+        """Run callback(*args) on the loop thread (from any thread)"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def ui(self, callback):
+        """Queue callback() for the Tk thread"""
+        self.ui_queue.put(callback)
+
+    def drain_ui(self, limit=config.ASYNC_UI_BATCH):
+        """Run up to `limit` queued UI callbacks; call from the Tk thread"""
+        for _ in range(limit):
+            try:
+                callback = self.ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback()
+            except Exception as e:
+                print(f"Async UI callback error: {e}")
+
+
+_shared_loop = None
+_shared_lock = threading.Lock()
+
+
+def shared_loop():
+    """The process-wide AsyncIOLoop, started on first use"""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            _shared_loop = AsyncIOLoop()
+        return _shared_loop
+
+
+def create_serial_comm(*args):
+    """SerialComm for config.SERIAL_BACKEND ('thread', 'asyncio' or 'process')"""
+    if config.SERIAL_BACKEND == "asyncio" and termios is not None:
+        return AsyncSerialComm(*args)
+    if config.SERIAL_BACKEND == "process":
+        return CaptureComm(*args)
+    return SerialComm(*args)
+
+
+class FdPort:
+    """Stands in for serial.Serial where callers only check `is_open`"""
+
+    def __init__(self, path, fd):
+        self.port = path
+        self.fd = fd
+        self.is_open = True
+
+
+class AsyncTxWriter(TxWriter):
+    """
+    TxWriter whose queue is drained by a task on the shared loop instead
+    of a thread. send() stays callable from any thread; writes wait for
+    the fd to become writable and fail after config.TX_WRITE_TIMEOUT.
+    """
+
+    def __init__(self, io_loop, queue_size=config.TX_QUEUE_SIZE):
+        super().__init__(queue_size=queue_size)
+        self.io = io_loop
+        self.queue_size = queue_size
+        self.requests = deque()
+        self.wakeup = None
+
+    def send(self, data, label=None, callback=None):
+        if len(self.requests) >= self.queue_size:
+            self.dropped += 1
+            return False
+        self.requests.append(TxRequest(data, label, callback))
+        self.io.call(self._wake)
+        return True
+
+    @property
+    def pending(self):
+        return len(self.requests)
+
+    def cancel_pending(self, error="cancelled"):
+        while self.requests:
+            self._complete(self.requests.popleft(), error)
+
+    def _wake(self):
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def run(self, fd):
+        """Writer task for `fd`; cancelled when the port is detached"""
+        self.wakeup = asyncio.Event()
+        while True:
+            if not self.requests:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            request = self.requests.popleft()
+            delay = self.next_write - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await asyncio.wait_for(self._write_fd(fd, request.data), config.TX_WRITE_TIMEOUT)
+                request.written_at = time.perf_counter()
+                self._count(len(request.data))
+                error = None
+            except asyncio.TimeoutError:
+                self.errors += 1
+                error = "write timeout"
+            except OSError as e:
+                self.errors += 1
+                error = str(e) or e.__class__.__name__
+            self.next_write = time.monotonic() + self.inter_command_delay
+            self._complete(request, error)
+
+    async def _write_fd(self, fd, data):
+        view = memoryview(data)
+        step = 1 if self.inter_byte_delay > 0 else len(view)
+        while view:
+            try:
+                written = os.write(fd, view[:step])
+            except BlockingIOError:
+                await self._writable(fd)
+                continue
+            view = view[written:]
+            if view and self.inter_byte_delay > 0:
+                await asyncio.sleep(self.inter_byte_delay)
+
+    async def _writable(self, fd):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        loop.add_writer(fd, lambda: future.done() or future.set_result(None))
+        try:
+            await future
+        finally:
+            loop.remove_writer(fd)
+
+
+class AsyncSerialComm(SerialComm):
+    """
+    SerialComm backend driven by the shared asyncio loop: ports are
+    non-blocking fds watched with add_reader, and the TX queue and
+    reconnect attempts are tasks, so no thread is started per port.
+    Received bytes go through the same decoding and callbacks as the
+    threaded backend (on the loop thread). POSIX only; works on pty
+    pairs (os.openpty() + os.ttyname()) as well as real ttys.
+    """
+
+    def __init__(self, port_combo, baud_combo, connect_button, terminal, port_map, get_button_style,
+                 io_loop=None):
+        super().__init__(port_combo, baud_combo, connect_button, terminal, port_map, get_button_style)
+        self.io = io_loop or shared_loop()
+        self.tx_writer = AsyncTxWriter(self.io)
+        self.tx_task = None
+        self.reconnect_task = None
+        self.closing = False
+
+    def _ui(self, callback):
+        self.io.ui(callback)
+
+    def _set_connected(self, connected):
+        if connected:
+            self._ui(lambda: self.connect_button.configure(
+                text="Disconnect",
+                fg_color=self.get_button_style("red")[0]
+            ))
+        else:
+            self._ui(lambda: self.connect_button.configure(
+                text="Connect",
+                fg_color=self.get_button_style("green")[0]
+            ))
+
+    def connect(self, port, baud):
+        if not port:
+            self._ui(lambda: self.terminal.append("⚠ No port selected.\n"))
+            return False
+        self.last_port = port
+        self.last_baud = baud
+        self.closing = False
+        self.reconnect_cancel.clear()
+        self.watcher = DeviceWatcher(port)
+        try:
+            fd = open_port(port, baud)
+        except (OSError, termios.error, ValueError) as e:
+            self._ui(lambda: self.terminal.append(f"❌ Failed to connect to {port} ({e}). Retrying...\n"))
+            self.start_reconnect_thread()
+            return False
+        self.serial_port = FdPort(port, fd)
+        self.running = True
+        claim_port(port)
+        self.io.call(self._attach, self.serial_port)
+        self._set_connected(True)
+        self._ui(lambda: self.terminal.append(f"✅ Connected to {port} @ {baud} baud\n"))
+        return True
+
+    def disconnect(self):
+        self.closing = True
+        self.running = False
+        self.reconnect_cancel.set()
+        port, self.serial_port = self.serial_port, None
+        if port is not None:
+            release_port(port.port)
+        self.io.call(self._close, port)
+        self._set_connected(False)
+        self._ui(lambda: self.terminal.append("🔌 Disconnected.\n"))
+
+    def start_reconnect_thread(self):
+        """Reconnect with a task on the loop instead of a thread"""
+        self.io.call(self._start_reconnect)
+
+    # ── loop thread ──────────────────────────────────────────────────────────
+
+    def _attach(self, port):
+        if not port.is_open:
+            return  # disconnected before the loop picked it up
+        self.io.loop.add_reader(port.fd, self._on_readable, port)
+        self.tx_task = self.io.loop.create_task(self.tx_writer.run(port.fd))
+        if self.watcher.identity is None:
+            self.io.loop.run_in_executor(None, self.watcher.identify)
+
+    def _detach(self, port):
+        if port is None or not port.is_open:
+            return
+        port.is_open = False
+        self.io.loop.remove_reader(port.fd)
+        if self.tx_task:
+            self.tx_task.cancel()
+            self.tx_task = None
+        self.io.loop.remove_writer(port.fd)
+        try:
+            os.close(port.fd)
+        except OSError:
+            pass
+        self.tx_writer.cancel_pending("port closed")
+
+    def _close(self, port):
+        if self.reconnect_task:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
+        self._detach(port)
+
+    def _on_readable(self, port):
+        chunks = []
+        lost = False
+        try:
+            while True:
+                chunk = os.read(port.fd, config.ASYNC_READ_SIZE)
+                if not chunk:
+                    lost = True  # hangup
+                    break
+                chunks.append(chunk)
+                if len(chunk) < config.ASYNC_READ_SIZE:
+                    break
+        except BlockingIOError:
+            pass
+        except OSError:
+            lost = True
+        if chunks:
+            self._process_chunk(b"".join(chunks))
+        if lost and not self.closing:
+            release_port(port.port)
+            self._detach(port)
+            self.running = False
+            self.serial_port = None
+            self._set_connected(False)
+            self._ui(lambda: self.terminal.append("⚠ Device disconnected. Reconnecting...\n"))
+            self._start_reconnect()
+
+    def _start_reconnect(self):
+        if self.closing or (self.reconnect_task and not self.reconnect_task.done()):
+            return
+        self.reconnect_task = self.io.loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        """Reopen with backoff; locating the device and waiting for arrivals run in the executor"""
+        loop = asyncio.get_running_loop()
+        backoff = Backoff()
+        while not self.closing:
+            name = await loop.run_in_executor(None, self.watcher.locate)
+            if name is not None:
+                try:
+                    fd = open_port(name, self.last_baud)
+                except (OSError, termios.error, ValueError):
+                    fd = None
+                if fd is not None:
+                    if self.closing:
+                        os.close(fd)
+                        return
+                    previous, self.last_port = self.last_port, name
+                    self.watcher.port = name
+                    self.serial_port = FdPort(name, fd)
+                    self.running = True
+                    claim_port(name)
+                    self._attach(self.serial_port)
+                    self._set_connected(True)
+                    moved = f" (was {previous})" if name != previous else ""
+                    self._ui(lambda: self.terminal.append(f"✅ Reconnected to {name}{moved}\n"))
+                    return
+            await loop.run_in_executor(None, self.watcher.wait, backoff.next(), self.reconnect_cancel)
@@ -0,0 +1,359 @@
+import time
+import struct
+import threading
+import multiprocessing
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import serial
+
+import config
+from serial_comm import SerialComm
+from reconnect import DeviceWatcher, reopen, claim_port, release_port, open_ports
+
+# Control words (uint64) in front of the data area
+HEAD, TAIL, CAPACITY, STATE, STALLS, RECORDS, CAPTURED = range(7)
+CONTROL_SIZE = 8 * 8
+
+RECORD = struct.Struct("<dI4x")  # capture time (epoch seconds), payload length
+WRAP = 0xFFFFFFFF                # length marking unused space before the end of the ring
+
+# Capture process states (control word STATE)
+STARTING, OPEN, FAILED, LOST, STOPPED = range(5)
+STATE_NAMES = ("starting", "open", "failed", "lost", "stopped")
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+class SharedRing:
+    """
+    Single-producer / single-consumer record ring in shared memory. The
+    producer only writes HEAD and the consumer only writes TAIL (both
+    ever-increasing byte positions), so neither side takes a lock; the
+    producer publishes HEAD after the record is complete. Records are
+    never split across the end of the ring, so every payload can be
+    handed out as one memoryview without copying. A full ring makes the
+    producer wait (and counts a stall) instead of overwriting.
+    """
+
+    def __init__(self, name=None, capacity=config.CAPTURE_RING_SIZE):
+        if name is None:
+            capacity -= capacity % 8
+            self.shm = shared_memory.SharedMemory(create=True, size=CONTROL_SIZE + capacity)
+            self.owner = True
+        else:
+            # Spawned children share the parent's resource tracker, so attaching
+            # does not add a second owner; only the creator unlinks
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.control = self.shm.buf[:CONTROL_SIZE].cast('Q')
+        if self.owner:
+            for i in range(len(self.control)):
+                self.control[i] = 0
+            self.control[CAPACITY] = capacity
+        self.capacity = self.control[CAPACITY]
+        self.data = self.shm.buf[CONTROL_SIZE:CONTROL_SIZE + self.capacity]
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def used(self):
+        return self.control[HEAD] - self.control[TAIL]
+
+    def write(self, payload, timestamp, stop=None):
+        """Producer: append one record; waits while the ring is full, returns False if `stop` is set"""
+        size = len(payload)
+        need = _aligned(RECORD.size + size)
+        if need > self.capacity // 2:
+            raise ValueError(f"Record of {size} bytes does not fit the ring")
+        head = self.control[HEAD]
+        pos = head % self.capacity
+        skip = self.capacity - pos if self.capacity - pos < need else 0
+        if self.capacity - (head - self.control[TAIL]) < skip + need:
+            self.control[STALLS] += 1
+            while self.capacity - (head - self.control[TAIL]) < skip + need:
+                if stop is not None and stop.is_set():
+                    return False
+                time.sleep(config.CAPTURE_POLL_INTERVAL)
+        if skip:
+            if skip >= RECORD.size:
+                RECORD.pack_into(self.data, pos, timestamp, WRAP)
+            head += skip
+            pos = 0
+        RECORD.pack_into(self.data, pos, timestamp, size)
+        self.data[pos + RECORD.size:pos + RECORD.size + size] = payload
+        self.control[RECORDS] += 1
+        self.control[CAPTURED] += size
+        self.control[HEAD] = head + need
+        return True
+
+    def read(self, limit=config.CAPTURE_BATCH):
+        """
+        Consumer: up to `limit` (timestamp, memoryview) records and the
+        position after them. The views point into the ring and are only
+        valid until release(position).
+        """
+        capacity = self.capacity
+        tail = self.control[TAIL]
+        head = self.control[HEAD]
+        records = []
+        while tail < head and len(records) < limit:
+            pos = tail % capacity
+            if capacity - pos < RECORD.size:
+                tail += capacity - pos
+                continue
+            timestamp, size = RECORD.unpack_from(self.data, pos)
+            if size == WRAP:
+                tail += capacity - pos
+                continue
+            start = pos + RECORD.size
+            records.append((timestamp, self.data[start:start + size]))
+            tail += _aligned(RECORD.size + size)
+        return records, tail
+
+    def release(self, position):
+        """Consumer: hand the space up to `position` back to the producer"""
+        self.control[TAIL] = position
+
+    def close(self):
+        if self.owner:
+            self.shm.unlink()
+        self.data.release()
+        self.control.release()
+        self.shm.close()
+
+
+def _tx_loop(current, tx_queue):
+    """Capture process: write queued messages to the currently open port"""
+    while True:
+        data = tx_queue.get()
+        if data is None:
+            return
+        port = current[0]
+        if port is None:
+            continue
+        try:
+            port.write(data)
+            port.flush()
+        except (serial.SerialException, OSError) as e:
+            print(f"Capture TX error: {e}")
+
+
+def capture_main(ring_name, port, baud, tx_queue, stop, taken=()):
+    """
+    Capture process entry point: read `port` into the ring until `stop`
+    is set, reopening it with backoff (and following the device to a new
+    name, other than the `taken` ports open in the GUI process) when it
+    is lost.
+    """
+    for name in taken:
+        claim_port(name)
+    ring = SharedRing(ring_name)
+    current = [None]
+    writer = threading.Thread(target=_tx_loop, args=(current, tx_queue), daemon=True)
+    writer.start()
+    watcher = DeviceWatcher(port)
+
+    def open_port(name):
+        return serial.Serial(name, baud, timeout=0.1, write_timeout=config.TX_WRITE_TIMEOUT)
+
+    try:
+        while not stop.is_set():
+            try:
+                serial_port = open_port(watcher.port)
+            except serial.SerialException:
+                if ring.control[STATE] != LOST:
+                    ring.control[STATE] = FAILED
+                result = reopen(watcher, open_port, stop)
+                if result is None:
+                    break
+                serial_port = result[0]
+            if watcher.identity is None:
+                watcher.identify()
+            current[0] = serial_port
+            ring.control[STATE] = OPEN
+            try:
+                while not stop.is_set():
+                    raw = serial_port.read(1)
+                    if not raw:
+                        continue
+                    waiting = serial_port.in_waiting
+                    if waiting:
+                        raw += serial_port.read(min(waiting, config.CAPTURE_CHUNK_SIZE - 1))
+                    if not ring.write(raw, time.time(), stop):
+                        break
+            except (serial.SerialException, OSError):
+                ring.control[STATE] = LOST
+            finally:
+                current[0] = None
+                serial_port.close()
+    finally:
+        ring.control[STATE] = STOPPED
+        ring.close()
+
+
+class ProcessPort:
+    """serial.Serial stand-in for the TxWriter: writes are forwarded to the capture process"""
+
+    def __init__(self, port, tx_queue):
+        self.port = port
+        self.tx_queue = tx_queue
+        self.is_open = True
+
+    def write(self, data):
+        if not self.is_open:
+            raise serial.SerialException("port is not open")
+        self.tx_queue.put(bytes(data))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class CaptureComm(SerialComm):
+    """
+    SerialComm backend that reads the port in a separate process, so the
+    GIL-bound GUI (plotting, Tk) can never delay reads. The capture
+    process writes timestamped chunks into a SharedRing; a drain thread
+    here decodes them straight from shared memory and passes the
+    capture timestamps on to the line and frame callbacks. The capture
+    process also reopens the port after a loss; sends go through the
+    usual TxWriter to a queue the capture process writes from.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.ring = None
+        self.process = None
+        self.tx_queue = None
+        self.stop_event = None
+        self.capturing = False
+
+    def connect(self, port, baud):
+        if not port:
+            self._ui(lambda: self.terminal.append("⚠ No port selected.\n"))
+            return False
+        if self.process is not None:
+            self._stop_capture()
+        self.last_port = port
+        self.last_baud = baud
+
+        context = multiprocessing.get_context("spawn")
+        self.ring = SharedRing()
+        self.tx_queue = context.Queue()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=capture_main, name=f"capture {port}", daemon=True,
+                                       args=(self.ring.name, port, baud, self.tx_queue, self.stop_event,
+                                             sorted(open_ports())))
+        self.process.start()
+        claim_port(port)
+
+        self.serial_port = ProcessPort(port, self.tx_queue)
+        self.capturing = True
+        self.tx_writer.attach(self.serial_port)
+        self.tx_writer.start()
+        self.serial_thread = threading.Thread(target=self.drain_ring, daemon=True)
+        self.serial_thread.start()
+
+        deadline = time.monotonic() + config.CAPTURE_START_TIMEOUT
+        while self.ring.control[STATE] == STARTING and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if self.ring.control[STATE] != OPEN:
+            # The capture process keeps retrying; drain_ring reports when it opens
+            self._ui(lambda: self.terminal.append(f"❌ Failed to connect to {port}. Retrying...\n"))
+            return False
+        self.running = True
+        self._ui(lambda: self.connect_button.configure(
+            text="Disconnect",
+            fg_color=self.get_button_style("red")[0]
+        ))
+        self._ui(lambda: self.terminal.append(f"✅ Connected to {port} @ {baud} baud (capture process)\n"))
+        return True
+
+    def disconnect(self):
+        self._stop_capture()
+        self._ui(lambda: self.connect_button.configure(
+            text="Connect",
+            fg_color=self.get_button_style("green")[0]
+        ))
+        self._ui(lambda: self.terminal.append("🔌 Disconnected.\n"))
+
+    def _stop_capture(self):
+        self.running = False
+        self.capturing = False
+        self.tx_writer.attach(None)
+        self.tx_writer.stop()
+        if self.serial_port:
+            self.serial_port.close()
+            self.serial_port = None
+        if self.process is not None:
+            release_port(self.last_port)
+            self.stop_event.set()
+            self.tx_queue.put(None)
+            self.process.join(2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.serial_thread is not None:
+            self.serial_thread.join(1.0)  # it holds views into the ring
+            self.serial_thread = None
+        if self.ring is not None:
+            try:
+                self.ring.close()
+            except BufferError:
+                pass  # a callback still holds a view; the mapping goes with it
+            self.ring = None
+
+    def start_reconnect_thread(self):
+        pass  # the capture process reopens the port itself
+
+    def drain_ring(self):
+        """Drain thread: decode records straight from the ring and report capture state changes"""
+        ring = self.ring
+        state = ring.control[STATE]
+        while self.capturing:
+            records, position = ring.read()
+            if records:
+                for timestamp, view in records:
+                    self._process_chunk(view, datetime.fromtimestamp(timestamp))
+                records = view = None  # drop the views before the space is reused
+                ring.release(position)
+            else:
+                time.sleep(config.CAPTURE_POLL_INTERVAL)
+            if ring.control[STATE] != state:
+                previous, state = state, ring.control[STATE]
+                self._report_state(previous, state)
+
+    def _report_state(self, previous, state):
+        self.running = state == OPEN
+        if state == LOST:
+            self._ui(lambda: self.terminal.append("⚠ Device disconnected. Reconnecting...\n"))
+            self._ui(lambda: self.connect_button.configure(
+                text="Connect",
+                fg_color=self.get_button_style("green")[0]
+            ))
+        elif state == OPEN and previous in (FAILED, LOST):
+            self._ui(lambda: self.connect_button.configure(
+                text="Disconnect",
+                fg_color=self.get_button_style("red")[0]
+            ))
+            self._ui(lambda: self.terminal.append(f"✅ Reconnected to {self.last_port}\n"))
+
+    def get_statistics(self):
+        ring = self.ring
+        if ring is None:
+            return None
+        return {
+            'state': STATE_NAMES[ring.control[STATE]],
+            'captured_bytes': ring.control[CAPTURED],
+            'records': ring.control[RECORDS],
+            'ring_used': ring.used,
+            'ring_capacity': ring.capacity,
+            'stalls': ring.control[STALLS]
+        }
@@ -75,4 +75,132 @@ def get_commands_xml_path():
     return xml_path
 
 # Used by CommandManager and GUI everywhere
-COMMANDS_XML = get_commands_xml_path()
\ No newline at end of file
+COMMANDS_XML = get_commands_xml_path()
+
+# ─── SESSION RECORDING ──────────────────────────────────────────────────────
+RECORD_SEGMENT_BYTES   = 16 * 1024 * 1024     # rotate after this many bytes
+RECORD_SEGMENT_SECONDS = 60 * 60              # ...or after this many seconds
+RECORD_COMPRESS        = True                 # gzip closed segments
+RECORD_MAX_TOTAL_BYTES = 1024 * 1024 * 1024   # oldest segments are deleted past this
+RECORD_FLUSH_INTERVAL  = 0.5                  # seconds between batched writes
+RECORD_ON_STARTUP      = True                 # start recording when the app opens
+
+def get_recordings_path():
+    """
+    Returns the folder continuous recordings are written to:
+      C:\\ProgramData\\SerialMonitor\\recordings
+    Creates it if needed.
+    """
+    folder = os.path.join(get_shared_data_path(), "recordings")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+# ─── SESSION DATABASE ───────────────────────────────────────────────────────
+SESSION_DB_BATCH_SIZE     = 5000   # rows per transaction before an early flush
+SESSION_DB_FLUSH_INTERVAL = 0.25   # seconds between batched transactions
+
+def get_session_db_path():
+    """Returns the path of the SQLite session database in ProgramData."""
+    return os.path.join(get_shared_data_path(), "session.db")
+
+
+# ─── MEMORY BUDGETS ─────────────────────────────────────────────────────────
+# Buffers are bounded by bytes (and optionally age), not by entry counts
+RAW_BUFFER_BUDGET    = 64 * 1024 * 1024   # DataProcessor raw lines
+SAMPLE_BUFFER_BUDGET = 64 * 1024 * 1024   # DataProcessor structured samples
+TERMINAL_BUDGET      = 8 * 1024 * 1024    # text kept in the terminal widget
+PLOT_BUDGET          = 16 * 1024 * 1024   # points kept by the plot widget
+BUFFER_MAX_AGE       = None               # seconds; None = evict by bytes only
+PLOT_MAX_AGE         = 3600               # the largest plot time window
+
+
+# ─── COMPRESSED HISTORY ─────────────────────────────────────────────────────
+HISTORY_BLOCK_LINES  = 4096               # lines per compressed block
+HISTORY_CACHE_BLOCKS = 8                  # decompressed blocks kept hot
+HISTORY_BUDGET       = 64 * 1024 * 1024   # compressed bytes kept in memory
+
+# ─── SEARCH INDEX ───────────────────────────────────────────────────────────
+SEARCH_INDEX_BUDGET   = 32 * 1024 * 1024  # bytes of postings kept in memory
+SEARCH_INDEX_INTERVAL = 0.5               # seconds between index catch-ups
+SEARCH_MAX_HITS       = 100000            # hits kept for next/previous navigation
+
+# ─── EXTRACTION RULES ───────────────────────────────────────────────────────
+def get_extraction_rules_path():
+    """Returns the path of extraction_rules.xml, next to commands.xml"""
+    return os.path.join(get_shared_data_path(), "extraction_rules.xml")
+
+EXTRACTION_RULES_XML = get_extraction_rules_path()
+
+# ─── TELEMETRY PARSERS ──────────────────────────────────────────────────────
+TELEMETRY_PARSERS   = ["json", "kv", "csv"]  # built-in line parsers to enable, tried in order
+TELEMETRY_DATA_TYPE = "DATA"                 # type assigned to parsed channels
+
+# ─── BINARY FRAMES ──────────────────────────────────────────────────────────
+# "<sync hex> <length B|H> <crc>: <schema or struct format>" (see binary_decoder)
+BINARY_FRAME_LAYOUT = "AA55 B crc16: uint32 t_us, int16 ax, int16 ay, int16 az, float32 temp"
+BINARY_DATA_TYPE    = "PLOT"     # type assigned to decoded channels
+BINARY_SUMMARY_INTERVAL = 500    # ms between hex summary lines in the terminal
+
+# ─── HEX VIEW ───────────────────────────────────────────────────────────────
+BYTE_HISTORY_BUDGET  = 16 * 1024 * 1024   # raw received bytes kept for the views
+HEX_BYTES_PER_ROW    = 16                 # default bytes per hex dump row
+HEX_VIEW_BACKLOG     = 256 * 1024         # bytes re-rendered when switching views
+HEX_VIEW_INTERVAL    = 0.05               # seconds between terminal inserts
+HEX_VIEW_FLUSH_DELAY = 0.2                # idle seconds before a partial row is shown
+
+# ─── TX WRITER ──────────────────────────────────────────────────────────────
+TX_QUEUE_SIZE          = 256    # messages waiting for the writer thread
+TX_INTER_BYTE_DELAY    = 0.0    # seconds between bytes (0 = write whole messages)
+TX_INTER_COMMAND_DELAY = 0.0    # minimum seconds between messages
+TX_WRITE_TIMEOUT       = 2.0    # seconds before a blocked write fails
+
+# ─── REPEAT SCHEDULER ───────────────────────────────────────────────────────
+REPEAT_MIN_INTERVAL   = 0.001    # seconds; shortest repeat interval accepted
+REPEAT_SPIN_THRESHOLD = 0.002    # seconds before a deadline spent spinning, not sleeping
+REPEAT_JITTER_SAMPLES = 10000    # recent deviations kept per job for statistics
+REPEAT_ECHO_MIN_INTERVAL = 0.1   # seconds; faster repeats are not echoed to the terminal
+
+# ─── LATENCY MEASUREMENT ────────────────────────────────────────────────────
+LATENCY_TIMEOUT     = 2.0       # seconds without a reply before a command counts as timed out
+LATENCY_RAW_SAMPLES = 100000    # raw latencies kept per command for export
+LATENCY_EXPIRE_INTERVAL = 0.25  # seconds between timeout checks while measuring
+
+# ─── COMMAND SEQUENCES ──────────────────────────────────────────────────────
+SEQUENCE_EXPECT_TIMEOUT = 1.0     # seconds an expect step waits by default
+SEQUENCE_TERMINATOR     = "\r\n"  # appended to `send` steps
+
+# ─── PIPELINED POLLING ──────────────────────────────────────────────────────
+REQUEST_WINDOW           = 8            # requests in flight at once
+REQUEST_TIMEOUT          = 1.0          # seconds before a request counts as lost
+REQUEST_TAG_PATTERN      = r'#(\d+)'    # extracts the tag from a reply in tag mode
+REQUEST_DATA_TYPE        = "DATA"       # type assigned to polled channels
+REQUEST_BASELINE_SAMPLES = 20           # requests sent one at a time for the baseline rate
+
+# ─── MULTI-PORT SESSIONS ────────────────────────────────────────────────────
+SESSION_BUDGET_SCALE = 0.25   # extra sessions get this fraction of each buffer budget
+SESSION_MAX          = 16     # ports open at once in addition to the main terminal
+
+# ─── SERIAL BACKEND ─────────────────────────────────────────────────────────
+SERIAL_BACKEND           = "thread"   # "thread" (reader thread per port), "asyncio" (POSIX only)
+                                      # or "process" (capture process + shared-memory ring)
+ASYNC_READ_SIZE          = 65536      # bytes per non-blocking read
+ASYNC_UI_INTERVAL        = 15         # ms between drains of the loop -> Tk queue
+ASYNC_UI_BATCH           = 500        # UI callbacks run per drain
+
+# ─── CAPTURE PROCESS ────────────────────────────────────────────────────────
+CAPTURE_RING_SIZE          = 64 * 1024 * 1024   # bytes of shared memory between capture process and GUI
+CAPTURE_CHUNK_SIZE         = 65536              # largest chunk written to the ring at once
+CAPTURE_BATCH              = 256                # records handed to the decoders per drain
+CAPTURE_POLL_INTERVAL      = 0.002              # seconds the reader/writer sleep on an empty/full ring
+CAPTURE_START_TIMEOUT      = 5.0                # seconds to wait for the capture process to open the port
+
+# ─── RECONNECTION ───────────────────────────────────────────────────────────
+RECONNECT_INITIAL_DELAY = 0.25   # seconds before the second reopen attempt
+RECONNECT_MAX_DELAY     = 10.0   # cap for the exponential backoff
+RECONNECT_FACTOR        = 2.0    # backoff growth per failed attempt
+RECONNECT_JITTER        = 0.5    # each delay is shortened by up to this fraction
+RECONNECT_SCAN_INTERVAL = 0.5    # seconds between checks for arriving devices while waiting
+
+# ─── PORT DISCOVERY ─────────────────────────────────────────────────────────
+PORT_CACHE_JSON = os.path.join(get_shared_data_path(), "ports.json")   # last scanned port list
@@ -2,51 +2,106 @@ import re
 import json
 import csv
 import threading
-from datetime import datetime
-from collections import deque
+import heapq
+from datetime import datetime, timedelta
 import numpy as np
+import config
+from series_buffer import TimeSeriesBuffer
+from records import RawEntry, Sample
+from memory_budget import MemoryBudget, sizeof_raw_entry, sizeof_sample
+from history_store import HistoryStore
+from filter_engine import FilterEngine, FilterRule, FilterIndex
+from search_index import SearchIndex
+from extraction_rules import ExtractionRuleSet
+from parsers import ParserRegistry
+
+# Structured data parsing patterns, shared with the offline log importer
+STRUCTURED_PATTERNS = {
+    'DATA': re.compile(r'\[DATA\]\s*([^:]+):\s*([-+]?\d*\.?\d+)'),
+    'PLOT': re.compile(r'\[PLOT\]\s*([^:]+):\s*([-+]?\d*\.?\d+)'),
+    'MEAS': re.compile(r'\[MEAS\]\s*([^:]+):\s*([-+]?\d*\.?\d+)')
+}
+
+def extract_structured(data, patterns=STRUCTURED_PATTERNS):
+    """Extract (type, name, value) tuples from [DATA]/[PLOT]/[MEAS] tags"""
+    results = []
+    
+    for data_type, pattern in patterns.items():
+        matches = pattern.findall(data)
+        for name, value_str in matches:
+            try:
+                value = float(value_str)
+                results.append((data_type, name.strip(), value))
+            except ValueError:
+                continue
+    
+    return results
 
 class DataProcessor:
-    def __init__(self, max_buffer_size=10000):
+    def __init__(self, max_buffer_size=None, memory_budget=None):
+        # Buffers are bounded by byte budgets (and optionally age); an
+        # explicit max_buffer_size additionally caps the entry count.
         self.max_buffer_size = max_buffer_size
-        self.raw_buffer = deque(maxlen=max_buffer_size)
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.raw_budget = self.memory_budget.register(
+            "Raw lines", config.RAW_BUFFER_BUDGET, config.BUFFER_MAX_AGE)
+        self.sample_budget = self.memory_budget.register(
+            "Structured samples", config.SAMPLE_BUFFER_BUDGET, config.BUFFER_MAX_AGE)
+        
+        self.raw_buffer = TimeSeriesBuffer()
         
         # Separate buffers for different data types
-        self.data_buffer = deque(maxlen=max_buffer_size)  # [DATA] entries
-        self.plot_buffer = deque(maxlen=max_buffer_size)  # [PLOT] entries  
-        self.meas_buffer = deque(maxlen=max_buffer_size)  # [MEAS] entries
+        self.data_buffer = TimeSeriesBuffer()  # [DATA] entries
+        self.plot_buffer = TimeSeriesBuffer()  # [PLOT] entries  
+        self.meas_buffer = TimeSeriesBuffer()  # [MEAS] entries
+        self.type_buffers = {
+            'DATA': self.data_buffer,
+            'PLOT': self.plot_buffer,
+            'MEAS': self.meas_buffer
+        }
+        
+        # Per-series buffers: (type, name) -> TimeSeriesBuffer
+        self.series = {}
         
-        self.filtered_buffer = deque(maxlen=max_buffer_size)
         self.lock = threading.Lock()
         
-        # Filtering
-        self.filter_enabled = False
-        self.filter_pattern = ""
-        self.filter_regex = None
+        # Long raw history, compressed in blocks (outlives raw_buffer)
+        self.history = HistoryStore(memory_budget=self.memory_budget)
+        self.search_index = SearchIndex(self.history, self.memory_budget)
+        
+        # Filtering: matching lines are kept as history line numbers
+        self.filter_engine = FilterEngine()
+        self.filtered_index = FilterIndex()
+        self.filter_generation = 0
+        self.refilter_progress = 1.0
         
         # Structured data parsing patterns
-        self.structured_patterns = {
-            'DATA': re.compile(r'\[DATA\]\s*([^:]+):\s*([-+]?\d*\.?\d+)'),
-            'PLOT': re.compile(r'\[PLOT\]\s*([^:]+):\s*([-+]?\d*\.?\d+)'),
-            'MEAS': re.compile(r'\[MEAS\]\s*([^:]+):\s*([-+]?\d*\.?\d+)')
-        }
+        self.structured_patterns = dict(STRUCTURED_PATTERNS)
+        # User-defined extraction rules (one combined matcher)
+        self.extraction_rules = ExtractionRuleSet()
+        # JSON / key=value / CSV-row parsers, picked per line by first character
+        self.parser_registry = ParserRegistry.default_registry()
         
-        # Callbacks for real-time updates
+        # Callbacks for real-time updates (lists are replaced on add, never changed in place)
+        self.callback_lock = threading.Lock()
         self.data_callbacks = []
         self.plot_callbacks = []
         self.structured_callbacks = []  # For structured data updates
     
     def add_data_callback(self, callback):
         """Add callback for when new data arrives"""
-        self.data_callbacks.append(callback)
+        with self.callback_lock:
+            self.data_callbacks = self.data_callbacks + [callback]
     
     def add_plot_callback(self, callback):
         """Add callback for when new numeric data arrives"""
-        self.plot_callbacks.append(callback)
+        with self.callback_lock:
+            self.plot_callbacks = self.plot_callbacks + [callback]
     
     def add_structured_callback(self, callback):
         """Add callback for structured data (DATA/PLOT/MEAS)"""
-        self.structured_callbacks.append(callback)
+        with self.callback_lock:
+            self.structured_callbacks = self.structured_callbacks + [callback]
     
     def process_data(self, data, timestamp=None):
         """Process incoming serial data"""
@@ -55,52 +110,24 @@ class DataProcessor:
         
         with self.lock:
             # Store raw data with timestamp
-            entry = {
-                'timestamp': timestamp,
-                'data': data,
-                'raw': data.strip()
-            }
+            entry = RawEntry(timestamp, data)
             self.raw_buffer.append(entry)
+            self.raw_budget.charge(sizeof_raw_entry(entry))
+            self._evict_raw(timestamp)
+            line_no = self.history.append(data.rstrip('\r\n'), timestamp)
+            self.filtered_index.prune(self.history.first_line)
             
             # Apply filtering if enabled
-            if self.filter_enabled and self.filter_regex:
-                if not self.filter_regex.search(data):
-                    return  # Skip this data
+            if not self.filter_engine.matches(data):
+                return  # Skip this data
             
-            self.filtered_buffer.append(entry)
+            self.filtered_index.append(line_no)
             
             # Extract structured data
             structured_data = self.extract_structured_data(data, timestamp)
             if structured_data:
                 for data_type, name, value in structured_data:
-                    entry = {
-                        'timestamp': timestamp,
-                        'type': data_type,
-                        'name': name,
-                        'value': value,
-                        'raw_data': data.strip()
-                    }
-                    
-                    # Store in appropriate buffer
-                    if data_type == 'DATA':
-                        self.data_buffer.append(entry)
-                    elif data_type == 'PLOT':
-                        self.plot_buffer.append(entry)
-                        # Notify plot callbacks for PLOT data
-                        for callback in self.plot_callbacks:
-                            try:
-                                callback(timestamp, value, name)
-                            except Exception as e:
-                                print(f"Plot callback error: {e}")
-                    elif data_type == 'MEAS':
-                        self.meas_buffer.append(entry)
-                    
-                    # Notify structured data callbacks
-                    for callback in self.structured_callbacks:
-                        try:
-                            callback(data_type, name, value, timestamp)
-                        except Exception as e:
-                            print(f"Structured callback error: {e}")
+                    self._add_sample(timestamp, data_type, name, value, entry)
             
             # Notify data callbacks
             for callback in self.data_callbacks:
@@ -109,101 +136,317 @@ class DataProcessor:
                 except Exception as e:
                     print(f"Data callback error: {e}")
     
-    def extract_structured_data(self, data, timestamp):
-        """Extract structured data from [DATA]/[PLOT]/[MEAS] tags"""
-        results = []
+    def add_sample(self, data_type, name, value, timestamp=None, raw_data=""):
+        """Add one parsed value (e.g. a polled response) and notify callbacks"""
+        with self.lock:
+            self._add_sample(timestamp or datetime.now(), data_type, name, value, raw_data)
+    
+    def _add_sample(self, timestamp, data_type, name, value, raw_data):
+        sample = Sample(timestamp, data_type, name, value, raw_data)
+        self.sample_budget.charge(sizeof_sample(sample))
         
-        for data_type, pattern in self.structured_patterns.items():
-            matches = pattern.findall(data)
-            for name, value_str in matches:
+        # Store in appropriate buffer
+        self._series_for(data_type, name).append(sample)
+        if data_type == 'DATA':
+            self.data_buffer.append(sample)
+        elif data_type == 'PLOT':
+            self.plot_buffer.append(sample)
+            # Notify plot callbacks for PLOT data
+            for callback in self.plot_callbacks:
                 try:
-                    value = float(value_str)
-                    results.append((data_type, name.strip(), value))
-                except ValueError:
-                    continue
+                    callback(timestamp, value, name)
+                except Exception as e:
+                    print(f"Plot callback error: {e}")
+        elif data_type == 'MEAS':
+            self.meas_buffer.append(sample)
+        self._evict_samples(timestamp)
         
+        # Notify structured data callbacks
+        for callback in self.structured_callbacks:
+            try:
+                callback(data_type, name, value, timestamp)
+            except Exception as e:
+                print(f"Structured callback error: {e}")
+    
+    def extract_structured_data(self, data, timestamp):
+        """
+        Extract structured data from [DATA]/[PLOT]/[MEAS] tags and user
+        rules; the telemetry parsers only see lines neither of them matched
+        """
+        results = extract_structured(data, self.structured_patterns)
+        if self.extraction_rules.rules:
+            results.extend(self.extraction_rules.extract(data))
+        if not results and self.parser_registry.parsers:
+            results.extend(self.parser_registry.parse(data))
         return results
     
+    def register_parser(self, parser):
+        """Add a TelemetryParser plugin (see parsers.py)"""
+        self.parser_registry.register(parser)
+    
+    def get_parser_statistics(self):
+        """Get per-parser line/sample/error counters and throughput"""
+        return self.parser_registry.get_statistics()
+    
+    def set_extraction_rules(self, rule_set):
+        """Replace the user-defined extraction rules (an ExtractionRuleSet)"""
+        self.extraction_rules = rule_set
+    
+    def add_structured_samples(self, samples):
+        """
+        Bulk-append already parsed (timestamp, type, name, value, raw_data)
+        samples, e.g. from an imported log. Callbacks are not notified.
+        """
+        # Group per buffer so a backdated batch is merged once per buffer
+        by_type = {}
+        by_series = {}
+        newest = None
+        for timestamp, data_type, name, value, raw_data in samples:
+            if data_type not in self.type_buffers:
+                continue
+            sample = Sample(timestamp, data_type, name, value, raw_data)
+            by_type.setdefault(data_type, []).append(sample)
+            by_series.setdefault((data_type, name), []).append(sample)
+            if newest is None or timestamp > newest:
+                newest = timestamp
+        if newest is None:
+            return 0
+        count = 0
+        with self.lock:
+            for data_type, group in by_type.items():
+                self.type_buffers[data_type].extend(group)
+                self.sample_budget.charge(sum(sizeof_sample(sample) for sample in group))
+                count += len(group)
+            for (data_type, name), group in by_series.items():
+                self._series_for(data_type, name).extend(group)
+            self._evict_samples(newest)
+        return count
+    
+    def add_frame_batch(self, batch, channels, timestamp, since=None, data_type='PLOT'):
+        """
+        Add the channels of a binary FrameBatch. The frames arrived between
+        `since` (previous batch) and `timestamp`, so their timestamps are
+        spread evenly over that interval. Returns {name: (timestamps, values)}.
+        """
+        count = len(batch)
+        if since is None or since >= timestamp:
+            stamps = [timestamp] * count
+        else:
+            step = (timestamp - since) / count
+            stamps = [since + step * (i + 1) for i in range(count)]
+        
+        columns = {name: values.tolist() for name, values in batch.channels(channels).items()}
+        samples = [(stamp, data_type, name, value, None)
+                   for name, values in columns.items()
+                   for stamp, value in zip(stamps, values)]
+        self.add_structured_samples(samples)
+        return {name: (stamps, values) for name, values in columns.items()}
+    
+    def _series_for(self, data_type, name):
+        """Get (or create) the per-series buffer; caller holds the lock"""
+        key = (data_type, name)
+        buffer = self.series.get(key)
+        if buffer is None:
+            buffer = self.series[key] = TimeSeriesBuffer()
+        return buffer
+    
+    def _evict_raw(self, newest):
+        """Drop the oldest raw lines while over budget/age/count; caller holds the lock"""
+        raw = self.raw_buffer
+        account = self.raw_budget
+        limit = self.max_buffer_size
+        while raw and (account.over_budget or
+                       account.too_old(raw.head().timestamp, newest) or
+                       (limit is not None and len(raw) > limit)):
+            entry = raw.popleft()
+            account.release(sizeof_raw_entry(entry))
+    
+    def _evict_samples(self, newest):
+        """Drop the oldest samples while over budget/age/count; caller holds the lock"""
+        account = self.sample_budget
+        limit = self.max_buffer_size
+        while True:
+            heads = [(buffer.head().timestamp, data_type)
+                     for data_type, buffer in self.type_buffers.items() if buffer]
+            if not heads:
+                return
+            oldest, data_type = min(heads)
+            buffer = self.type_buffers[data_type]
+            if limit is not None:
+                # Count cap applies per type; evict the fullest type first
+                fullest = max(self.type_buffers.values(), key=len)
+                if len(fullest) > limit:
+                    buffer = fullest
+                elif not (account.over_budget or account.too_old(oldest, newest)):
+                    return
+            elif not (account.over_budget or account.too_old(oldest, newest)):
+                return
+            sample = buffer.popleft()
+            series = self.series.get((sample.type, sample.name))
+            if series and series.head() is sample:
+                series.popleft()
+            account.release(sizeof_sample(sample))
+    
     def set_filter(self, pattern, enabled=True):
-        """Set data filter pattern"""
-        self.filter_enabled = enabled
-        self.filter_pattern = pattern
+        """Set a single (case-insensitive regex) data filter pattern"""
         if pattern and enabled:
             try:
-                self.filter_regex = re.compile(pattern, re.IGNORECASE)
+                rule = FilterRule(pattern, regex=True)
             except re.error:
-                self.filter_regex = None
                 return False
+            self.set_filter_engine(FilterEngine([rule]))
         else:
-            self.filter_regex = None
+            self.set_filter_engine(FilterEngine())
         return True
     
+    def set_filter_engine(self, engine):
+        """
+        Switch to a new FilterEngine. New lines use it at once; the lines
+        already in history are re-evaluated in a background thread and the
+        filtered index is swapped when done. Returns the generation number.
+        """
+        with self.lock:
+            self.filter_engine = engine
+            self.filter_generation += 1
+            generation = self.filter_generation
+            stop = self.history.next_line
+            self.refilter_progress = 0.0
+        
+        threading.Thread(target=self._refilter, args=(engine, generation, stop),
+                         daemon=True).start()
+        return generation
+    
+    def _refilter(self, engine, generation, stop):
+        """Re-evaluate history lines [first, stop) against `engine`"""
+        try:
+            matches = FilterIndex()
+            first = self.history.first_line
+            total = max(1, stop - first)
+            for count, (line_no, _, line) in enumerate(self.history.iter_lines(first, stop), 1):
+                if engine.matches(line):
+                    matches.append(line_no)
+                if count % 4096 == 0:
+                    # A newer filter supersedes this run
+                    if generation != self.filter_generation:
+                        return
+                    self.refilter_progress = count / total
+            
+            with self.lock:
+                if generation != self.filter_generation:
+                    return
+                # Lines from `stop` on were already filtered with the new engine
+                matches.lines.extend(self.filtered_index.since(stop))
+                matches.prune(self.history.first_line)
+                self.filtered_index = matches
+                self.refilter_progress = 1.0
+        except Exception as e:
+            print(f"Refilter error: {e}")
+    
+    def _resolve_lines(self, line_numbers):
+        """Turn history line numbers into RawEntry objects; caller holds the lock"""
+        entries = []
+        for line_no in line_numbers:
+            found = self.history.get_line(line_no)
+            if found is not None:
+                entries.append(RawEntry(*found))
+        return entries
+    
+    @property
+    def filter_enabled(self):
+        return self.filter_engine.enabled
+    
+    @property
+    def filter_pattern(self):
+        return self.filter_engine.describe()
+    
     def get_recent_data(self, count=100):
         """Get recent filtered data entries"""
         with self.lock:
-            return list(self.filtered_buffer)[-count:]
+            return self._resolve_lines(self.filtered_index.tail(count))
     
     def get_recent_structured_data(self, data_type=None, count=100):
         """Get recent structured data for plotting"""
         with self.lock:
-            if data_type == 'DATA':
-                return list(self.data_buffer)[-count:]
-            elif data_type == 'PLOT':
-                return list(self.plot_buffer)[-count:]
-            elif data_type == 'MEAS':
-                return list(self.meas_buffer)[-count:]
-            else:
-                # Return all structured data
-                all_data = list(self.data_buffer) + list(self.plot_buffer) + list(self.meas_buffer)
-                return sorted(all_data, key=lambda x: x['timestamp'])[-count:]
+            if data_type in self.type_buffers:
+                return self.type_buffers[data_type].tail(count).to_list()
+            # Merge the tails of all types by timestamp
+            tails = [buffer.tail(count) for buffer in self.type_buffers.values()]
+        merged = list(heapq.merge(*tails, key=lambda x: x.timestamp))
+        return merged[-count:]
     
     def get_data_by_name(self, name, data_type=None, count=100):
         """Get data for a specific measurement name"""
         with self.lock:
-            buffers = []
-            if data_type == 'DATA' or data_type is None:
-                buffers.extend(self.data_buffer)
-            if data_type == 'PLOT' or data_type is None:
-                buffers.extend(self.plot_buffer)
-            if data_type == 'MEAS' or data_type is None:
-                buffers.extend(self.meas_buffer)
-            
-            filtered = [entry for entry in buffers if entry['name'] == name]
-            return sorted(filtered, key=lambda x: x['timestamp'])[-count:]
+            tails = [buffer.tail(count) for (type_, name_), buffer in self.series.items()
+                     if name_ == name and (data_type is None or type_ == data_type)]
+        if len(tails) == 1:
+            return tails[0].to_list()
+        merged = list(heapq.merge(*tails, key=lambda x: x.timestamp))
+        return merged[-count:]
+    
+    def get_range(self, start=None, end=None, names=None, types=None):
+        """
+        Get the samples between `start` and `end` (datetimes, inclusive, None
+        for open-ended) for the given channel names and data types.
+        Returns {(type, name): SeriesView}; each lookup is a binary search,
+        so the cost is O(log n + k) for k returned samples.
+        """
+        with self.lock:
+            return {
+                key: buffer.range(start, end)
+                for key, buffer in self.series.items()
+                if (names is None or key[1] in names) and (types is None or key[0] in types)
+            }
+    
+    def get_structured_range(self, start=None, end=None, names=None, types=None):
+        """Get the samples of get_range() merged into one time-ordered list"""
+        views = self.get_range(start, end, names, types)
+        return list(heapq.merge(*views.values(), key=lambda x: x.timestamp))
+    
+    def get_raw_range(self, start=None, end=None):
+        """Get a view of the raw entries between `start` and `end`"""
+        with self.lock:
+            return self.raw_buffer.range(start, end)
+    
+    def get_filtered_range(self, start=None, end=None):
+        """Get the filtered entries between `start` and `end`"""
+        with self.lock:
+            first = self.history.find_timestamp(start) if start else self.history.first_line
+            stop = self.history.next_line
+            if end is not None:
+                # First line strictly after `end`
+                stop = self.history.find_timestamp(end + timedelta(microseconds=1))
+            return self._resolve_lines(self.filtered_index.between(first, stop))
     
     def get_available_names(self, data_type=None):
         """Get list of available measurement names"""
         with self.lock:
-            names = set()
-            buffers = []
-            if data_type == 'DATA' or data_type is None:
-                buffers.extend(self.data_buffer)
-            if data_type == 'PLOT' or data_type is None:
-                buffers.extend(self.plot_buffer)
-            if data_type == 'MEAS' or data_type is None:
-                buffers.extend(self.meas_buffer)
-            
-            for entry in buffers:
-                names.add(entry['name'])
-            
-            return sorted(list(names))
+            names = {name for (type_, name), buffer in self.series.items()
+                     if buffer and (data_type is None or type_ == data_type)}
+            return sorted(names)
     
-    def export_data(self, filename, format_type='csv', data_type='filtered'):
-        """Export data to file in various formats"""
+    def get_series_counts(self):
+        """Get {(type, name): number of buffered samples}"""
         with self.lock:
-            if data_type == 'raw':
-                data = list(self.raw_buffer)
-            elif data_type == 'structured':
-                data = list(self.data_buffer) + list(self.plot_buffer) + list(self.meas_buffer)
-                data = sorted(data, key=lambda x: x['timestamp'])
-            elif data_type == 'plot':
-                data = list(self.plot_buffer)
-            elif data_type == 'data':
-                data = list(self.data_buffer)
-            elif data_type == 'meas':
-                data = list(self.meas_buffer)
-            else:
-                data = list(self.filtered_buffer)
+            return {key: len(buffer) for key, buffer in self.series.items()}
+    
+    def select_data(self, data_type='filtered', start=None, end=None, names=None):
+        """Select the entries an export of `data_type` needs, limited to a time range/channels"""
+        if data_type == 'raw':
+            return self.get_raw_range(start, end).to_list()
+        if data_type == 'history':
+            return [RawEntry(timestamp, line)
+                    for _, timestamp, line in self.history.iter_range(start, end)]
+        if data_type == 'structured':
+            return self.get_structured_range(start, end, names)
+        if data_type in ('plot', 'data', 'meas'):
+            return self.get_structured_range(start, end, names, [data_type.upper()])
+        return self.get_filtered_range(start, end)
+    
+    def export_data(self, filename, format_type='csv', data_type='filtered',
+                    start=None, end=None, names=None):
+        """Export data to file in various formats"""
+        data = self.select_data(data_type, start, end, names)
         
         if format_type.lower() == 'csv':
             self._export_csv(filename, data, data_type)
@@ -240,7 +483,7 @@ class DataProcessor:
         """Export data to JSON format"""
         json_data = []
         for entry in data:
-            json_entry = entry.copy()
+            json_entry = entry.to_dict()
             json_entry['timestamp'] = entry['timestamp'].isoformat()
             json_data.append(json_entry)
         
@@ -254,14 +497,20 @@ class DataProcessor:
             self.data_buffer.clear()
             self.plot_buffer.clear()
             self.meas_buffer.clear()
-            self.filtered_buffer.clear()
+            self.filtered_index = FilterIndex()
+            self.filter_generation += 1  # abandon a running re-filter
+            self.series.clear()
+            self.raw_budget.reset()
+            self.sample_budget.reset()
+            self.history.clear()
+            self.search_index.clear()
     
     def get_statistics(self):
         """Get basic statistics about the data"""
         with self.lock:
             stats = {
                 'total_entries': len(self.raw_buffer),
-                'filtered_entries': len(self.filtered_buffer),
+                'filtered_entries': len(self.filtered_index),
                 'data_entries': len(self.data_buffer),
                 'plot_entries': len(self.plot_buffer),
                 'meas_entries': len(self.meas_buffer),
@@ -271,7 +520,7 @@ class DataProcessor:
             
             # Statistics for PLOT data (most relevant for plotting)
             if self.plot_buffer:
-                values = [entry['value'] for entry in self.plot_buffer]
+                values = [entry.value for entry in self.plot_buffer]
                 stats.update({
                     'plot_min': min(values),
                     'plot_max': max(values),
@@ -1,9 +1,11 @@
 import os
+import re
 import xml.etree.ElementTree as ET
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox, simpledialog
 import config
+from sequence_runner import Sequence
 
 class EnhancedCommandManager:
     def __init__(self, xml_path=None):
@@ -16,8 +18,9 @@ class EnhancedCommandManager:
             # Fallback to current directory
             self.xml_path = os.path.join(os.getcwd(), "commands.xml")
         
-        self.commands = {}  # name -> {'cmd':…, 'terminator':…, 'category':…, 'description':…}
+        self.commands = {}  # name -> {'cmd':…, 'terminator':…, 'category':…, 'description':…, 'response':…}
         self.categories = set()
+        self.sequences = {}  # name -> Sequence (scripted send/expect steps)
         
         # ensure file exists
         if not os.path.exists(self.xml_path):
@@ -41,6 +44,7 @@ class EnhancedCommandManager:
         root = tree.getroot()
         self.commands.clear()
         self.categories.clear()
+        self.sequences.clear()
         
         for elem in root.findall("command"):
             name = elem.get("name")
@@ -48,22 +52,33 @@ class EnhancedCommandManager:
             term = elem.findtext("terminator", default="")
             category = elem.findtext("category", default="General")
             description = elem.findtext("description", default="")
+            response = elem.findtext("response", default="")
             
             self.commands[name] = {
                 "cmd": cmd, 
                 "terminator": term,
                 "category": category,
-                "description": description
+                "description": description,
+                "response": response
             }
             self.categories.add(category)
+        
+        for elem in root.findall("sequence"):
+            name = elem.get("name")
+            self.sequences[name] = Sequence(
+                name,
+                elem.findtext("script", default=""),
+                elem.findtext("description", default="")
+            )
     
-    def add(self, name, cmd, terminator, category="General", description=""):
-        """Add or overwrite a command and persist to disk."""
+    def add(self, name, cmd, terminator, category="General", description="", response=""):
+        """Add or overwrite a command and persist to disk. `response` is an optional reply regex."""
         self.commands[name] = {
             "cmd": cmd, 
             "terminator": terminator,
             "category": category,
-            "description": description
+            "description": description,
+            "response": response
         }
         self.categories.add(category)
         self._save()
@@ -93,6 +108,27 @@ class EnhancedCommandManager:
         """Return a list of all saved command names."""
         return list(self.commands.keys())
     
+    def add_sequence(self, name, script, description=""):
+        """Add or overwrite a sequence and persist to disk (raises ValueError on script errors)."""
+        sequence = Sequence(name, script, description)
+        sequence.compile()
+        self.sequences[name] = sequence
+        self._save()
+        return sequence
+    
+    def get_sequence(self, name):
+        return self.sequences.get(name)
+    
+    def delete_sequence(self, name):
+        if name in self.sequences:
+            del self.sequences[name]
+            self._save()
+            return True
+        return False
+    
+    def sequence_names(self):
+        return list(self.sequences.keys())
+    
     def _save(self):
         """Write out the current self.commands dict to XML."""
         root = ET.Element("commands")
@@ -110,6 +146,14 @@ class EnhancedCommandManager:
             
             e_desc = ET.SubElement(c, "description")
             e_desc.text = data.get("description", "")
+            
+            if data.get("response"):
+                ET.SubElement(c, "response").text = data["response"]
+        
+        for name, sequence in self.sequences.items():
+            s = ET.SubElement(root, "sequence", name=name)
+            ET.SubElement(s, "description").text = sequence.description
+            ET.SubElement(s, "script").text = sequence.script
         
         tree = ET.ElementTree(root)
         tree.write(self.xml_path, encoding="utf-8", xml_declaration=True)
@@ -302,6 +346,11 @@ class CommandManagerWindow:
         term_display = repr(cmd_data["terminator"]) if cmd_data["terminator"] else "None"
         ctk.CTkLabel(self.details_frame, text=term_display).pack(anchor="w", padx=10)
         
+        # Reply pattern
+        if cmd_data.get("response"):
+            ctk.CTkLabel(self.details_frame, text="Reply Pattern:", font=("Arial", 12, "bold")).pack(anchor="w", pady=(10, 2))
+            ctk.CTkLabel(self.details_frame, text=cmd_data["response"]).pack(anchor="w", padx=10)
+        
         # Description
         ctk.CTkLabel(self.details_frame, text="Description:", font=("Arial", 12, "bold")).pack(anchor="w", pady=(10, 2))
         desc_text = ctk.CTkTextbox(self.details_frame, height=80, wrap="word")
@@ -442,6 +491,11 @@ class CommandEditDialog:
         self.custom_term_entry = ctk.CTkEntry(term_frame, width=100)
         self.custom_term_entry.pack(side="left", padx=(0, 5))
         
+        # Reply pattern (used to match replies when timing round trips and polling)
+        ctk.CTkLabel(main_frame, text="Reply pattern (regex, optional):").pack(anchor="w", pady=(0, 5))
+        self.response_entry = ctk.CTkEntry(main_frame)
+        self.response_entry.pack(fill="x", pady=(0, 10))
+        
         # Description
         ctk.CTkLabel(main_frame, text="Description:").pack(anchor="w", pady=(0, 5))
         self.description_text = ctk.CTkTextbox(main_frame, height=100)
@@ -472,6 +526,7 @@ class CommandEditDialog:
         self.command_text.insert("1.0", data["cmd"])
         self.description_text.insert("1.0", data.get("description", ""))
         self.category_var.set(data.get("category", "General"))
+        self.response_entry.insert(0, data.get("response", ""))
         
         if data["terminator"] == "\r\n":
             self.auto_term_var.set(True)
@@ -507,6 +562,12 @@ class CommandEditDialog:
         
         category = self.category_var.get()
         description = self.description_text.get("1.0", "end-1c").strip()
+        response = self.response_entry.get().strip()
+        try:
+            re.compile(response)
+        except re.error as e:
+            messagebox.showerror("Error", f"Invalid reply pattern: {e}")
+            return
         
         if self.auto_term_var.get():
             terminator = "\r\n"
@@ -517,7 +578,7 @@ class CommandEditDialog:
         if self.command_name and self.command_name != name:
             self.cmd_manager.delete(self.command_name)
         
-        self.cmd_manager.add(name, command, terminator, category, description)
+        self.cmd_manager.add(name, command, terminator, category, description, response)
         self.result = True
         self.window.destroy()
     
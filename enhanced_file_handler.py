@@ -4,6 +4,7 @@ import csv
 from datetime import datetime
 from tkinter import filedialog, messagebox
 import pandas as pd
+from log_index import LineIndex
 
 class EnhancedFileHandler:
     def __init__(self):
@@ -193,6 +194,27 @@ class EnhancedFileHandler:
             messagebox.showerror("Load Error", f"Failed to load file: {str(e)}")
             return None
     
+    def open_log_index(self, filename=None):
+        """
+        Open a text log lazily: the file is memory-mapped and its line
+        index is built in the background, so huge logs open instantly
+        """
+        if not filename:
+            filename = filedialog.askopenfilename(
+                title="Open Log",
+                filetypes=[("Log File", "*.log"), ("Recorded Segment", "*.log.gz"),
+                           ("Text File", "*.txt"), ("All Files", "*.*")]
+            )
+        
+        if not filename:
+            return None
+        
+        try:
+            return LineIndex(filename)
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Failed to open file: {str(e)}")
+            return None
+    
     def _load_text(self, filename):
         """Load text file"""
         with open(filename, 'r', encoding='utf-8') as file:
@@ -231,9 +253,12 @@ class EnhancedFileHandler:
             return df.to_string()
     
     def export_data_advanced(self, data_processor, filename=None, format_type='csv', 
-                           data_type='filtered', include_metadata=True):
+                           data_type='filtered', include_metadata=True, session_store=None,
+                           start=None, end=None, names=None):
         """
-        Advanced export using DataProcessor
+        Advanced export using DataProcessor (or the SQLite session store
+        for data_type 'stored'), optionally limited to a time range and
+        a list of channel names
         """
         if not filename:
             ext = format_type.lower()
@@ -248,28 +273,30 @@ class EnhancedFileHandler:
             return False
         
         try:
-            # Get data from DataProcessor based on type
-            if data_type == 'raw':
-                data = list(data_processor.raw_buffer)
-            elif data_type == 'structured':
-                data = list(data_processor.data_buffer) + list(data_processor.plot_buffer) + list(data_processor.meas_buffer)
-                data = sorted(data, key=lambda x: x['timestamp'])
-            elif data_type == 'data':
-                data = list(data_processor.data_buffer)
-            elif data_type == 'plot':
-                data = list(data_processor.plot_buffer)
-            elif data_type == 'meas':
-                data = list(data_processor.meas_buffer)
-            else:  # filtered
-                data = list(data_processor.filtered_buffer)
+            if data_type == 'stored':
+                if session_store is None:
+                    raise ValueError("Session database is not enabled")
+                if format_type.lower() == 'csv':
+                    # Stream rows straight from SQLite without materializing them
+                    session_store.export_samples_csv(filename, names, start, end)
+                    return True
+                data = [
+                    {'timestamp': ts, 'type': data_type_, 'name': name, 'value': value, 'raw_data': ''}
+                    for ts, data_type_, name, value in session_store.query_samples(names, start, end)
+                ]
+                self._export_structured_data(filename, data, format_type)
+                return True
+            
+            # Get exactly the window we need from DataProcessor
+            data = data_processor.select_data(data_type, start, end, names)
             
             # Export the data
             if data_type in ['structured', 'data', 'plot', 'meas']:
                 self._export_structured_data(filename, data, format_type)
             elif format_type.lower() == 'csv':
-                self._export_csv(filename, data, data_type)
+                data_processor._export_csv(filename, data, data_type)
             elif format_type.lower() == 'json':
-                self._export_json(filename, data)
+                data_processor._export_json(filename, data)
             elif format_type.lower() == 'xlsx':
                 self._export_excel(filename, data, data_type)
             else:
@@ -313,6 +340,24 @@ class EnhancedFileHandler:
                 ])
                 metadata_df.to_excel(writer, sheet_name='Export_Metadata', index=False)
     
+    def _export_excel(self, filename, data, data_type):
+        """Export raw/filtered/history lines to Excel, one sheet per million rows"""
+        rows_per_sheet = 1048575  # Excel's row limit, less the header
+        excel_data = [{
+            'Timestamp': entry['timestamp'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            'Data': entry['data']
+        } for entry in data]
+        
+        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            if not excel_data:
+                pd.DataFrame({'Message': [f'No {data_type} data to export']}).to_excel(
+                    writer, sheet_name='Serial_Data', index=False)
+                return
+            for sheet, start in enumerate(range(0, len(excel_data), rows_per_sheet), 1):
+                name = 'Serial_Data' if sheet == 1 else f'Serial_Data_{sheet}'
+                pd.DataFrame(excel_data[start:start + rows_per_sheet]).to_excel(
+                    writer, sheet_name=name, index=False)
+    
     def _export_structured_data(self, filename, data, format_type):
         """Export structured data (DATA/PLOT/MEAS entries)"""
         if format_type.lower() == 'csv':
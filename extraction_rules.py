@@ -0,0 +1,247 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import config
+from filter_engine import LiteralMatcher
+
+# Numeric value captured by template placeholders
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+GROUP_NAME = re.compile(r'\(\?P<(\w+)>')
+GROUP_REF = re.compile(r'\(\?P=(\w+)\)')
+
+DATA_TYPES = ['DATA', 'PLOT', 'MEAS']
+
+
+def template_to_regex(template):
+    """
+    Turn a template such as `T={T}C V={V}` into a regex: each {name}
+    captures a number into the channel `name`, whitespace matches any run
+    of whitespace and everything else is literal.
+    """
+    parts = []
+    pos = 0
+    for match in PLACEHOLDER.finditer(template):
+        parts.append(_escape_literal(template[pos:match.start()]))
+        parts.append(f"(?P<{match.group(1)}>{NUMBER})")
+        pos = match.end()
+    parts.append(_escape_literal(template[pos:]))
+    return "".join(parts)
+
+
+def _escape_literal(text):
+    return r"\s+".join(re.escape(part) for part in re.split(r"\s+", text))
+
+
+def required_literal(pattern):
+    """
+    Longest literal that every match of `pattern` must contain, or "" if
+    none can be proven (top-level alternation, inline flags, ...). Only
+    literals outside groups and character classes are considered.
+    """
+    if '(?i' in pattern or '(?x' in pattern:
+        return ""
+    runs = []
+    current = ""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        literal = None
+        if c == '\\':
+            nxt = pattern[i + 1:i + 2]
+            if nxt and not nxt.isalnum():
+                literal = nxt
+            i += 2
+        elif c == '[':
+            # Skip the character class
+            i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+        elif c == '(':
+            depth += 1
+            i += 1
+        elif c == ')':
+            depth -= 1
+            i += 1
+        elif c == '|':
+            if depth == 0:
+                return ""
+            i += 1
+        elif c in '?*{':
+            # Quantifier (literals it applies to were never added)
+            if c == '{':
+                i = pattern.find('}', i) + 1 or len(pattern)
+            else:
+                i += 1
+        elif c in '.^$+':
+            i += 1
+        else:
+            literal = c
+            i += 1
+
+        if literal is not None and depth == 0:
+            if pattern[i:i + 1] in ('?', '*', '{'):
+                literal = None  # optional, do not extend the run
+            else:
+                current += literal
+                continue
+        runs.append(current)
+        current = ""
+    runs.append(current)
+    return max(runs, key=len)
+
+
+class ExtractionRule:
+    """
+    User-defined extraction pattern. A template (`T={T}C`) or a regex
+    with named groups; each named group is a channel. A regex with
+    `name` and `value` groups takes the channel name from the line.
+    """
+
+    def __init__(self, name, pattern, kind='template', data_type='DATA', enabled=True):
+        self.name = name
+        self.pattern = pattern
+        self.kind = kind
+        self.data_type = data_type
+        self.enabled = enabled
+
+        self.regex = template_to_regex(pattern) if kind == 'template' else pattern
+        compiled = re.compile(self.regex)  # raise re.error early on bad patterns
+        self.groups = list(compiled.groupindex)
+        if not self.groups:
+            raise ValueError(f"Rule '{name}' has no named group / placeholder")
+        self.dynamic = 'name' in self.groups and 'value' in self.groups
+        self.literal = required_literal(self.regex)
+
+    def spec(self):
+        """Plain tuple describing the rule (picklable for worker processes)"""
+        return (self.name, self.pattern, self.kind, self.data_type, self.enabled)
+
+
+class ExtractionRuleSet:
+    """
+    All enabled rules compiled into one alternation, so a line is scanned
+    once however many rules exist. Each rule's groups are renamed into
+    their own namespace (`_r3_T`); the wrapping `_r3` group tells which
+    rule matched. Rules with a required literal form a guarded matcher
+    that only runs when a multi-literal prefilter finds one of their
+    literals in the line; the few rules without one are always run.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = [rule for rule in rules if rule.enabled]
+        self._compile()
+
+    def _compile(self):
+        self.rule_groups = {}  # wrapper group -> (rule, [(group, channel)])
+        guarded = [(i, rule) for i, rule in enumerate(self.rules) if rule.literal]
+        unguarded = [(i, rule) for i, rule in enumerate(self.rules) if not rule.literal]
+
+        self.guarded_regex = self._combine(guarded)
+        self.unguarded_regex = self._combine(unguarded)
+        self.prefilter = LiteralMatcher([rule.literal for _, rule in guarded], True) if guarded else None
+
+    def _combine(self, indexed_rules):
+        if not indexed_rules:
+            return None
+        branches = []
+        for i, rule in indexed_rules:
+            prefix = f"_r{i}_"
+            body = GROUP_NAME.sub(lambda m: f"(?P<{prefix}{m.group(1)}>", rule.regex)
+            body = GROUP_REF.sub(lambda m: f"(?P={prefix}{m.group(1)})", body)
+            branches.append(f"(?P<_r{i}>{body})")
+            self.rule_groups[f"_r{i}"] = (rule, [(prefix + group, group) for group in rule.groups])
+        return re.compile("|".join(branches))
+
+    def extract(self, line):
+        """Extract (type, name, value) tuples from one line"""
+        results = []
+        if self.guarded_regex is not None and self.prefilter.any(line):
+            self._extract_matches(self.guarded_regex, line, results)
+        if self.unguarded_regex is not None:
+            self._extract_matches(self.unguarded_regex, line, results)
+        return results
+
+    def _extract_matches(self, regex, line, results):
+        for match in regex.finditer(line):
+            rule, groups = self.rule_groups[match.lastgroup]
+            prefix = match.lastgroup + "_"
+            if rule.dynamic:
+                name, value = match.group(prefix + 'name'), match.group(prefix + 'value')
+                pairs = [(name.strip(), value)] if name and value else []
+            else:
+                pairs = [(channel, match.group(group)) for group, channel in groups]
+            for name, value_str in pairs:
+                if value_str is None:
+                    continue
+                try:
+                    results.append((rule.data_type, name, float(value_str)))
+                except ValueError:
+                    continue
+
+    def specs(self):
+        return tuple(rule.spec() for rule in self.rules)
+
+    @classmethod
+    def from_specs(cls, specs):
+        return cls(ExtractionRule(*spec) for spec in specs)
+
+
+class ExtractionRuleManager:
+    """Loads and saves extraction rules in an XML file next to commands.xml"""
+
+    def __init__(self, xml_path=None):
+        self.xml_path = xml_path or config.EXTRACTION_RULES_XML
+        self.rules = []
+
+        if not os.path.exists(self.xml_path) or os.path.getsize(self.xml_path) == 0:
+            self._save()
+        try:
+            self._load()
+        except (ET.ParseError, re.error, ValueError) as e:
+            print(f"Extraction rules load error: {e}")
+            self.rules = []
+
+    def _load(self):
+        root = ET.parse(self.xml_path).getroot()
+        self.rules = []
+        for elem in root.findall("rule"):
+            self.rules.append(ExtractionRule(
+                elem.get("name", ""),
+                elem.findtext("pattern", default=""),
+                elem.get("kind", "template"),
+                elem.get("type", "DATA"),
+                elem.get("enabled", "1") == "1"
+            ))
+
+    def _save(self):
+        root = ET.Element("extraction_rules")
+        for rule in self.rules:
+            elem = ET.SubElement(root, "rule", name=rule.name, kind=rule.kind,
+                                 type=rule.data_type, enabled="1" if rule.enabled else "0")
+            ET.SubElement(elem, "pattern").text = rule.pattern
+        ET.ElementTree(root).write(self.xml_path, encoding="utf-8", xml_declaration=True)
+
+    def add(self, rule):
+        """Add or replace (by name) a rule and persist to disk"""
+        self.rules = [r for r in self.rules if r.name != rule.name] + [rule]
+        self._save()
+
+    def delete(self, name):
+        self.rules = [r for r in self.rules if r.name != name]
+        self._save()
+
+    def get(self, name):
+        for rule in self.rules:
+            if rule.name == name:
+                return rule
+        return None
+
+    def rule_set(self):
+        return ExtractionRuleSet(self.rules)
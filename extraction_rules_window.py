@@ -0,0 +1,136 @@
+import re
+import tkinter as tk
+import tkinter.ttk as ttk
+import customtkinter as ctk
+from tkinter import messagebox
+
+from extraction_rules import ExtractionRule, ExtractionRuleSet, DATA_TYPES
+
+
+class ExtractionRulesWindow:
+    """Editor for extraction rules with a live test line"""
+
+    def __init__(self, parent, rule_manager, on_update_callback=None):
+        self.parent = parent
+        self.rule_manager = rule_manager
+        self.on_update_callback = on_update_callback
+
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title("Extraction Rules")
+        self.window.geometry("760x520")
+        self.window.transient(parent)
+        self.window.grab_set()
+
+        self.setup_ui()
+        self.refresh_rule_list()
+
+    def setup_ui(self):
+        list_frame = ctk.CTkFrame(self.window)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(list_frame, columns=("Type", "Kind", "Pattern"), show="tree headings")
+        self.tree.heading("#0", text="Rule")
+        self.tree.heading("Type", text="Type")
+        self.tree.heading("Kind", text="Kind")
+        self.tree.heading("Pattern", text="Pattern")
+        self.tree.column("#0", width=140)
+        self.tree.column("Type", width=60)
+        self.tree.column("Kind", width=80)
+        self.tree.column("Pattern", width=400)
+        self.tree.pack(fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", self.on_rule_selected)
+
+        form = ctk.CTkFrame(self.window)
+        form.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(form, text="Name:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.name_entry = ctk.CTkEntry(form, width=140)
+        self.name_entry.grid(row=0, column=1, padx=5, pady=2, sticky="w")
+
+        self.kind_menu = ctk.CTkOptionMenu(form, values=["template", "regex"], width=100)
+        self.kind_menu.grid(row=0, column=2, padx=5, pady=2)
+        self.type_menu = ctk.CTkOptionMenu(form, values=DATA_TYPES, width=80)
+        self.type_menu.grid(row=0, column=3, padx=5, pady=2)
+        self.enabled_var = tk.BooleanVar(value=True)
+        ctk.CTkCheckBox(form, text="Enabled", variable=self.enabled_var).grid(row=0, column=4, padx=5)
+
+        ctk.CTkLabel(form, text="Pattern:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.pattern_entry = ctk.CTkEntry(form, width=520,
+                                          placeholder_text="T={T}C V={V}   or   (?P<rpm>\\d+) rpm")
+        self.pattern_entry.grid(row=1, column=1, columnspan=4, padx=5, pady=2, sticky="we")
+
+        ctk.CTkLabel(form, text="Test line:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.test_entry = ctk.CTkEntry(form, width=520)
+        self.test_entry.grid(row=2, column=1, columnspan=4, padx=5, pady=2, sticky="we")
+
+        self.result_label = ctk.CTkLabel(form, text="", anchor="w")
+        self.result_label.grid(row=3, column=0, columnspan=5, padx=5, pady=2, sticky="we")
+
+        buttons = ctk.CTkFrame(self.window)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        ctk.CTkButton(buttons, text="Save Rule", command=self.save_rule).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Delete", command=self.delete_rule).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Test", command=self.test_rule).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Close", command=self.window.destroy).pack(side="right", padx=2)
+
+    def refresh_rule_list(self):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for rule in self.rule_manager.rules:
+            label = rule.name if rule.enabled else f"{rule.name} (off)"
+            self.tree.insert("", "end", iid=rule.name, text=label,
+                             values=(rule.data_type, rule.kind, rule.pattern))
+
+    def on_rule_selected(self, event):
+        selection = self.tree.selection()
+        rule = self.rule_manager.get(selection[0]) if selection else None
+        if rule is None:
+            return
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, rule.name)
+        self.pattern_entry.delete(0, tk.END)
+        self.pattern_entry.insert(0, rule.pattern)
+        self.kind_menu.set(rule.kind)
+        self.type_menu.set(rule.data_type)
+        self.enabled_var.set(rule.enabled)
+
+    def _rule_from_form(self):
+        name = self.name_entry.get().strip()
+        if not name:
+            raise ValueError("Please enter a rule name")
+        return ExtractionRule(name, self.pattern_entry.get(), self.kind_menu.get(),
+                              self.type_menu.get(), self.enabled_var.get())
+
+    def save_rule(self):
+        try:
+            rule = self._rule_from_form()
+        except (re.error, ValueError) as e:
+            messagebox.showerror("Invalid Rule", str(e), parent=self.window)
+            return
+        self.rule_manager.add(rule)
+        self.refresh_rule_list()
+        if self.on_update_callback:
+            self.on_update_callback()
+
+    def delete_rule(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.rule_manager.delete(selection[0])
+        self.refresh_rule_list()
+        if self.on_update_callback:
+            self.on_update_callback()
+
+    def test_rule(self):
+        try:
+            rule = self._rule_from_form()
+        except (re.error, ValueError) as e:
+            self.result_label.configure(text=f"Error: {e}")
+            return
+        rule.enabled = True
+        results = ExtractionRuleSet([rule]).extract(self.test_entry.get())
+        if results:
+            text = ", ".join(f"[{t}] {name} = {value}" for t, name, value in results)
+        else:
+            text = "No match"
+        self.result_label.configure(text=text)
@@ -0,0 +1,227 @@
+import re
+from array import array
+from bisect import bisect_left
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Characters that make a pattern need the regex engine
+REGEX_METACHARS = set(".^$*+?{}[]\\|()")
+
+# A whole /pattern/ filter term, which may itself contain commas
+REGEX_TERM = re.compile(r'\s*/((?:[^/\\]|\\.)+)/\s*(?:,|$)')
+
+
+def split_terms(text):
+    """
+    Yield (term, is_regex) for each comma-separated term of `text`; a
+    /pattern/ term is taken whole, so commas inside it do not split it.
+    """
+    pos = 0
+    while pos < len(text):
+        match = REGEX_TERM.match(text, pos)
+        if match:
+            yield match.group(1), True
+            pos = match.end()
+            continue
+        comma = text.find(",", pos)
+        if comma < 0:
+            comma = len(text)
+        term = text[pos:comma].strip()
+        if term:
+            yield term, False
+        pos = comma + 1
+
+
+class FilterRule:
+    """One include or exclude rule: a plain substring or a regex"""
+
+    def __init__(self, pattern, exclude=False, regex=False, case_sensitive=False):
+        self.pattern = pattern
+        self.exclude = exclude
+        self.case_sensitive = case_sensitive
+        # A "regex" without metacharacters is just a literal
+        self.regex = regex and any(c in REGEX_METACHARS for c in pattern)
+        if self.regex:
+            re.compile(pattern)  # raise re.error early on bad patterns
+
+    def describe(self):
+        text = f"/{self.pattern}/" if self.regex else self.pattern
+        return ("-" if self.exclude else "+") + text
+
+
+class LiteralMatcher:
+    """
+    Multi-literal substring matcher. Uses an Aho-Corasick automaton when
+    pyahocorasick is installed; otherwise `in` checks for a few literals
+    and one alternation of escaped literals for many.
+    """
+
+    def __init__(self, literals, case_sensitive):
+        self.case_sensitive = case_sensitive
+        self.literals = [lit if case_sensitive else lit.casefold() for lit in literals]
+        self.automaton = None
+        self.alternation = None
+
+        if ahocorasick and self.literals:
+            self.automaton = ahocorasick.Automaton()
+            for index, lit in enumerate(self.literals):
+                self.automaton.add_word(lit, index)
+            self.automaton.make_automaton()
+        elif len(self.literals) > 8:
+            ordered = sorted(set(self.literals), key=len, reverse=True)
+            self.alternation = re.compile("|".join(map(re.escape, ordered)))
+
+    def prepare(self, line):
+        return line if self.case_sensitive else line.casefold()
+
+    def any(self, text):
+        """Whether any literal occurs in the prepared text"""
+        if self.automaton is not None:
+            for _ in self.automaton.iter(text):
+                return True
+            return False
+        if self.alternation is not None:
+            return self.alternation.search(text) is not None
+        for lit in self.literals:
+            if lit in text:
+                return True
+        return False
+
+    def all(self, text):
+        """Whether every literal occurs in the prepared text"""
+        if self.automaton is not None:
+            found = {index for _, index in self.automaton.iter(text)}
+            return len(found) == len(self.literals)
+        for lit in self.literals:
+            if lit not in text:
+                return False
+        return True
+
+
+class FilterEngine:
+    """
+    Multiple include/exclude rules combined with boolean logic:
+    a line passes if it matches no exclude rule and, when include rules
+    exist, matches any (mode 'any') or all (mode 'all') of them.
+
+    Literal rules go through a LiteralMatcher; only real regex rules use
+    the regex engine (combined into one alternation in 'any' mode).
+    """
+
+    def __init__(self, rules=(), mode='any'):
+        self.rules = list(rules)
+        self.mode = mode
+        self._compile()
+
+    @property
+    def enabled(self):
+        return bool(self.rules)
+
+    def _compile(self):
+        includes = [rule for rule in self.rules if not rule.exclude]
+        excludes = [rule for rule in self.rules if rule.exclude]
+        self.include_literals, self.include_regexes = self._split(includes)
+        self.exclude_literals, self.exclude_regexes = self._split(excludes)
+        self.has_includes = bool(includes)
+
+        # In 'any' mode (and for excludes) one combined regex is enough
+        self.include_any_regex = self._combine(self.include_regexes)
+        self.exclude_any_regex = self._combine(self.exclude_regexes)
+
+    def _split(self, rules):
+        literals = []
+        for case_sensitive in (True, False):
+            group = [rule.pattern for rule in rules
+                     if not rule.regex and rule.case_sensitive == case_sensitive]
+            if group:
+                literals.append(LiteralMatcher(group, case_sensitive))
+        regexes = [re.compile(rule.pattern, 0 if rule.case_sensitive else re.IGNORECASE)
+                   for rule in rules if rule.regex]
+        return literals, regexes
+
+    def _combine(self, regexes):
+        if not regexes:
+            return None
+        if len(regexes) == 1:
+            return regexes[0]
+        # Inline flags keep each rule's case sensitivity inside the alternation
+        parts = [f"(?{'i' if r.flags & re.IGNORECASE else ''}:{r.pattern})" for r in regexes]
+        return re.compile("|".join(parts))
+
+    def matches(self, line):
+        """Whether `line` passes the filter"""
+        for matcher in self.exclude_literals:
+            if matcher.any(matcher.prepare(line)):
+                return False
+        if self.exclude_any_regex and self.exclude_any_regex.search(line):
+            return False
+        if not self.has_includes:
+            return True
+
+        if self.mode == 'all':
+            for matcher in self.include_literals:
+                if not matcher.all(matcher.prepare(line)):
+                    return False
+            for regex in self.include_regexes:
+                if not regex.search(line):
+                    return False
+            return True
+
+        for matcher in self.include_literals:
+            if matcher.any(matcher.prepare(line)):
+                return True
+        return bool(self.include_any_regex and self.include_any_regex.search(line))
+
+    def describe(self):
+        if not self.rules:
+            return ""
+        return f"{self.mode}: " + " ".join(rule.describe() for rule in self.rules)
+
+    @classmethod
+    def from_text(cls, include_text="", exclude_text="", mode='any', case_sensitive=False):
+        """
+        Build an engine from comma-separated terms; a term written as
+        /pattern/ is a regex, anything else a plain substring.
+        """
+        rules = []
+        for text, exclude in ((include_text, False), (exclude_text, True)):
+            for term, regex in split_terms(text):
+                rules.append(FilterRule(term, exclude, regex, case_sensitive))
+        return cls(rules, mode)
+
+
+class FilterIndex:
+    """
+    Filtered view kept as an ascending array of history line numbers
+    instead of copies of the matching entries (8 bytes per match).
+    """
+
+    def __init__(self, line_numbers=None):
+        self.lines = line_numbers if line_numbers is not None else array('Q')
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, line_no):
+        self.lines.append(line_no)
+
+    def prune(self, first_line):
+        """Forget line numbers older than `first_line` (evicted from history)"""
+        lines = self.lines
+        if lines and lines[0] < first_line:
+            del lines[:bisect_left(lines, first_line)]
+
+    def tail(self, count):
+        return self.lines[-count:] if count > 0 else array('Q')
+
+    def between(self, first_line, stop_line):
+        """Line numbers in [first_line, stop_line)"""
+        lines = self.lines
+        return lines[bisect_left(lines, first_line):bisect_left(lines, stop_line)]
+
+    def since(self, line_no):
+        """Line numbers >= line_no"""
+        return self.lines[bisect_left(self.lines, line_no):]
@@ -1,8 +1,9 @@
-import serial.tools.list_ports
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, messagebox
 import customtkinter as ctk
-from serial_comm import SerialComm
+from async_serial import create_serial_comm, shared_loop
+from capture_process import CaptureComm
+from port_scanner import PortScanner
 from enhanced_file_handler import EnhancedFileHandler
 import platform
 import config  # Import our configuration settings
@@ -10,19 +11,41 @@ from scroll_pause import ScrollController
 from enhanced_command_manager import EnhancedCommandManager, CommandManagerWindow
 from data_processor import DataProcessor
 from plot_widget import PlotWidget
+from session_recorder import SessionRecorder
+from log_viewer import LogViewerWindow
+from log_importer import LogImporter
+from session_store import SessionStore
+from memory_budget import MemoryBudget
+from filter_engine import FilterEngine
+from extraction_rules import ExtractionRuleManager
+from extraction_rules_window import ExtractionRulesWindow
+from binary_decoder import FrameLayout, BinaryDecoder, hex_summary
+from framing import FRAMINGS
+from hex_view import ByteHistory, HexView
+from repeat_scheduler import RepeatScheduler
+from latency_monitor import LatencyMonitor
+from sequence_runner import SequenceRun
+from sequence_window import SequenceWindow
+from request_engine import RequestEngine, PollRequest
+from session_manager import SessionManager
+from session_tab import SessionTab
+from tkinter import simpledialog
 import tkinter as tk
 from datetime import datetime
 import traceback
+import re
 import sys
 import threading
 import queue
 import time
+from collections import deque
 
 
 class ExportDialog:
-    def __init__(self, parent, data_processor, file_handler):
+    def __init__(self, parent, data_processor, file_handler, session_store=None):
         self.data_processor = data_processor
         self.file_handler = file_handler
+        self.session_store = session_store
         
         self.window = ctk.CTkToplevel(parent)
         self.window.title("Export Data")
@@ -53,8 +76,11 @@ class ExportDialog:
             ("All Structured Data", "structured"),
             ("DATA entries only", "data"), 
             ("PLOT entries only", "plot"), 
-            ("MEAS entries only", "meas")
+            ("MEAS entries only", "meas"),
+            ("Full history (compressed)", "history")
         ]
+        if self.session_store and self.session_store.running:
+            data_types.append(("Stored session (database)", "stored"))
         
         for text, value in data_types:
             ctk.CTkRadioButton(main_frame, text=text, variable=self.data_type_var, 
@@ -75,6 +101,20 @@ class ExportDialog:
         ctk.CTkCheckBox(main_frame, text="Include metadata", 
                        variable=self.include_metadata_var).pack(anchor="w", padx=10, pady=2)
         
+        # Optional time range / channel subset
+        range_frame = ctk.CTkFrame(main_frame)
+        range_frame.pack(fill="x", padx=10, pady=(10, 0))
+        range_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(range_frame, text="From:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+        self.start_entry = ctk.CTkEntry(range_frame, placeholder_text="YYYY-MM-DD HH:MM:SS")
+        self.start_entry.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
+        ctk.CTkLabel(range_frame, text="To:").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+        self.end_entry = ctk.CTkEntry(range_frame, placeholder_text="YYYY-MM-DD HH:MM:SS")
+        self.end_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+        ctk.CTkLabel(range_frame, text="Channels:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+        self.names_entry = ctk.CTkEntry(range_frame, placeholder_text="all (or name1, name2)")
+        self.names_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
+        
         # Buttons
         button_frame = ctk.CTkFrame(main_frame)
         button_frame.pack(fill="x", pady=(20, 0))
@@ -90,10 +130,30 @@ class ExportDialog:
         format_type = self.format_var.get()
         include_metadata = self.include_metadata_var.get()
         
+        try:
+            start = self._parse_time(self.start_entry.get())
+            end = self._parse_time(self.end_entry.get())
+        except ValueError:
+            messagebox.showerror("Export Error", "Times must look like YYYY-MM-DD HH:MM:SS")
+            return
+        names = [n.strip() for n in self.names_entry.get().split(",") if n.strip()] or None
+        
         if self.file_handler.export_data_advanced(
-            self.data_processor, None, format_type, data_type, include_metadata
+            self.data_processor, None, format_type, data_type, include_metadata,
+            session_store=self.session_store, start=start, end=end, names=names
         ):
             self.window.destroy()
+    
+    def _parse_time(self, text):
+        """Parse an optional ISO time; a bare time of day means today"""
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            clock = datetime.strptime(text, "%H:%M:%S")
+            return datetime.combine(datetime.now().date(), clock.time())
 
 
 class SerialMonitorGUI(ctk.CTk):
@@ -105,7 +165,9 @@ class SerialMonitorGUI(ctk.CTk):
         
         # Track all scheduled callbacks for cleanup
         self._after_ids = set()
-        self._repeat_id = None
+        self.repeat_scheduler = RepeatScheduler()
+        self.sequence_runs = []
+        self.request_engine = None
         
         self.title("Serial Monitor")
         # Increase window size for new features
@@ -120,19 +182,62 @@ class SerialMonitorGUI(ctk.CTk):
         self.selected_port_full = ""
         
         # Initialize enhanced components
-        self.data_processor = DataProcessor()
+        self.memory_budget = MemoryBudget()
+        self.data_processor = DataProcessor(memory_budget=self.memory_budget)
         self.file_handler = EnhancedFileHandler()
+        self.recorder = SessionRecorder()
+        self.session_store = SessionStore()
+        self.extraction_rule_manager = ExtractionRuleManager()
+        self.latency_monitor = LatencyMonitor()
+        self.session_manager = SessionManager(self.memory_budget, self.repeat_scheduler,
+                                              on_plot=self.on_new_plot_data)
+        self.session_tabs = {}
+        self.data_processor.set_extraction_rules(self.extraction_rule_manager.rule_set())
         
         # Setup data processing callbacks
         self.data_processor.add_data_callback(self.on_new_data)
         self.data_processor.add_plot_callback(self.on_new_plot_data)
         self.data_processor.add_structured_callback(self.on_structured_data)
+        self.data_processor.add_structured_callback(self.session_store.add_sample)
+        self.data_processor.search_index.start()
+        
+        # Binary frame mode
+        self.binary_layout_spec = config.BINARY_FRAME_LAYOUT
+        self.binary_decoder = None
+        self.framing = None
+        self.last_frame_time = None
+        self.last_frame_hex = ""
+        self.frames_since_summary = 0
+        
+        # Plot points and structured updates from reader threads, handed to Tk in batches
+        self.pending_plot_points = deque()
+        self.plot_flush_pending = False
+        self.data_preview_pending = False
+        self.structured_preview_pending = False
+        
+        # Received bytes, shown as text or as a hex dump
+        self.byte_history = ByteHistory(self.memory_budget)
+        self.hex_view = HexView(self.byte_history, self.on_hex_text)
+        self.hex_active = False
+        
+        # Terminal search state
+        self.search_hits = []
+        self.search_pos = -1
+        self.search_generation = 0
         
         self.setup_ui()
+        if self.record_var.get():
+            self.toggle_recording()
         
-        # Populate ports list
+        # Populate ports list from the last scan, then rescan in the background
+        self.port_scanner = PortScanner(on_change=self.on_ports_changed)
+        self.show_ports(self.port_scanner.ports)
         self.refresh_ports()
         
+        # The asyncio backend hands UI work to Tk through one queue
+        if config.SERIAL_BACKEND == "asyncio":
+            self.pump_async_ui()
+        
         # Bind cleanup to window close
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -177,6 +282,12 @@ class SerialMonitorGUI(ctk.CTk):
         
         # Stop repeat commands first
         self.stop_repeat()
+        self.repeat_scheduler.stop()
+        self.stop_sequences()
+        for tab in self.session_tabs.values():
+            tab.stop_sequences()
+        self.stop_polling()
+        self.session_manager.close_all()
         
         # Cancel all scheduled after() callbacks
         for after_id in list(self._after_ids):
@@ -200,6 +311,15 @@ class SerialMonitorGUI(ctk.CTk):
             except:
                 pass
         
+        # Flush and close the current recording segment and database batch
+        try:
+            self.recorder.stop()
+            self.session_store.close()
+            self.data_processor.search_index.stop()
+            self.hex_view.stop()
+        except:
+            pass
+        
         # Destroy window
         self.destroy()
     
@@ -270,6 +390,16 @@ class SerialMonitorGUI(ctk.CTk):
         )
         self.connect_button.grid(row=1, column=4, padx=(0,5), pady=2, sticky="w")
 
+        # Open the selected port as an additional session in its own tab
+        self.open_tab_button = ctk.CTkButton(
+            self.top_frame, text="Open in Tab", width=100,
+            command=self.open_session_tab,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        )
+        self.open_tab_button.grid(row=1, column=3, padx=(0,5), pady=2, sticky="w")
+
         ctk.CTkLabel(self.top_frame, text="", fg_color=config.BG_COLOR) \
             .grid(row=0, column=5, rowspan=2, sticky="nsew")
 
@@ -296,7 +426,7 @@ class SerialMonitorGUI(ctk.CTk):
         h_scroll.grid(row=1, column=0, sticky="ew")
 
         self.terminal.config(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
-        self.scroll_controller = ScrollController(self.terminal)
+        self.scroll_controller = ScrollController(self.terminal, self.memory_budget)
         self.terminal.append = self.scroll_controller.append
         self.terminal.insertPlainText = self.scroll_controller.append
         self._partial_line = ""
@@ -305,6 +435,41 @@ class SerialMonitorGUI(ctk.CTk):
         self.terminal.bind("<Button-1>", lambda e: self.scroll_controller.pause())
         self.terminal.bind("<KeyPress>", lambda e: self.scroll_controller.pause())
         self.terminal.bind("<Button-3>", lambda e: self.scroll_controller.resume())
+        self.terminal.tag_configure("search_hit", background="#5a4a00")
+        
+        # ----- Search bar: indexed search over the whole session -----
+        search_frame = ctk.CTkFrame(terminal_frame, fg_color=config.BG_COLOR, border_width=0)
+        search_frame.pack(fill="x", padx=10, pady=(0, 5))
+        self.search_input = ctk.CTkEntry(
+            search_frame, placeholder_text="Search session (words, or regex)",
+            font=config.DEFAULT_FONT, width=300
+        )
+        self.search_input.pack(side="left", padx=5)
+        self.search_input.bind("<Return>", lambda e: self.handle_search())
+        self.search_regex_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            search_frame, text="Regex", variable=self.search_regex_var,
+            font=config.DEFAULT_FONT,
+            text_color="white", fg_color=config.BG_COLOR
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(
+            search_frame, text="◀ Prev", width=70,
+            command=lambda: self.jump_to_hit(-1),
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=2)
+        ctk.CTkButton(
+            search_frame, text="Next ▶", width=70,
+            command=lambda: self.jump_to_hit(1),
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=2)
+        self.search_status = ctk.CTkLabel(search_frame, text="", fg_color=config.BG_COLOR,
+                                          text_color="white", font=config.DEFAULT_FONT)
+        self.search_status.pack(side="left", padx=10)
+        self.bind("<Control-f>", lambda e: self.search_input.focus_set())
 
         # ----- Bottom Section: 3 Rows -----
         self.bottom_section = ctk.CTkFrame(terminal_frame, fg_color=config.BG_COLOR, border_width=0)
@@ -330,6 +495,15 @@ class SerialMonitorGUI(ctk.CTk):
         )
         self.save_button.pack(side="left", padx=5)
         
+        self.open_log_button = ctk.CTkButton(
+            row1, text="Open Log", width=100,
+            command=self.handle_open_log,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        )
+        self.open_log_button.pack(side="left", padx=5)
+        
         self.export_button = ctk.CTkButton(
             row1, text="Export Data", width=100,
             command=self.handle_export_data,
@@ -366,6 +540,52 @@ class SerialMonitorGUI(ctk.CTk):
         )
         self.auto_terminate.select()
         self.auto_terminate.pack(side="left", padx=5)
+        
+        # Continuous recording to rotating segment files
+        self.record_var = tk.BooleanVar(value=config.RECORD_ON_STARTUP)
+        self.record_checkbox = ctk.CTkCheckBox(
+            row1, text="Record", variable=self.record_var,
+            command=self.toggle_recording,
+            font=config.DEFAULT_FONT,
+            text_color="white", fg_color=config.BG_COLOR
+        )
+        self.record_checkbox.pack(side="left", padx=5)
+        
+        # Optional SQLite session database
+        self.database_var = tk.BooleanVar(value=False)
+        self.database_checkbox = ctk.CTkCheckBox(
+            row1, text="Database", variable=self.database_var,
+            command=self.toggle_database,
+            font=config.DEFAULT_FONT,
+            text_color="white", fg_color=config.BG_COLOR
+        )
+        self.database_checkbox.pack(side="left", padx=5)
+        
+        # Binary framed telemetry instead of text
+        self.binary_var = tk.BooleanVar(value=False)
+        self.binary_checkbox = ctk.CTkCheckBox(
+            row1, text="Binary", variable=self.binary_var,
+            command=self.toggle_binary,
+            font=config.DEFAULT_FONT,
+            text_color="white", fg_color=config.BG_COLOR
+        )
+        self.binary_checkbox.pack(side="left", padx=5)
+        
+        # Frame delimiting stage for binary links
+        self.framing_menu = ctk.CTkOptionMenu(
+            row1, values=["Raw"] + list(FRAMINGS), width=80,
+            command=self.on_framing_selected, font=config.DEFAULT_FONT
+        )
+        self.framing_menu.set("Raw")
+        self.framing_menu.pack(side="left", padx=5)
+        
+        # Text or hex + ASCII view of the received bytes
+        self.view_menu = ctk.CTkOptionMenu(
+            row1, values=["Text", "Hex 8", "Hex 16", "Hex 32"], width=80,
+            command=self.on_view_selected, font=config.DEFAULT_FONT
+        )
+        self.view_menu.set("Text")
+        self.view_menu.pack(side="left", padx=5)
 
         # Row 2: Message entry + Send
         row2 = ctk.CTkFrame(self.bottom_section, fg_color=config.BG_COLOR, border_width=0)
@@ -437,6 +657,15 @@ class SerialMonitorGUI(ctk.CTk):
             font=config.DEFAULT_FONT
         )
         self.manage_cmd_button.pack(side="left", padx=5)
+        
+        self.sequences_button = ctk.CTkButton(
+            row3, text="Sequences", width=90,
+            command=self.open_sequences,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        )
+        self.sequences_button.pack(side="left", padx=5)
 
         self.repeat_var = tk.BooleanVar(value=False)
         self.repeat_checkbox = ctk.CTkCheckBox(
@@ -465,7 +694,7 @@ class SerialMonitorGUI(ctk.CTk):
         plot_frame = self.plot_tab
         
         # Create plot widget
-        self.plot_widget = PlotWidget(plot_frame)
+        self.plot_widget = PlotWidget(plot_frame, memory_budget=self.memory_budget)
         self.plot_widget.pack(fill="both", expand=True)
     
     def setup_analysis_tab(self):
@@ -493,6 +722,21 @@ class SerialMonitorGUI(ctk.CTk):
             hover_color=config.BUTTON_STYLES["green"][1]
         ).pack(side="left", padx=5)
         
+        self.import_log_button = ctk.CTkButton(
+            button_frame, text="Import Log",
+            command=self.handle_import_log,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1]
+        )
+        self.import_log_button.pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            button_frame, text="Extraction Rules",
+            command=self.open_extraction_rules,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1]
+        ).pack(side="left", padx=5)
+        
         ctk.CTkButton(
             button_frame, text="Clear Data Buffers",
             command=self.clear_data_buffers,
@@ -500,6 +744,94 @@ class SerialMonitorGUI(ctk.CTk):
             hover_color=config.BUTTON_STYLES["red"][1]
         ).pack(side="left", padx=5)
         
+        # Line filter: comma-separated terms, /regex/ for regular expressions
+        filter_frame = ctk.CTkFrame(analysis_frame)
+        filter_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(filter_frame, text="Include:").pack(side="left", padx=(10, 2))
+        self.filter_include_entry = ctk.CTkEntry(filter_frame, width=180,
+                                                 placeholder_text="ERR, /T=\\d+/")
+        self.filter_include_entry.pack(side="left", padx=2)
+        
+        ctk.CTkLabel(filter_frame, text="Exclude:").pack(side="left", padx=(10, 2))
+        self.filter_exclude_entry = ctk.CTkEntry(filter_frame, width=140,
+                                                 placeholder_text="DEBUG")
+        self.filter_exclude_entry.pack(side="left", padx=2)
+        
+        self.filter_mode_menu = ctk.CTkOptionMenu(filter_frame, values=["any", "all"], width=70)
+        self.filter_mode_menu.set("any")
+        self.filter_mode_menu.pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            filter_frame, text="Apply Filter", width=100,
+            command=self.apply_filter,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1]
+        ).pack(side="left", padx=5)
+        
+        self.filter_status_label = ctk.CTkLabel(filter_frame, text="No filter")
+        self.filter_status_label.pack(side="left", padx=5)
+        
+        # Command round-trip latency: first response line, or the first matching regex
+        latency_frame = ctk.CTkFrame(analysis_frame)
+        latency_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.latency_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            latency_frame, text="Measure latency", variable=self.latency_var,
+            command=self.toggle_latency
+        ).pack(side="left", padx=(10, 5))
+        
+        ctk.CTkLabel(latency_frame, text="Response:").pack(side="left", padx=(10, 2))
+        self.latency_regex_entry = ctk.CTkEntry(latency_frame, width=180,
+                                                placeholder_text="first line, or regex")
+        self.latency_regex_entry.pack(side="left", padx=2)
+        
+        ctk.CTkButton(
+            latency_frame, text="Export Latencies", width=120,
+            command=self.handle_export_latency,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1]
+        ).pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            latency_frame, text="Reset", width=70,
+            command=self.latency_monitor.clear,
+            fg_color=config.BUTTON_STYLES["red"][0],
+            hover_color=config.BUTTON_STYLES["red"][1]
+        ).pack(side="left", padx=5)
+        
+        # Pipelined polling of saved commands ({tag} in a command is replaced by the request tag)
+        poll_frame = ctk.CTkFrame(analysis_frame)
+        poll_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(poll_frame, text="Poll:").pack(side="left", padx=(10, 2))
+        self.poll_commands_entry = ctk.CTkEntry(poll_frame, width=160,
+                                                placeholder_text="saved commands, a, b")
+        self.poll_commands_entry.pack(side="left", padx=2)
+        
+        ctk.CTkLabel(poll_frame, text="Reply:").pack(side="left", padx=(10, 2))
+        self.poll_response_entry = ctk.CTkEntry(poll_frame, width=140,
+                                                placeholder_text="T=(?P<value>[\\d.]+)")
+        self.poll_response_entry.pack(side="left", padx=2)
+        
+        self.poll_match_menu = ctk.CTkOptionMenu(poll_frame, values=["order", "tag"], width=70)
+        self.poll_match_menu.set("order")
+        self.poll_match_menu.pack(side="left", padx=5)
+        
+        ctk.CTkLabel(poll_frame, text="In flight:").pack(side="left", padx=(10, 2))
+        self.poll_window_entry = ctk.CTkEntry(poll_frame, width=40)
+        self.poll_window_entry.insert(0, str(config.REQUEST_WINDOW))
+        self.poll_window_entry.pack(side="left", padx=2)
+        
+        self.poll_button = ctk.CTkButton(
+            poll_frame, text="Start Polling", width=110,
+            command=self.toggle_polling,
+            fg_color=config.BUTTON_STYLES["green"][0],
+            hover_color=config.BUTTON_STYLES["green"][1]
+        )
+        self.poll_button.pack(side="left", padx=5)
+        
         # Data preview
         preview_frame = ctk.CTkFrame(analysis_frame)
         preview_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -530,12 +862,15 @@ class SerialMonitorGUI(ctk.CTk):
         self.port_combo.set(self.truncate_text(selection))
 
     def on_new_data(self, data_entry):
-        """Callback for when new data is processed"""
+        """Callback (reader thread) for processed data; refreshes the preview once per batch"""
+        if not self.data_preview_pending and hasattr(self, 'update_data_preview'):
+            self.data_preview_pending = True
+            self.after(0, self.refresh_data_preview)
+    
+    def refresh_data_preview(self):
+        self.data_preview_pending = False
         try:
-            # Update preview in analysis tab
-            if hasattr(self, 'update_data_preview'):
-                after_id = self.after_idle(self.update_data_preview)
-                self._after_ids.add(after_id)
+            self.update_data_preview()
         except Exception as e:
             print(f"Error in on_new_data: {e}")
             traceback.print_exc()
@@ -550,25 +885,184 @@ class SerialMonitorGUI(ctk.CTk):
             print(f"Data processing error: {e}")
             traceback.print_exc()
     
-    def on_new_plot_data(self, timestamp, value, name="default"):
-        """Callback for when new numeric data is available for plotting"""
+    def on_serial_lines(self, lines, timestamp):
+        """Callback (reader thread) for every batch of complete received lines"""
+        self.recorder.record_lines(lines, timestamp)
+        self.session_store.add_lines(lines, timestamp)
+        for line in lines:
+            self.process_serial_data(line, timestamp)
+    
+    def toggle_recording(self):
+        """Start or stop continuous recording"""
         try:
-            print(f"DEBUG: on_new_plot_data called - name: '{name}', value: {value}")
-            if hasattr(self, 'plot_widget') and not getattr(self.plot_widget, 'destroyed', False):
-                self.plot_widget.add_data_point(timestamp, value, name)
+            if self.record_var.get():
+                self.recorder.start()
+                self.append_text(f"⏺ Recording to {self.recorder.directory}\n")
             else:
-                print("DEBUG: plot_widget not available or destroyed")
+                self.recorder.stop()
+                self.append_text("⏹ Recording stopped\n")
+        except OSError as e:
+            self.record_var.set(False)
+            self.append_text(f"⚠ Recording failed: {e}\n")
+    
+    def toggle_binary(self):
+        """Switch between text and binary frame decoding"""
+        if self.binary_var.get():
+            spec = simpledialog.askstring(
+                "Binary Frames",
+                "Frame layout (sync length crc: schema or struct format):",
+                initialvalue=self.binary_layout_spec, parent=self
+            )
+            if not spec:
+                self.binary_var.set(False)
+                return
+            try:
+                layout = FrameLayout(spec)
+            except (ValueError, KeyError) as e:
+                self.binary_var.set(False)
+                messagebox.showerror("Invalid Frame Layout", str(e))
+                return
+            self.binary_layout_spec = spec
+            self.binary_decoder = BinaryDecoder(layout)
+            self.last_frame_time = None
+            self.append_text(f"◆ Binary mode: {layout.frame_size}-byte frames, "
+                             f"channels {', '.join(layout.channels)}\n")
+            self.update_binary_summary()
+        else:
+            self.binary_decoder = None
+            self.append_text("◆ Text mode\n")
+        if self.serial_comm:
+            self.serial_comm.set_frame_decoder(self.binary_decoder)
+    
+    def on_framing_selected(self, value):
+        """Select the COBS/SLIP framing stage (or a raw byte stream)"""
+        framing_class = FRAMINGS.get(value)
+        self.framing = framing_class() if framing_class else None
+        if self.serial_comm:
+            self.serial_comm.set_framing(self.framing)
+        self.append_text(f"◆ Framing: {value}\n")
+    
+    def on_frame_batch(self, batch, timestamp):
+        """Callback (reader thread) for every batch of decoded binary frames"""
+        decoder = self.binary_decoder
+        if decoder is None:
+            return
+        channels = self.data_processor.add_frame_batch(
+            batch, decoder.layout.channels, timestamp, self.last_frame_time,
+            config.BINARY_DATA_TYPE)
+        self.last_frame_time = timestamp
+        self.frames_since_summary += len(batch)
+        self.last_frame_hex = hex_summary(batch.last_frame)
+        self.after(0, lambda: self.plot_channels(channels))
+    
+    def plot_channels(self, channels):
+        """Add {name: (timestamps, values)} to the plot (Tk thread)"""
+        if hasattr(self, 'plot_widget') and not getattr(self.plot_widget, 'destroyed', False):
+            for name, (timestamps, values) in channels.items():
+                self.plot_widget.add_data_points(name, timestamps, values)
+    
+    def update_binary_summary(self):
+        """Hex summary line in the terminal while binary mode is on"""
+        decoder = self.binary_decoder
+        if decoder is None:
+            return
+        if self.frames_since_summary:
+            stats = decoder.get_statistics()
+            self.append_text(
+                f"◆ +{self.frames_since_summary} frames (total {stats['frames']:,}, "
+                f"crc err {stats['crc_errors']}, length err {stats['length_errors']}, "
+                f"skipped {stats['skipped_bytes']} B{self.framing_summary()}) "
+                f"last: {self.last_frame_hex}\n")
+            self.frames_since_summary = 0
+        after_id = self.after(config.BINARY_SUMMARY_INTERVAL, self.update_binary_summary)
+        self._after_ids.add(after_id)
+    
+    def pump_async_ui(self):
+        """Run UI callbacks queued by the asyncio serial backend"""
+        shared_loop().drain_ui()
+        self._after_ids.discard(getattr(self, '_async_ui_after', None))
+        self._async_ui_after = self.after(config.ASYNC_UI_INTERVAL, self.pump_async_ui)
+        self._after_ids.add(self._async_ui_after)
+    
+    def framing_summary(self):
+        """', COBS err N' style suffix with the framing error counters"""
+        if self.framing is None:
+            return ""
+        stats = self.framing.get_statistics()
+        return f", {stats['framing']} err {stats['errors']}, oversize {stats['oversize']}"
+    
+    def on_view_selected(self, value):
+        """Switch the terminal between text and hex views of the byte history"""
+        self.clear_terminal()
+        if value == "Text":
+            self.hex_active = False
+            self.hex_view.stop()
+            if self.serial_comm:
+                self.serial_comm.set_hex_view(None)
+            _, data = self.byte_history.tail(config.HEX_VIEW_BACKLOG)
+            self.append_text(data.decode('utf-8', errors='ignore'))
+        else:
+            self.hex_active = True
+            self.hex_view.start(int(value.split()[1]))
+            if self.serial_comm:
+                self.serial_comm.set_hex_view(self.hex_view)
+    
+    def on_hex_text(self, text, generation, replace=False):
+        """Callback (hex view thread) with formatted hex rows; `replace` redraws the last partial row"""
+        self.after(0, lambda: self.append_hex_text(text, generation, replace))
+    
+    def append_hex_text(self, text, generation, replace=False):
+        if self.hex_active and generation == self.hex_view.generation:
+            if replace and self.scroll_controller:
+                self.scroll_controller.remove_last_line()
+            self.append_text(text)
+    
+    def toggle_database(self):
+        """Start or stop storing lines and samples in the session database"""
+        try:
+            if self.database_var.get():
+                self.session_store.open()
+                self.append_text(f"🗄 Storing session in {self.session_store.path}\n")
+            else:
+                self.session_store.close()
+                self.append_text("🗄 Session database closed\n")
         except Exception as e:
-            print(f"Error in on_new_plot_data: {e}")
+            self.database_var.set(False)
+            self.append_text(f"⚠ Session database failed: {e}\n")
+    
+    def on_new_plot_data(self, timestamp, value, name="default"):
+        """Callback (reader thread) for new numeric data; plotted in batches on the Tk thread"""
+        self.pending_plot_points.append((name, timestamp, value))
+        if not self.plot_flush_pending:
+            self.plot_flush_pending = True
+            self.after(0, self.flush_plot_points)
+    
+    def flush_plot_points(self):
+        """Move the queued plot points to the plot widget (Tk thread)"""
+        self.plot_flush_pending = False
+        pending = self.pending_plot_points
+        channels = {}
+        while pending:
+            name, timestamp, value = pending.popleft()
+            timestamps, values = channels.setdefault(name, ([], []))
+            timestamps.append(timestamp)
+            values.append(value)
+        try:
+            self.plot_channels(channels)
+        except Exception as e:
+            print(f"Error in flush_plot_points: {e}")
             traceback.print_exc()
     
     def on_structured_data(self, data_type, name, value, timestamp):
-        """Callback for structured data updates"""
+        """Callback (reader thread) for structured data; refreshes the preview once per batch"""
+        if not self.structured_preview_pending and hasattr(self, 'update_structured_preview'):
+            self.structured_preview_pending = True
+            self.after(0, self.refresh_structured_preview)
+    
+    def refresh_structured_preview(self):
+        self.structured_preview_pending = False
         try:
-            # Update the analysis tab with structured data info
-            if hasattr(self, 'update_structured_preview'):
-                after_id = self.after_idle(self.update_structured_preview)
-                self._after_ids.add(after_id)
+            self.update_structured_preview()
         except Exception as e:
             print(f"Error in on_structured_data: {e}")
             traceback.print_exc()
@@ -588,10 +1082,11 @@ class SerialMonitorGUI(ctk.CTk):
             available_names = self.data_processor.get_available_names()
             if available_names:
                 stats_text += f"Available Measurements:\n"
+                counts = self.data_processor.get_series_counts()
                 for name in available_names:
-                    data_count = len(self.data_processor.get_data_by_name(name, 'DATA'))
-                    plot_count = len(self.data_processor.get_data_by_name(name, 'PLOT'))
-                    meas_count = len(self.data_processor.get_data_by_name(name, 'MEAS'))
+                    data_count = counts.get(('DATA', name), 0)
+                    plot_count = counts.get(('PLOT', name), 0)
+                    meas_count = counts.get(('MEAS', name), 0)
                     stats_text += f"  {name}: DATA={data_count}, PLOT={plot_count}, MEAS={meas_count}\n"
                 stats_text += "\n"
             
@@ -601,6 +1096,78 @@ class SerialMonitorGUI(ctk.CTk):
                 else:
                     stats_text += f"{key.replace('_', ' ').title()}: {value}\n"
             
+            for key, value in self.session_store.get_statistics().items():
+                stats_text += f"{key.replace('_', ' ').title()}: {value}\n"
+            
+            stats_text += "\nMemory Usage:\n" + self.memory_budget.describe() + "\n"
+            history = self.data_processor.history.get_statistics()
+            stats_text += (f"History: {history['history_lines']:,} lines in "
+                           f"{history['history_blocks']} {history['history_codec']} blocks "
+                           f"({history['history_ratio']:.1f}x)\n")
+            search = self.data_processor.search_index.get_statistics()
+            stats_text += (f"Search index: {search['search_indexed_lines']:,} lines, "
+                           f"{search['search_tokens']:,} words\n")
+            if self.serial_comm:
+                tx = self.serial_comm.tx_writer.get_statistics()
+                stats_text += (f"TX: {tx['tx_messages']:,} messages, {tx['tx_bytes']:,} bytes "
+                               f"({tx['tx_messages_per_second']:.1f} msg/s, "
+                               f"{tx['tx_bytes_per_second']:,.0f} B/s), {tx['tx_pending']} queued, "
+                               f"{tx['tx_dropped']} dropped, {tx['tx_errors']} errors\n")
+            for name, latency in sorted(self.latency_monitor.get_statistics().items()):
+                if latency['count']:
+                    stats_text += (f"Latency '{name}': {latency['count']:,} replies, "
+                                   f"p50 {latency['p50'] * 1000:.2f} / p95 {latency['p95'] * 1000:.2f} / "
+                                   f"p99 {latency['p99'] * 1000:.2f} ms "
+                                   f"(max {latency['max'] * 1000:.2f}), {latency['timeouts']} timeouts\n")
+                else:
+                    stats_text += f"Latency '{name}': no replies, {latency['timeouts']} timeouts\n"
+            for session in self.session_manager.get_statistics():
+                stats_text += (f"Session {session['session']} ({'connected' if session['connected'] else 'offline'}): "
+                               f"{session['lines']:,} lines, {session['rx_bytes']:,} B received, "
+                               f"{session['samples']:,} samples, {session['tx_messages']:,} sent\n")
+            capture = self.serial_comm.get_statistics() if isinstance(self.serial_comm, CaptureComm) else None
+            if capture:
+                stats_text += (f"Capture process: {capture['state']}, {capture['captured_bytes']:,} B in "
+                               f"{capture['records']:,} chunks, ring {capture['ring_used'] / capture['ring_capacity']:.0%} "
+                               f"full, {capture['stalls']} stalls\n")
+            if self.request_engine:
+                poll = self.request_engine.get_statistics()
+                stats_text += (f"Polling: {poll['completed']:,} replies, {poll['requests_per_second']:,.0f} req/s "
+                               f"with {poll['window']} in flight vs {poll['baseline_per_second']:,.0f} req/s "
+                               f"one at a time ({poll['speedup']:.1f}x), {poll['timeouts']} timeouts, {poll['late']} late, "
+                               f"{poll['errors']} errors\n")
+            for job in self.repeat_scheduler.get_statistics():
+                stats_text += (f"Repeat '{job['name']}' every {job['interval'] * 1000:g} ms: "
+                               f"{job['fired']:,} sent, {job['missed']} missed")
+                jitter = job['jitter']
+                if jitter:
+                    stats_text += (f", jitter min {jitter['min'] * 1e6:.0f} / mean {jitter['mean'] * 1e6:.0f} / "
+                                   f"max {jitter['max'] * 1e6:.0f} / p99 {jitter['p99'] * 1e6:.0f} µs")
+                stats_text += "\n"
+            if self.hex_active:
+                hex_stats = self.hex_view.get_statistics()
+                stats_text += (f"Hex view: {hex_stats['bytes']:,} bytes formatted, "
+                               f"{hex_stats['mbytes_per_second']:.0f} MB/s\n")
+            if self.framing is not None:
+                framing = self.framing.get_statistics()
+                stats_text += (f"Framing {framing['framing']}: {framing['frames']:,} frames, "
+                               f"{framing['errors']} errors, {framing['oversize']} oversize\n")
+            if self.binary_decoder is not None:
+                frames = self.binary_decoder.get_statistics()
+                stats_text += (f"Binary frames: {frames['frames']:,}, CRC errors {frames['crc_errors']}, "
+                               f"length errors {frames['length_errors']}, "
+                               f"skipped {frames['skipped_bytes']:,} B\n")
+            for parser in self.data_processor.get_parser_statistics():
+                if parser['lines']:
+                    stats_text += (f"Parser {parser['parser']}: {parser['samples']:,} samples from "
+                                   f"{parser['lines']:,} lines, {parser['errors']} errors, "
+                                   f"{parser['lines_per_second']:,.0f} lines/s\n")
+            
+            rec = self.recorder.get_statistics()
+            stats_text += f"\nRecording: {'on' if rec['recording'] else 'off'} | "
+            stats_text += f"Lines: {rec['lines_recorded']} | Segments: {rec['segments']} | "
+            stats_text += f"Disk: {rec['disk_usage'] / 1024:.1f} KB\n"
+            
             stats_text += f"\nLast Updated: {datetime.now().strftime('%H:%M:%S')}"
             
             if hasattr(self, 'stats_text') and self.stats_text:
@@ -675,9 +1242,100 @@ class SerialMonitorGUI(ctk.CTk):
             self.terminal.config(state="normal")
             self.terminal.delete("1.0", tk.END)
             self.terminal.config(state="disabled")
+            self.scroll_controller.reset()
         except Exception as e:
             print(f"Error clearing terminal: {e}")
     
+    def handle_search(self):
+        """Search the session history in a background thread"""
+        query = self.search_input.get().strip()
+        if not query:
+            return
+        regex = self.search_regex_var.get()
+        self.search_generation += 1
+        generation = self.search_generation
+        self.search_status.configure(text="Searching...")
+        
+        def run_search():
+            started = time.perf_counter()
+            try:
+                hits = self.data_processor.search_index.search(query, regex=regex)
+                error = None
+            except re.error as e:
+                hits, error = [], f"Invalid regex: {e}"
+            elapsed = (time.perf_counter() - started) * 1000
+            self.after(0, lambda: self.on_search_finished(generation, hits, elapsed, error))
+        
+        threading.Thread(target=run_search, daemon=True).start()
+    
+    def on_search_finished(self, generation, hits, elapsed_ms, error):
+        """Store search hits and jump to the newest one (Tk thread)"""
+        if generation != self.search_generation:
+            return
+        if error:
+            self.search_status.configure(text=error)
+            return
+        self.search_hits = hits[-config.SEARCH_MAX_HITS:].tolist()
+        if not self.search_hits:
+            self.search_pos = -1
+            self.search_status.configure(text=f"No matches ({elapsed_ms:.0f} ms)")
+            return
+        self.search_pos = len(self.search_hits)
+        self.jump_to_hit(-1, f" in {elapsed_ms:.0f} ms")
+    
+    def jump_to_hit(self, step, suffix=""):
+        """Move to the previous/next hit and scroll the terminal to it"""
+        if not self.search_hits:
+            return
+        self.search_pos = max(0, min(len(self.search_hits) - 1, self.search_pos + step))
+        line_no = self.search_hits[self.search_pos]
+        found = self.data_processor.history.get_line(line_no)
+        position = f"{self.search_pos + 1:,}/{len(self.search_hits):,}{suffix}"
+        if found is None:
+            self.search_status.configure(text=f"{position} — line evicted")
+            return
+        timestamp, line = found
+        
+        index = self.locate_terminal_line(line, self.search_pos)
+        self.terminal.tag_remove("search_hit", "1.0", tk.END)
+        if index is None:
+            self.search_status.configure(
+                text=f"{position} — {timestamp.strftime('%H:%M:%S')} (no longer in terminal): "
+                     f"{self.truncate_text(line, 60)}")
+            return
+        self.scroll_controller.pause()
+        self.terminal.tag_add("search_hit", f"{index} linestart", f"{index} lineend")
+        self.terminal.see(index)
+        self.search_status.configure(text=f"{position} — {timestamp.strftime('%H:%M:%S')}")
+    
+    def locate_terminal_line(self, line, hit_pos):
+        """
+        Find the terminal line showing hit `hit_pos`. Lines with identical
+        text all match the query, so the hit is the (k+1)-th such line
+        counted from the end, k being the number of later identical hits.
+        """
+        if not line:
+            return None
+        history = self.data_processor.history
+        later = 0
+        for other in self.search_hits[hit_pos + 1:hit_pos + 1 + 2000]:
+            found = history.get_line(other)
+            if found is not None and found[1] == line:
+                later += 1
+        
+        index = tk.END
+        while True:
+            index = self.terminal.search(line, index, stopindex="1.0",
+                                         backwards=True, exact=True)
+            if not index:
+                return None
+            full = self.terminal.get(f"{index} linestart", f"{index} lineend").rstrip("\r")
+            if full == line:
+                if later == 0:
+                    return index
+                later -= 1
+            index = f"{index} linestart"
+    
     def clear_data_buffers(self):
         """Clear all data processing buffers"""
         self.data_processor.clear_buffers()
@@ -722,7 +1380,8 @@ class SerialMonitorGUI(ctk.CTk):
 
     def handle_export_data(self):
         """Handle advanced data export"""
-        export_window = ExportDialog(self, self.data_processor, self.file_handler)
+        export_window = ExportDialog(self, self.data_processor, self.file_handler,
+                                     self.session_store)
 
     def toggle_scroll_pause(self):
         """Toggle scroll pause/resume"""
@@ -734,12 +1393,20 @@ class SerialMonitorGUI(ctk.CTk):
             self.pause_button.configure(text="Resume Scroll")
 
     def refresh_ports(self):
+        """Rescan ports in the background; the combobox updates only if the list changed"""
+        self.port_scanner.scan()
+
+    def on_ports_changed(self, ports, added, removed):
+        """PortScanner callback (scanner thread)"""
+        self.after(0, lambda: self.show_ports(ports, added, removed))
+
+    def show_ports(self, ports, added=(), removed=()):
+        selected = self.port_map.get(self.selected_port_full)
         self.port_map.clear()
-        ports = serial.tools.list_ports.comports()
         port_values = []
         for port in ports:
-            desc = f"{port.device} - {port.description}"
-            self.port_map[desc] = port.device
+            desc = f"{port['device']} - {port['description']}"
+            self.port_map[desc] = port['device']
             port_values.append(desc)
         if platform.system() == "Linux":
             common_ports = ["/dev/ttyUSB0", "/dev/ttyACM0", "/dev/ttyS0"]
@@ -749,7 +1416,15 @@ class SerialMonitorGUI(ctk.CTk):
                     self.port_map[desc] = p
                     port_values.append(desc)
         self.port_combo.configure(values=port_values)
-        if port_values:
+        if added or removed:
+            changes = [f"+{p}" for p in added] + [f"-{p}" for p in removed]
+            self.append_text(f"🔌 Ports changed: {' '.join(changes)}\n")
+        # Keep the current selection if its port is still there
+        current = [desc for desc in port_values if self.port_map[desc] == selected]
+        if current:
+            self.selected_port_full = current[0]
+            self.port_combo.set(self.truncate_text(current[0]))
+        elif port_values:
             self.selected_port_full = port_values[0]
             self.port_combo.set(self.truncate_text(port_values[0]))
         else:
@@ -768,10 +1443,17 @@ class SerialMonitorGUI(ctk.CTk):
             return
         port = self.port_map.get(selected_desc)
         baud = int(self.baud_combo.get())
-        self.serial_comm = SerialComm(
+        self.serial_comm = create_serial_comm(
             self.port_combo, self.baud_combo, self.connect_button,
             self.terminal, self.port_map, self.get_button_style
         )
+        self.serial_comm.add_line_callback(self.on_serial_lines)
+        self.serial_comm.add_line_callback(self.latency_monitor.on_lines)
+        self.serial_comm.add_frame_callback(self.on_frame_batch)
+        self.serial_comm.set_frame_decoder(self.binary_decoder)
+        self.serial_comm.set_framing(self.framing)
+        self.serial_comm.set_byte_history(self.byte_history)
+        self.serial_comm.set_hex_view(self.hex_view if self.hex_active else None)
         
         if self.serial_comm.connect(port, baud):
             self.connect_button.configure(text="Disconnect", fg_color=config.BUTTON_STYLES["red"][0],
@@ -779,6 +1461,29 @@ class SerialMonitorGUI(ctk.CTk):
             self.port_combo.configure(state="disabled")
             self.baud_combo.configure(state="disabled")
 
+    def open_session_tab(self):
+        """Open the selected port in its own tab, alongside the main terminal"""
+        selected_desc = self.selected_port_full if self.selected_port_full else self.port_combo.get()
+        port = self.port_map.get(selected_desc)
+        if not port:
+            self.append_text("⚠ No port selected.\n")
+            return
+        if self.serial_comm and self.serial_comm.running and self.serial_comm.last_port == port:
+            messagebox.showerror("Open in Tab", f"{port} is open in the main terminal")
+            return
+        try:
+            tab = SessionTab(self.notebook, self.session_manager, port, port, int(self.baud_combo.get()),
+                             self.port_map, self.get_button_style, on_closed=self.on_session_tab_closed,
+                             cmd_manager=self.cmd_manager)
+        except ValueError as e:
+            messagebox.showerror("Open in Tab", str(e))
+            return
+        self.session_tabs[port] = tab
+        self.notebook.set(port)
+    
+    def on_session_tab_closed(self, tab):
+        self.session_tabs.pop(tab.name, None)
+    
     def disconnect_serial(self):
         if self.serial_comm:
             self.serial_comm.disconnect()
@@ -807,7 +1512,7 @@ class SerialMonitorGUI(ctk.CTk):
         self.history_index = -1
 
         # 3) Send
-        self.serial_comm.send_message(raw + ("" if raw.endswith("\n") else "\r\n"))
+        self.send_tracked(raw + ("" if raw.endswith("\n") else "\r\n"), "manual")
         self.message_input.delete(0, tk.END)
 
         # 4) If repeat requested, start it
@@ -851,6 +1556,104 @@ class SerialMonitorGUI(ctk.CTk):
         if self.file_handler.save_log(log_text):
             self.append_text("💾 Log saved successfully\n")
 
+    def handle_open_log(self):
+        """Open a saved or recorded log in the paged log viewer"""
+        line_index = self.file_handler.open_log_index()
+        if line_index:
+            LogViewerWindow(self, line_index)
+
+    def apply_filter(self):
+        """Apply the include/exclude filter, re-filtering history in the background"""
+        try:
+            engine = FilterEngine.from_text(
+                self.filter_include_entry.get(),
+                self.filter_exclude_entry.get(),
+                self.filter_mode_menu.get()
+            )
+        except re.error as e:
+            self.filter_status_label.configure(text=f"Invalid regex: {e}")
+            return
+        generation = self.data_processor.set_filter_engine(engine)
+        self.poll_filter_progress(generation)
+    
+    def poll_filter_progress(self, generation):
+        """Show re-filter progress, then the filtered lines (Tk thread)"""
+        dp = self.data_processor
+        if generation != dp.filter_generation:
+            return
+        if dp.refilter_progress < 1.0:
+            self.filter_status_label.configure(
+                text=f"Filtering... {dp.refilter_progress * 100:.0f}%")
+            after_id = self.after(200, lambda: self.poll_filter_progress(generation))
+            self._after_ids.add(after_id)
+            return
+        
+        stats = dp.get_statistics()
+        if not stats['filter_enabled']:
+            self.filter_status_label.configure(text="No filter")
+            self.update_data_preview()
+            return
+        self.filter_status_label.configure(text=f"{stats['filtered_entries']:,} lines match")
+        
+        preview_text = f"Filtered Lines ({stats['filter_pattern']}):\n"
+        preview_text += "=" * 40 + "\n\n"
+        for entry in dp.get_recent_data(count=50):
+            timestamp = entry['timestamp'].strftime('%H:%M:%S.%f')[:-3]
+            preview_text += f"[{timestamp}] {entry['data']}\n"
+        try:
+            self.preview_text.delete("1.0", tk.END)
+            self.preview_text.insert("1.0", preview_text)
+        except:
+            pass  # Widget might be destroyed
+    
+    def open_extraction_rules(self):
+        """Open the extraction rule editor"""
+        ExtractionRulesWindow(self, self.extraction_rule_manager, self.on_extraction_rules_changed)
+    
+    def on_extraction_rules_changed(self):
+        """Recompile the rules into the live data processor"""
+        self.data_processor.set_extraction_rules(self.extraction_rule_manager.rule_set())
+    
+    def handle_import_log(self):
+        """Re-parse a saved or recorded log into the structured data buffers"""
+        filename = filedialog.askopenfilename(
+            title="Import Log",
+            filetypes=[("Log File", "*.log"), ("Text File", "*.txt"),
+                       ("Compressed Recording", "*.gz"), ("All Files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        self.import_log_button.configure(state="disabled", text="Importing...")
+        importer = LogImporter(self.data_processor)
+        
+        def run_import():
+            try:
+                stats = importer.import_file(filename)
+            except Exception as e:
+                stats = {'error': str(e)}
+            self.after(0, lambda: self.on_import_finished(stats))
+        
+        threading.Thread(target=run_import, daemon=True).start()
+    
+    def on_import_finished(self, stats):
+        """Plot and summarize the result of a log import (Tk thread)"""
+        self.import_log_button.configure(state="normal", text="Import Log")
+        if 'error' in stats:
+            self.append_text(f"⚠ Import failed: {stats['error']}\n")
+            return
+        
+        # Only the imported samples; live ones are already on the plot
+        self.plot_channels(stats['plot'])
+        
+        self.update_statistics()
+        self.update_structured_preview()
+        self.append_text(
+            f"📥 Imported {stats['samples']:,} samples from {stats['lines']:,} lines "
+            f"in {stats['seconds']:.1f}s ({stats['lines_per_second']:,.0f} lines/s, "
+            f"{stats['workers']} workers)\n"
+        )
+
     def get_button_style(self, color):
         return config.BUTTON_STYLES.get(color, config.BUTTON_STYLES["green"])
 
@@ -858,6 +1661,77 @@ class SerialMonitorGUI(ctk.CTk):
         """Open the enhanced command manager window"""
         CommandManagerWindow(self, self.cmd_manager, self.update_command_dropdown)
     
+    def toggle_polling(self):
+        """Start or stop pipelined polling of the listed saved commands"""
+        if self.request_engine and self.request_engine.running:
+            self.stop_polling()
+            return
+        if not (self.serial_comm and self.serial_comm.serial_port and self.serial_comm.serial_port.is_open):
+            messagebox.showerror("Polling", "Connect to a port first")
+            return
+        try:
+            requests = []
+            for name in [n.strip() for n in self.poll_commands_entry.get().split(",") if n.strip()]:
+                data = self.cmd_manager.get(name)
+                if not data:
+                    raise ValueError(f"Unknown saved command '{name}'")
+                requests.append(PollRequest(name, data["cmd"] + data["terminator"],
+                                            self.poll_response_entry.get().strip() or
+                                            data.get("response") or None))
+            self.request_engine = RequestEngine(
+                self.serial_comm, self.data_processor, requests,
+                window=int(self.poll_window_entry.get()), match=self.poll_match_menu.get(),
+                on_stopped=lambda engine: self.after(0, self.on_polling_failed))
+        except (ValueError, re.error) as e:
+            messagebox.showerror("Polling", str(e))
+            return
+        self.request_engine.start()
+        self.latency_monitor.set_ignore(self.request_engine.owns)
+        self.poll_button.configure(text="Stop Polling", fg_color=config.BUTTON_STYLES["red"][0],
+                                   hover_color=config.BUTTON_STYLES["red"][1])
+        self.append_text(f"📡 Polling {', '.join(r.name for r in requests)} "
+                         f"({self.request_engine.window} in flight)\n")
+    
+    def on_polling_failed(self):
+        self.append_text("📡 Polling stopped: the request could not be sent\n")
+        self.stop_polling()
+    
+    def stop_polling(self):
+        self.latency_monitor.set_ignore(None)
+        if self.request_engine and self.request_engine.running:
+            self.request_engine.stop()
+            poll = self.request_engine.get_statistics()
+            self.append_text(f"📡 Polling stopped: {poll['requests_per_second']:,.0f} req/s vs "
+                             f"{poll['baseline_per_second']:,.0f} req/s one at a time\n")
+        if hasattr(self, 'poll_button'):
+            self.poll_button.configure(text="Start Polling", fg_color=config.BUTTON_STYLES["green"][0],
+                                       hover_color=config.BUTTON_STYLES["green"][1])
+    
+    def open_sequences(self):
+        SequenceWindow(self, self.cmd_manager, self.run_sequence, self.stop_sequences)
+    
+    def run_sequence(self, sequence):
+        """Start a sequence on its own thread against the connected port"""
+        if not (self.serial_comm and self.serial_comm.serial_port and self.serial_comm.serial_port.is_open):
+            return False
+        try:
+            run = SequenceRun(sequence, self.serial_comm, self.cmd_manager.get, self.on_sequence_event)
+        except ValueError as e:
+            self.append_text(f"⚠ Sequence '{sequence.name}': {e}\n")
+            return False
+        self.sequence_runs = [r for r in self.sequence_runs if r.status == "running"] + [run]
+        self.append_text(f"▶ [{sequence.name}] started\n")
+        run.start()
+        return True
+    
+    def stop_sequences(self):
+        for run in self.sequence_runs:
+            run.cancel()
+    
+    def on_sequence_event(self, run, text):
+        """Callback (sequence thread) with progress of a running sequence"""
+        self.after(0, lambda: self.append_text(f"▶ [{run.sequence.name}] {text}\n"))
+    
     def update_command_dropdown(self):
         """Update the command dropdown after changes"""
         names = self.cmd_manager.names()
@@ -872,48 +1746,48 @@ class SerialMonitorGUI(ctk.CTk):
             self.send_cmd_button.configure(state="disabled")
 
     def start_repeat(self):
-        # disable the checkbox, enable Stop
-        self.repeat_checkbox.configure(state="disabled")
-        self.stop_repeat_button.configure(state="normal")
-        interval = 1000
-        try:
-            interval = int(self.interval_entry.get())
-        except ValueError:
-            pass
-        # schedule first send
-        self._repeat_id = self.after(interval, self._repeat_send)
-        self._after_ids.add(self._repeat_id)
-
-    def _repeat_send(self):
-        if self._repeat_id in self._after_ids:
-            self._after_ids.remove(self._repeat_id)
-            
+        """Repeat the selected saved command on the scheduler thread"""
         sel = self.cmd_dropdown.get()
         data = self.cmd_manager.get(sel)
-        if data and self.serial_comm and self.serial_comm.serial_port.is_open:
-            self.serial_comm.send_message(data["cmd"] + data["terminator"])
-        # schedule next
-        interval = 1000
+        if not data:
+            return
+        interval = 1000.0
         try:
-            interval = int(self.interval_entry.get())
+            interval = float(self.interval_entry.get())
         except ValueError:
             pass
-        self._repeat_id = self.after(interval, self._repeat_send)
-        self._after_ids.add(self._repeat_id)
+        message = data["cmd"] + data["terminator"]
+        echo = interval / 1000.0 >= config.REPEAT_ECHO_MIN_INTERVAL
+        response = data.get("response")
+        try:
+            # Prefixed so stopping here leaves the session tabs' jobs alone
+            self.repeat_scheduler.add(f"main:{sel}", interval / 1000.0,
+                                      lambda: self._repeat_send(message, sel, echo, response))
+        except ValueError as e:
+            self.repeat_var.set(False)
+            messagebox.showerror("Repeat", str(e))
+            return
+        # disable the repeat controls while jobs run, enable Stop
+        self.repeat_checkbox.configure(state="disabled")
+        self.interval_entry.configure(state="disabled")
+        self.stop_repeat_button.configure(state="normal")
+        self.append_text(f"🔁 Repeating '{sel}' every {interval:g} ms\n")
+
+    def _repeat_send(self, message, name, echo, response=None):
+        """Scheduler thread: queue one repetition of a command"""
+        serial_comm = self.serial_comm
+        if serial_comm and serial_comm.serial_port and serial_comm.serial_port.is_open:
+            self.send_tracked(message, name, echo, response)
 
     def stop_repeat(self):
-        # cancel the after() loop
-        if hasattr(self, "_repeat_id") and self._repeat_id:
-            try:
-                self.after_cancel(self._repeat_id)
-                if self._repeat_id in self._after_ids:
-                    self._after_ids.remove(self._repeat_id)
-            except:
-                pass
-            self._repeat_id = None
+        """Stop the main window's repeating commands"""
+        for job in self.repeat_scheduler.get_statistics():
+            if job['name'].startswith("main:"):
+                self.repeat_scheduler.remove(job['name'])
         # re-enable controls
         self.repeat_var.set(False)
         self.repeat_checkbox.configure(state="normal")
+        self.interval_entry.configure(state="normal")
         self.stop_repeat_button.configure(state="disabled")
 
     def send_command(self):
@@ -931,7 +1805,42 @@ class SerialMonitorGUI(ctk.CTk):
         if self.serial_comm \
         and self.serial_comm.serial_port \
         and self.serial_comm.serial_port.is_open:
-            self.serial_comm.send_message(cmd)
+            self.send_tracked(cmd, sel, response=data.get("response"))
+    
+    def send_tracked(self, message, name, echo=True, response=None):
+        """Send through the TX writer, timing the round trip (to a `response` match) when latency is measured"""
+        callback = self.latency_monitor.track(name, response)
+        sent = self.serial_comm.send_message(message, callback=callback, label=name, echo=echo)
+        if not sent and callback:
+            callback(None, "not sent")
+        return sent
+    
+    def toggle_latency(self):
+        """Start or stop measuring command round-trip latency"""
+        pattern = self.latency_regex_entry.get().strip() or None
+        try:
+            self.latency_monitor.set_enabled(self.latency_var.get(), pattern)
+        except re.error as e:
+            self.latency_var.set(False)
+            messagebox.showerror("Invalid Response Pattern", str(e))
+            return
+        if self.latency_var.get():
+            self.append_text(f"⏱ Measuring latency to {'/' + pattern + '/' if pattern else 'the first reply line'}\n")
+    
+    def handle_export_latency(self):
+        """Export the raw round-trip latencies to CSV"""
+        filename = filedialog.asksaveasfilename(
+            title="Export Latencies",
+            filetypes=[("CSV File", "*.csv")],
+            defaultextension=".csv"
+        )
+        if not filename:
+            return
+        try:
+            count = self.latency_monitor.export_csv(filename)
+            self.append_text(f"⏱ Exported {count:,} latencies to {filename}\n")
+        except OSError as e:
+            messagebox.showerror("Export Error", str(e))
     
     def test_data_tags(self):
         """Test the data tag processing by simulating tag data"""
@@ -0,0 +1,208 @@
+import time
+import threading
+
+import numpy as np
+
+import config
+from memory_budget import MemoryBudget
+
+HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+# Printable ASCII is shown as-is, everything else as '.'
+ASCII_TABLE = np.full(256, ord('.'), dtype=np.uint8)
+ASCII_TABLE[0x20:0x7f] = np.arange(0x20, 0x7f, dtype=np.uint8)
+
+OFFSET_DIGITS = 8
+OFFSET_SHIFTS = np.arange(4 * (OFFSET_DIGITS - 1), -1, -4, dtype=np.uint64)
+
+
+def format_hex(data, offset=0, bytes_per_row=16):
+    """
+    Format bytes as `OFFSET  XX XX ... |ascii|` rows. The whole chunk is
+    laid out in one (rows, width) uint8 array with table lookups, so the
+    cost is a few numpy operations per chunk rather than per byte. A
+    short last row is padded with spaces.
+    """
+    n = len(data)
+    if n == 0:
+        return ""
+    rows = -(-n // bytes_per_row)
+    hex_start = OFFSET_DIGITS + 2
+    ascii_start = hex_start + 3 * bytes_per_row + 1
+    width = ascii_start + bytes_per_row + 2
+
+    values = np.zeros(rows * bytes_per_row, dtype=np.uint8)
+    values[:n] = np.frombuffer(data, dtype=np.uint8)
+    values = values.reshape(rows, bytes_per_row)
+
+    out = np.full((rows, width), ord(' '), dtype=np.uint8)
+    offsets = np.uint64(offset) + np.arange(rows, dtype=np.uint64) * np.uint64(bytes_per_row)
+    out[:, :OFFSET_DIGITS] = HEX_DIGITS[(offsets[:, None] >> OFFSET_SHIFTS) & np.uint64(0xF)]
+    out[:, hex_start:ascii_start - 1:3] = HEX_DIGITS[values >> 4]
+    out[:, hex_start + 1:ascii_start - 1:3] = HEX_DIGITS[values & 0xF]
+    out[:, ascii_start - 1] = ord('|')
+    out[:, ascii_start:ascii_start + bytes_per_row] = ASCII_TABLE[values]
+    out[:, width - 2] = ord('|')
+    out[:, width - 1] = ord('\n')
+
+    missing = rows * bytes_per_row - n
+    if missing:
+        last = out[-1]
+        last[ascii_start - 1 - 3 * missing:ascii_start - 1] = ord(' ')
+        last[width - 2 - missing:width - 2] = ord(' ')
+    return out.tobytes().decode('ascii')
+
+
+class ByteHistory:
+    """
+    Raw received bytes, shared by the text and hex views. Bounded by a
+    MemoryBudget account: the oldest bytes are dropped first, and
+    `start` is the stream offset of the oldest byte still held.
+    """
+
+    def __init__(self, memory_budget=None, budget_bytes=config.BYTE_HISTORY_BUDGET):
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.account = self.memory_budget.register("Byte history", budget_bytes)
+        self.lock = threading.Lock()
+        self.data = bytearray()
+        self.start = 0
+
+    @property
+    def end(self):
+        return self.start + len(self.data)
+
+    def append(self, data):
+        with self.lock:
+            self.data += data
+            self.account.charge(len(data))
+            if self.account.over_budget:
+                # Trim to 90% so we do not shift the buffer on every append
+                excess = len(self.data) - int(self.account.budget * 0.9)
+                del self.data[:excess]
+                self.start += excess
+                self.account.release(excess)
+
+    def read(self, since, limit=None):
+        """(offset, bytes) from stream offset `since` (or the oldest byte held)"""
+        with self.lock:
+            since = max(since, self.start)
+            stop = len(self.data) if limit is None else since - self.start + limit
+            return since, bytes(self.data[since - self.start:stop])
+
+    def tail(self, size):
+        """(offset, bytes) of the newest `size` bytes"""
+        with self.lock:
+            since = max(self.start, self.end - size)
+            return since, bytes(self.data[since - self.start:])
+
+    def clear(self):
+        with self.lock:
+            self.start = self.end
+            self.data = bytearray()
+            self.account.reset()
+
+
+class HexView:
+    """
+    Renders the byte history as hex + ASCII rows on a worker thread.
+    notify() wakes the worker after new bytes were appended; complete
+    rows are formatted straight away and a trailing partial row once the
+    line has been idle for `flush_delay`. Rows always start on a multiple
+    of `bytes_per_row`: a shown partial row is formatted again once more
+    bytes arrive. Text goes to output(text, generation, replace) from the
+    worker thread, with replace True when the text starts with a new
+    version of the last (partial) row shown; the generation changes on
+    every restart so the receiver can drop stale output.
+    """
+
+    def __init__(self, history, output, bytes_per_row=config.HEX_BYTES_PER_ROW,
+                 backlog=config.HEX_VIEW_BACKLOG, interval=config.HEX_VIEW_INTERVAL,
+                 flush_delay=config.HEX_VIEW_FLUSH_DELAY):
+        self.history = history
+        self.output = output
+        self.bytes_per_row = bytes_per_row
+        self.backlog = backlog
+        self.interval = interval
+        self.flush_delay = flush_delay
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+        self.generation = 0
+        self.next_offset = 0   # start of the first row not yet shown complete
+        self.partial_shown = 0  # bytes of that row already shown as a partial row
+        self.formatted_bytes = 0
+        self.seconds = 0.0
+
+    def start(self, bytes_per_row=None):
+        """(Re)start rendering with the newest `backlog` bytes of the history"""
+        self.stop()
+        if bytes_per_row:
+            self.bytes_per_row = bytes_per_row
+        self.generation += 1
+        offset = max(self.history.start, self.history.end - self.backlog)
+        self.next_offset = offset - offset % self.bytes_per_row
+        self.partial_shown = 0
+        self.running = True
+        self.wake.set()
+        self.thread = threading.Thread(target=self._run, args=(self.generation,), daemon=True)
+        self.thread.start()
+        return self.generation
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def notify(self):
+        self.wake.set()
+
+    def _run(self, generation):
+        while self.running and generation == self.generation:
+            woken = self.wake.wait(self.flush_delay)
+            self.wake.clear()
+            if not self.running or generation != self.generation:
+                return
+            try:
+                self._render(generation, flush=not woken)
+            except Exception as e:
+                print(f"Hex view error: {e}")
+            # Coalesce bursts into one insert per interval
+            time.sleep(self.interval)
+
+    def _render(self, generation, flush):
+        offset, data = self.history.read(self.next_offset)
+        if offset > self.next_offset:
+            # The history was trimmed past us; restart on a row boundary
+            skip = -offset % self.bytes_per_row
+            offset, data = offset + skip, data[skip:]
+            self.partial_shown = 0
+        complete = len(data) - len(data) % self.bytes_per_row
+        end = len(data) if flush else complete
+        if end <= self.partial_shown:
+            return  # nothing new, or the partial row is still filling
+        data = data[:end]
+        replace = self.partial_shown > 0
+        started = time.perf_counter()
+        text = format_hex(data, offset, self.bytes_per_row)
+        self.seconds += time.perf_counter() - started
+        self.formatted_bytes += len(data) - self.partial_shown
+        self.next_offset = offset + complete
+        self.partial_shown = end - complete
+        self.output(text, generation, replace)
+
+    def get_statistics(self):
+        return {
+            'bytes': self.formatted_bytes,
+            'mbytes_per_second': self.formatted_bytes / self.seconds / 1e6 if self.seconds > 0 else 0.0
+        }
+
+
+if __name__ == "__main__":
+    import os
+
+    print(format_hex(b"Hello, hex view!\x00\x01\x02\xff tail", 0, 16), end="")
+    payload = os.urandom(8 * 1024 * 1024)
+    started = time.perf_counter()
+    text = format_hex(payload, 0, 16)
+    elapsed = time.perf_counter() - started
+    print(f"{len(payload) / 1e6:.1f} MB -> {len(text) / 1e6:.1f} MB text in {elapsed:.3f}s "
+          f"= {len(payload) / elapsed / 1e6:.0f} MB/s")
@@ -0,0 +1,241 @@
+import zlib
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+import config
+from memory_budget import MemoryBudget
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+def _compress(payload):
+    if lz4_frame:
+        return lz4_frame.compress(payload)
+    return zlib.compress(payload, 6)
+
+
+def _decompress(blob):
+    if lz4_frame:
+        return lz4_frame.decompress(blob)
+    return zlib.decompress(blob)
+
+
+class HistoryBlock:
+    """A sealed, compressed run of consecutive lines"""
+
+    __slots__ = ('first_line', 'first_ts', 'last_ts', 'count', 'blob', 'raw_size')
+
+    def __init__(self, first_line, first_ts, last_ts, count, blob, raw_size):
+        self.first_line = first_line
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.count = count
+        self.blob = blob
+        self.raw_size = raw_size
+
+
+class HistoryStore:
+    """
+    In-memory raw line history packed into fixed-size compressed blocks.
+
+    Completed lines go into an open block; every `block_lines` lines the
+    block is sealed: timestamps, line lengths and UTF-8 text are packed
+    and compressed with lz4 (if installed) or zlib. Each block keeps its
+    first line number and timestamp, so a lookup bisects the block list
+    and decompresses only one block. Recently used blocks stay decoded in
+    a small LRU cache. Lines are numbered from 0 for the whole session.
+    """
+
+    def __init__(self, block_lines=config.HISTORY_BLOCK_LINES,
+                 cache_blocks=config.HISTORY_CACHE_BLOCKS,
+                 memory_budget=None, budget_bytes=config.HISTORY_BUDGET):
+        self.block_lines = block_lines
+        self.cache_blocks = cache_blocks
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.account = self.memory_budget.register("Compressed history", budget_bytes)
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.blocks = []
+            self.block_first_lines = []       # bisect keys for line lookups
+            self.block_first_ts = array('d')  # bisect keys for time lookups
+            self.open_ts = array('d')
+            self.open_lines = []
+            self.open_first_line = 0
+            self.next_line = 0
+            self.cache = OrderedDict()        # first_line -> (timestamps, lines)
+            self.account.reset()
+
+    # ─── Appending ──────────────────────────────────────────────────────────
+    def append(self, line, timestamp):
+        """Add one completed line; returns its line number"""
+        with self.lock:
+            ts = timestamp.timestamp()
+            if self.open_ts and ts < self.open_ts[-1]:
+                ts = self.open_ts[-1]
+            self.open_ts.append(ts)
+            self.open_lines.append(line)
+            line_no = self.next_line
+            self.next_line += 1
+            if len(self.open_lines) >= self.block_lines:
+                self._seal()
+            return line_no
+
+    def _seal(self):
+        """Compress the open block and start a new one"""
+        count = len(self.open_lines)
+        encoded = [line.encode('utf-8') for line in self.open_lines]
+        lengths = array('I', map(len, encoded))
+        payload = self.open_ts.tobytes() + lengths.tobytes() + b"".join(encoded)
+        blob = _compress(payload)
+
+        block = HistoryBlock(self.open_first_line, self.open_ts[0], self.open_ts[-1],
+                             count, blob, len(payload))
+        self.blocks.append(block)
+        self.block_first_lines.append(block.first_line)
+        self.block_first_ts.append(block.first_ts)
+        self.account.charge(len(blob))
+
+        self.open_first_line = self.next_line
+        self.open_ts = array('d')
+        self.open_lines = []
+
+        # Evict the oldest blocks beyond the budget
+        while len(self.blocks) > 1 and self.account.over_budget:
+            oldest = self.blocks.pop(0)
+            self.block_first_lines.pop(0)
+            self.block_first_ts.pop(0)
+            self.cache.pop(oldest.first_line, None)
+            self.account.release(len(oldest.blob))
+
+    def _decode(self, block):
+        """Decompress a block (through the LRU cache)"""
+        cached = self.cache.get(block.first_line)
+        if cached is not None:
+            self.cache.move_to_end(block.first_line)
+            return cached
+
+        payload = _decompress(block.blob)
+        ts_end = block.count * 8
+        len_end = ts_end + block.count * 4
+        timestamps = array('d')
+        timestamps.frombytes(payload[:ts_end])
+        lengths = array('I')
+        lengths.frombytes(payload[ts_end:len_end])
+
+        text = memoryview(payload)[len_end:]
+        lines = []
+        pos = 0
+        for length in lengths:
+            lines.append(str(text[pos:pos + length], 'utf-8', 'replace'))
+            pos += length
+
+        decoded = (timestamps, lines)
+        self.cache[block.first_line] = decoded
+        if len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+        return decoded
+
+    # ─── Random access ──────────────────────────────────────────────────────
+    @property
+    def first_line(self):
+        """Number of the oldest line still retained"""
+        with self.lock:
+            return self.blocks[0].first_line if self.blocks else self.open_first_line
+
+    def __len__(self):
+        return self.next_line - self.first_line
+
+    def _locate(self, line_no):
+        """Return (timestamps, lines, index) holding `line_no`, or None"""
+        if line_no >= self.open_first_line:
+            index = line_no - self.open_first_line
+            if index < len(self.open_lines):
+                return self.open_ts, self.open_lines, index
+            return None
+        b = bisect_right(self.block_first_lines, line_no) - 1
+        if b < 0:
+            return None
+        block = self.blocks[b]
+        timestamps, lines = self._decode(block)
+        return timestamps, lines, line_no - block.first_line
+
+    def get_line(self, line_no):
+        """Return (timestamp, line) for a line number, or None if evicted"""
+        with self.lock:
+            found = self._locate(line_no)
+            if found is None:
+                return None
+            timestamps, lines, index = found
+            return datetime.fromtimestamp(timestamps[index]), lines[index]
+
+    def get_lines(self, start, count):
+        """Return [(line_no, timestamp, line)] for up to `count` lines from `start`"""
+        return list(self.iter_lines(start, start + count))
+
+    def iter_lines(self, start=None, stop=None):
+        """
+        Yield (line_no, timestamp, line) for lines in [start, stop) in order,
+        decompressing one block at a time.
+        """
+        with self.lock:
+            start = self.first_line if start is None else max(start, self.first_line)
+            stop = self.next_line if stop is None else min(stop, self.next_line)
+        line_no = start
+        while line_no < stop:
+            with self.lock:
+                found = self._locate(line_no)
+                if found is None:
+                    # Evicted while iterating; skip to what is still retained
+                    if line_no < self.first_line:
+                        line_no = self.first_line
+                        continue
+                    return
+                timestamps, lines, index = found
+                end = min(len(lines), index + (stop - line_no))
+                chunk = [(line_no + i - index, datetime.fromtimestamp(timestamps[i]), lines[i])
+                         for i in range(index, end)]
+            yield from chunk
+            line_no += len(chunk)
+
+    def find_timestamp(self, timestamp):
+        """Return the first retained line number whose timestamp is >= `timestamp`"""
+        ts = timestamp.timestamp()
+        with self.lock:
+            if self.open_ts and ts >= self.open_ts[0]:
+                return self.open_first_line + bisect_left(self.open_ts, ts)
+            b = bisect_right(self.block_first_ts, ts) - 1
+            if b < 0:
+                return self.first_line
+            block = self.blocks[b]
+            timestamps, _ = self._decode(block)
+            index = bisect_left(timestamps, ts)
+            return block.first_line + index
+
+    def iter_range(self, start=None, end=None):
+        """Yield (line_no, timestamp, line) between two datetimes (inclusive)"""
+        first = self.find_timestamp(start) if start else None
+        for item in self.iter_lines(first):
+            if end and item[1] > end:
+                return
+            yield item
+
+    def get_statistics(self):
+        with self.lock:
+            compressed = sum(len(block.blob) for block in self.blocks)
+            raw = sum(block.raw_size for block in self.blocks)
+            return {
+                'history_lines': len(self),
+                'history_blocks': len(self.blocks),
+                'history_compressed_bytes': compressed,
+                'history_ratio': raw / compressed if compressed else 0.0,
+                'history_codec': 'lz4' if lz4_frame else 'zlib'
+            }
@@ -0,0 +1,196 @@
+import re
+import csv
+import math
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+import config
+
+
+class LatencyHistogram:
+    """
+    Streaming latency histogram with logarithmic buckets (about 2%
+    relative resolution from 1 µs to 100 s), so percentiles cost one
+    cumulative sum whatever the number of samples. The most recent raw
+    samples are kept as well for export.
+    """
+
+    MIN_LATENCY = 1e-6
+    BUCKETS_PER_DECADE = 100
+    DECADES = 8
+
+    def __init__(self, raw_samples=config.LATENCY_RAW_SAMPLES):
+        self.counts = np.zeros(self.BUCKETS_PER_DECADE * self.DECADES + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.timeouts = 0
+        self.raw = deque(maxlen=raw_samples)  # (sent datetime, latency seconds)
+
+    def add(self, latency, sent_at=None):
+        index = int(math.log10(max(latency, self.MIN_LATENCY) / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE)
+        self.counts[min(index, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+        self.raw.append((sent_at or datetime.now(), latency))
+
+    def percentile(self, percent):
+        """Latency in seconds below which `percent` % of the samples fall (bucket upper edge)"""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100.0)
+        index = int(np.searchsorted(np.cumsum(self.counts), max(rank, 1)))
+        edge = self.MIN_LATENCY * 10 ** ((index + 1) / self.BUCKETS_PER_DECADE)
+        return min(edge, self.max)
+
+    def get_statistics(self):
+        return {
+            'count': self.count,
+            'timeouts': self.timeouts,
+            'min': self.min,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)
+        }
+
+
+class LatencyMonitor:
+    """
+    Measures command round trips. track(name, response) registers a
+    command before it is queued and returns the TX completion callback
+    that starts its clock when the write has finished; on_lines (a
+    SerialComm line callback) stops the clock of the oldest running
+    command whose reply pattern (its own, else `response_pattern`) the
+    line matches, or of the oldest one if there is no pattern. Lines the
+    `ignore` predicate accepts (e.g. replies to the request engine) are
+    skipped. A timer thread counts commands without a reply within
+    `timeout` seconds as timeouts, even while the port is quiet.
+    """
+
+    def __init__(self, timeout=config.LATENCY_TIMEOUT):
+        self.timeout = timeout
+        self.enabled = False
+        self.response_regex = None
+        self.ignore = None
+        self.histograms = {}
+        self.pending = deque()  # [name, written perf_counter or None, sent datetime, regex or None]
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        # Converts a wall-clock receive time to the perf_counter clock of written_at
+        self.clock_offset = time.perf_counter() - time.time()
+
+    def set_enabled(self, enabled, response_pattern=None):
+        """Start or stop measuring; raises re.error on an invalid response pattern"""
+        regex = re.compile(response_pattern) if response_pattern else None
+        with self.lock:
+            self.enabled = enabled
+            self.response_regex = regex
+            self.pending.clear()
+        if enabled and self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._expire_loop, daemon=True)
+            self.thread.start()
+        elif not enabled and self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def set_ignore(self, predicate):
+        """Skip lines for which predicate(line) is true (None: match every line)"""
+        self.ignore = predicate
+
+    def track(self, name, response_pattern=None):
+        """Register a command about to be sent; returns its TX callback (None when disabled)"""
+        if not self.enabled:
+            return None
+        entry = [name, None, None, re.compile(response_pattern) if response_pattern else None]
+        with self.lock:
+            self.pending.append(entry)
+        return lambda request, error: self._written(entry, request, error)
+
+    def _written(self, entry, request, error):
+        with self.lock:
+            if error:
+                if entry in self.pending:
+                    self.pending.remove(entry)
+                return
+            entry[1] = request.written_at
+            entry[2] = datetime.now()
+
+    def on_lines(self, lines, timestamp):
+        """SerialComm line callback: match each reply to the oldest written command it answers"""
+        if not self.enabled:
+            return
+        ignore = self.ignore
+        now = time.perf_counter()
+        # Measure to when the reader received the lines, not to this callback
+        received = timestamp.timestamp() + self.clock_offset if timestamp else now
+        with self.lock:
+            self._expire(now)
+            for line in lines:
+                if not self.pending:
+                    return
+                if ignore is not None and ignore(line):
+                    continue
+                entry = self._match(line)
+                if entry is not None:
+                    self.pending.remove(entry)
+                    self._histogram(entry[0]).add(max(received - entry[1], 0.0), entry[2])
+
+    def _match(self, line):
+        for entry in self.pending:
+            if entry[1] is None:
+                return None  # not written yet, and neither is anything after it
+            regex = entry[3] or self.response_regex
+            if regex is None or regex.search(line):
+                return entry
+        return None
+
+    def _expire_loop(self):
+        while not self.stop_event.wait(config.LATENCY_EXPIRE_INTERVAL):
+            with self.lock:
+                self._expire(time.perf_counter())
+
+    def _expire(self, now):
+        while self.pending and self.pending[0][1] is not None and now - self.pending[0][1] > self.timeout:
+            name = self.pending.popleft()[0]
+            self._histogram(name).timeouts += 1
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def clear(self):
+        with self.lock:
+            self.histograms = {}
+            self.pending.clear()
+
+    def get_statistics(self):
+        """{command name: histogram statistics}"""
+        with self.lock:
+            return {name: histogram.get_statistics() for name, histogram in self.histograms.items()}
+
+    def export_csv(self, path):
+        """Write every kept raw latency as command,sent,latency_ms rows"""
+        with self.lock:
+            rows = [(name, sent_at.isoformat(), f"{latency * 1000:.3f}")
+                    for name, histogram in self.histograms.items()
+                    for sent_at, latency in histogram.raw]
+        rows.sort(key=lambda row: row[1])
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["command", "sent", "latency_ms"])
+            writer.writerows(rows)
+        return len(rows)
@@ -0,0 +1,222 @@
+import os
+import re
+import sys
+import gzip
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from data_processor import extract_structured
+from extraction_rules import ExtractionRuleSet
+from parsers import ParserRegistry
+
+# Leading timestamp written by SessionRecorder or the structured text export
+LINE_TIMESTAMP = re.compile(r'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)\]?\s*')
+
+# Extraction rule sets compiled in this (worker) process, by spec tuple
+_rule_sets = {}
+
+
+def _rule_set_for(specs):
+    rule_set = _rule_sets.get(specs)
+    if rule_set is None:
+        rule_set = _rule_sets[specs] = ExtractionRuleSet.from_specs(specs)
+    return rule_set
+
+
+def line_aligned_chunks(filename, chunk_size=8 * 1024 * 1024):
+    """Split a file into (start, end) byte ranges that begin and end on line boundaries"""
+    size = os.path.getsize(filename)
+    ranges = []
+    with open(filename, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()  # advance to the end of the current line
+            end = min(f.tell(), size)
+            if end <= start:
+                end = size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(args):
+    """
+    Worker: parse one byte range of a log file with the same extraction as
+    live data. Returns (line_count, samples) where each sample is
+    (epoch seconds or None, type, name, value, raw_data).
+    """
+    filename, start, end, rule_specs, parser_specs = args
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+
+    lines = text.splitlines()
+    registry = ParserRegistry.from_specs(parser_specs)
+    return len(lines), parse_lines(lines, _rule_set_for(rule_specs), registry)
+
+
+def parse_gzip_chunks(filename, rule_set=None, registry=None, lines_per_chunk=200000):
+    """Parse a gzip'ed recording sequentially (gzip streams cannot be split)"""
+    with gzip.open(filename, 'rt', encoding='utf-8', errors='replace') as f:
+        lines = []
+        for line in f:
+            lines.append(line.rstrip('\r\n'))
+            if len(lines) >= lines_per_chunk:
+                yield len(lines), parse_lines(lines, rule_set, registry)
+                lines = []
+        if lines:
+            yield len(lines), parse_lines(lines, rule_set, registry)
+
+
+def split_timestamp(line):
+    """Return (epoch seconds or None, line without its timestamp prefix)"""
+    match = LINE_TIMESTAMP.match(line)
+    if match:
+        try:
+            return datetime.fromisoformat(match.group(1)).timestamp(), line[match.end():]
+        except ValueError:
+            pass
+    return None, line
+
+
+def parse_lines(lines, rule_set=None, registry=None):
+    """
+    Extract (epoch seconds or None, type, name, value, raw_data) samples
+    using the built-in tags and, if given, an ExtractionRuleSet and a
+    ParserRegistry.
+    Timestamps travel as floats and names are interned, which keeps the
+    result cheap to pickle back to the parent process.
+    """
+    use_rules = rule_set is not None and bool(rule_set.rules)
+    use_parsers = registry is not None and bool(registry.parsers)
+    samples = []
+    for line in lines:
+        timestamp, line = split_timestamp(line)
+        extracted = extract_structured(line) if '[' in line else []
+        if use_rules:
+            extracted.extend(rule_set.extract(line))
+        if use_parsers and not extracted:
+            extracted.extend(registry.parse(line))
+        if not extracted:
+            continue
+        raw = line.strip()
+        for data_type, name, value in extracted:
+            samples.append((timestamp, data_type, sys.intern(name), value, raw))
+    return samples
+
+
+class LogImporter:
+    """
+    Offline import pipeline: splits a log into line-aligned chunks, parses
+    them in a process pool and merges the results, in file order, into a
+    DataProcessor's structured buffers.
+    """
+
+    def __init__(self, data_processor, workers=None, chunk_size=8 * 1024 * 1024):
+        self.data_processor = data_processor
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cancelled = False
+
+    def import_file(self, filename, progress_callback=None):
+        """
+        Import a log file; returns statistics about the run, with the
+        imported PLOT samples as 'plot': {name: (timestamps, values)}.
+        """
+        started = time.perf_counter()
+
+        # Lines without a timestamp inherit the previous one. Leading ones
+        # wait for the first timestamp in the file, or fall back to the
+        # file modification time if it has none.
+        last_timestamp = None
+        unstamped = []
+        total_lines = 0
+        total_samples = 0
+        plot = {}
+
+        # Workers rebuild the live extraction rules from their plain specs
+        rule_set = self.data_processor.extraction_rules
+        rule_specs = rule_set.specs()
+        registry = ParserRegistry.from_specs(self.data_processor.parser_registry.specs())
+
+        executor = None
+        if filename.endswith('.gz'):
+            tasks = None
+            results = parse_gzip_chunks(filename, rule_set, registry)
+        else:
+            # A CSV header only appears at the top; find it before splitting
+            self._sniff_header(filename, registry)
+            parser_specs = registry.specs()
+            tasks = [(filename, start, end, rule_specs, parser_specs)
+                     for start, end in line_aligned_chunks(filename, self.chunk_size)]
+            if self.workers > 1 and len(tasks) > 1:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+                results = executor.map(parse_chunk, tasks)
+            else:
+                results = map(parse_chunk, tasks)
+        chunk_count = 0
+
+        try:
+            # map() yields in submission order, so merging stays in file order
+            for done, (line_count, samples) in enumerate(results, 1):
+                if self.cancelled:
+                    break
+                resolved = []
+                for epoch, data_type, name, value, raw in samples:
+                    if epoch is not None:
+                        last_timestamp = datetime.fromtimestamp(epoch)
+                        if unstamped:
+                            resolved.extend((last_timestamp,) + sample for sample in unstamped)
+                            unstamped = []
+                    elif last_timestamp is None:
+                        unstamped.append((data_type, name, value, raw))
+                        continue
+                    resolved.append((last_timestamp, data_type, name, value, raw))
+
+                total_samples += self._add_samples(resolved, plot)
+                total_lines += line_count
+                chunk_count = done
+                if progress_callback:
+                    progress_callback(done, len(tasks) if tasks else None)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        if unstamped and not self.cancelled:
+            mtime = datetime.fromtimestamp(os.path.getmtime(filename))
+            total_samples += self._add_samples([(mtime,) + sample for sample in unstamped], plot)
+
+        elapsed = time.perf_counter() - started
+        return {
+            'file': filename,
+            'lines': total_lines,
+            'samples': total_samples,
+            'plot': plot,
+            'chunks': chunk_count,
+            'workers': self.workers if executor else 1,
+            'seconds': elapsed,
+            'lines_per_second': total_lines / elapsed if elapsed > 0 else 0.0,
+            'cancelled': self.cancelled
+        }
+
+    def _add_samples(self, resolved, plot):
+        """Hand one chunk to the DataProcessor as a single time-sorted batch"""
+        resolved.sort(key=lambda sample: sample[0])
+        for timestamp, data_type, name, value, raw in resolved:
+            if data_type == 'PLOT':
+                timestamps, values = plot.setdefault(name, ([], []))
+                timestamps.append(timestamp)
+                values.append(value)
+        return self.data_processor.add_structured_samples(resolved)
+
+    def _sniff_header(self, filename, registry, size=64 * 1024):
+        """Feed the first lines to the registry so header-aware parsers see them"""
+        with open(filename, 'rb') as f:
+            head = f.read(size).decode('utf-8', errors='replace')
+        for line in head.splitlines()[:200]:
+            registry.parse(split_timestamp(line)[1])
+
+    def cancel(self):
+        self.cancelled = True
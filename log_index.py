@@ -0,0 +1,192 @@
+import os
+import re
+import gzip
+import mmap
+import tempfile
+import threading
+from array import array
+from datetime import datetime
+import numpy as np
+
+# Leading timestamp written by SessionRecorder ("2024-01-01T12:00:00.123456\t...")
+# or by the structured text export ("[2024-01-01 12:00:00.123] ...")
+TIMESTAMP_PREFIX = re.compile(rb'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)')
+
+
+class LineIndex:
+    """
+    Memory-mapped view of a (possibly huge) log file.
+
+    A background thread records the byte offset of every `stride`-th line,
+    so the first pages are readable immediately and the index stays small
+    (8 bytes per `stride` lines). Random access seeks to the nearest indexed
+    line and scans at most `stride` lines forward. A gzip'ed file (e.g. a
+    closed recorder segment) is first decompressed to a temporary file on
+    the same thread; it reads as empty until then and goes away on close().
+    """
+
+    def __init__(self, filename, stride=64, chunk_size=16 * 1024 * 1024, encoding='utf-8'):
+        self.filename = filename
+        self.stride = stride
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+
+        self.decompressing = filename.endswith('.gz')
+        if self.decompressing:
+            # Fail now on a file that is not gzip at all, not on the thread
+            with open(filename, 'rb') as f:
+                if f.read(2) != b"\x1f\x8b":
+                    raise gzip.BadGzipFile(f"Not a gzipped file: {filename}")
+            self._file = tempfile.TemporaryFile()
+            self.size = 0
+            self.mm = b""
+        else:
+            self._file = open(filename, 'rb')
+            self.size = os.path.getsize(filename)
+            self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+        # offsets[k] is the byte offset of line k * stride
+        self.offsets = array('Q', [0])
+        self.lock = threading.Lock()
+        self._lines = 0           # complete lines indexed so far
+        self._scanned = 0         # bytes scanned so far
+        self.complete = False
+        self.closed = False
+
+        self.thread = threading.Thread(target=self._build, daemon=True)
+        self.thread.start()
+
+    # ─── Index building ─────────────────────────────────────────────────────
+    def _build(self):
+        """Scan the mapping for newlines chunk by chunk (vectorized with numpy)"""
+        if self.decompressing:
+            self._decompress()
+        pos = 0
+        while pos < self.size and not self.closed:
+            end = min(pos + self.chunk_size, self.size)
+            chunk = np.frombuffer(self.mm, dtype=np.uint8, count=end - pos, offset=pos)
+            starts = np.flatnonzero(chunk == 10) + (pos + 1)  # offset of the following line
+
+            with self.lock:
+                first_line = self._lines + 1
+                keep = starts[(-first_line) % self.stride::self.stride]
+                self.offsets.frombytes(keep.astype(np.uint64).tobytes())
+                self._lines += len(starts)
+                self._scanned = end
+            pos = end
+
+        with self.lock:
+            # A trailing line without '\n' still counts as a line
+            if self.size and self.mm[self.size - 1:self.size] != b"\n":
+                self._lines += 1
+            self.complete = True
+
+    def _decompress(self):
+        """Inflate the .gz file into the temporary file, then map it"""
+        try:
+            with gzip.open(self.filename, 'rb') as src:
+                while not self.closed:
+                    block = src.read(1024 * 1024)
+                    if not block:
+                        break
+                    self._file.write(block)
+            mapped = self._file.tell() and not self.closed
+            mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if mapped else b""
+        except (OSError, EOFError) as e:
+            print(f"Log decompress error: {e}")
+            mm = b""
+        with self.lock:
+            self.mm = mm
+            self.size = len(mm)
+            self.decompressing = False
+
+    @property
+    def line_count(self):
+        """Number of lines available so far"""
+        with self.lock:
+            return self._lines
+
+    @property
+    def progress(self):
+        """Fraction of the file indexed so far"""
+        if not self.size:
+            return 0.0 if self.decompressing else 1.0
+        with self.lock:
+            return self._scanned / self.size
+
+    # ─── Random access ──────────────────────────────────────────────────────
+    def _offset_of(self, line_no):
+        """Byte offset of line `line_no` (0-based)"""
+        with self.lock:
+            base = self.offsets[line_no // self.stride]
+        pos = base
+        for _ in range(line_no % self.stride):
+            nl = self.mm.find(b"\n", pos)
+            if nl < 0:
+                return self.size
+            pos = nl + 1
+        return pos
+
+    def get_lines(self, start, count):
+        """Return up to `count` decoded lines starting at line `start`"""
+        total = self.line_count
+        start = max(0, min(start, total))
+        count = max(0, min(count, total - start))
+        if not count:
+            return []
+
+        pos = self._offset_of(start)
+        lines = []
+        for _ in range(count):
+            nl = self.mm.find(b"\n", pos)
+            end = nl if nl >= 0 else self.size
+            lines.append(self.mm[pos:end].rstrip(b"\r").decode(self.encoding, errors='replace'))
+            if nl < 0:
+                break
+            pos = nl + 1
+        return lines
+
+    def get_line(self, line_no):
+        lines = self.get_lines(line_no, 1)
+        return lines[0] if lines else ""
+
+    def _timestamp_at(self, line_no, lookahead=16):
+        """Parse the timestamp of `line_no`, looking a few lines ahead for one"""
+        pos = self._offset_of(line_no)
+        for _ in range(lookahead):
+            if pos >= self.size:
+                return None
+            match = TIMESTAMP_PREFIX.match(self.mm[pos:pos + 40])
+            if match:
+                try:
+                    return datetime.fromisoformat(match.group(1).decode('ascii'))
+                except ValueError:
+                    pass
+            nl = self.mm.find(b"\n", pos)
+            if nl < 0:
+                return None
+            pos = nl + 1
+        return None
+
+    def find_timestamp(self, timestamp):
+        """
+        Return the first line whose timestamp is >= `timestamp`, by binary
+        search over the indexed lines (timestamps must be non-decreasing).
+        """
+        lo, hi = 0, self.line_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self._timestamp_at(mid)
+            if ts is None or ts >= timestamp:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def close(self):
+        """Stop indexing and release the mapping"""
+        self.closed = True
+        self.thread.join()
+        if self.size:
+            self.mm.close()
+        self._file.close()
@@ -0,0 +1,154 @@
+import tkinter as tk
+from datetime import datetime
+import customtkinter as ctk
+import config
+
+
+class LogViewerWindow:
+    """Paged viewer for a LineIndex; only the visible page is ever decoded"""
+
+    def __init__(self, parent, line_index, page_size=60):
+        self.parent = parent
+        self.index = line_index
+        self.page_size = page_size
+        self.top_line = 0
+        self._poll_id = None
+
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title(f"Log Viewer - {line_index.filename}")
+        self.window.geometry("900x650")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.setup_ui()
+        self.show_page(0)
+        self.poll_progress()
+
+    def setup_ui(self):
+        """Setup the viewer UI"""
+        nav_frame = ctk.CTkFrame(self.window)
+        nav_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(nav_frame, text="Line:").pack(side="left", padx=5)
+        self.line_entry = ctk.CTkEntry(nav_frame, width=100)
+        self.line_entry.pack(side="left", padx=5)
+        self.line_entry.bind("<Return>", lambda e: self.goto_line())
+        ctk.CTkButton(nav_frame, text="Go", width=50,
+                      command=self.goto_line).pack(side="left", padx=5)
+
+        ctk.CTkLabel(nav_frame, text="Time:").pack(side="left", padx=(15, 5))
+        self.time_entry = ctk.CTkEntry(nav_frame, width=200,
+                                       placeholder_text="YYYY-MM-DD HH:MM:SS")
+        self.time_entry.pack(side="left", padx=5)
+        self.time_entry.bind("<Return>", lambda e: self.goto_time())
+        ctk.CTkButton(nav_frame, text="Go", width=50,
+                      command=self.goto_time).pack(side="left", padx=5)
+
+        self.status_label = ctk.CTkLabel(nav_frame, text="")
+        self.status_label.pack(side="right", padx=5)
+
+        text_frame = ctk.CTkFrame(self.window, fg_color=config.BG_COLOR)
+        text_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        text_frame.grid_columnconfigure(0, weight=1)
+        text_frame.grid_rowconfigure(0, weight=1)
+
+        self.text = tk.Text(
+            text_frame, bg=config.TERMINAL_BG, fg=config.TERMINAL_FG,
+            font=("Courier", 10), state="disabled", bd=0,
+            highlightthickness=0, wrap="none"
+        )
+        self.text.grid(row=0, column=0, sticky="nsew")
+
+        # The scrollbar maps onto line numbers, not onto the Text contents
+        self.v_scroll = tk.Scrollbar(text_frame, orient="vertical", command=self.on_scroll)
+        self.v_scroll.grid(row=0, column=1, sticky="ns")
+        h_scroll = tk.Scrollbar(text_frame, orient="horizontal", command=self.text.xview)
+        h_scroll.grid(row=1, column=0, sticky="ew")
+        self.text.config(xscrollcommand=h_scroll.set)
+
+        self.text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll_lines(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll_lines(3))
+        self.text.bind("<Prior>", lambda e: self.scroll_lines(-self.page_size))
+        self.text.bind("<Next>", lambda e: self.scroll_lines(self.page_size))
+
+    def show_page(self, top_line):
+        """Render `page_size` lines starting at `top_line`"""
+        total = self.index.line_count
+        self.top_line = max(0, min(top_line, max(0, total - self.page_size)))
+        lines = self.index.get_lines(self.top_line, self.page_size)
+
+        width = len(str(max(total, 1)))
+        content = "".join(f"{self.top_line + i + 1:>{width}}  {line}\n"
+                          for i, line in enumerate(lines))
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content)
+        self.text.config(state="disabled")
+
+        if total:
+            first = self.top_line / total
+            last = min(1.0, (self.top_line + len(lines)) / total)
+            self.v_scroll.set(first, last)
+        else:
+            self.v_scroll.set(0.0, 1.0)
+
+    def scroll_lines(self, delta):
+        self.show_page(self.top_line + delta)
+        return "break"
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_lines(-3 if event.delta > 0 else 3)
+
+    def on_scroll(self, action, *args):
+        """Translate scrollbar commands into line numbers"""
+        if action == "moveto":
+            self.show_page(int(float(args[0]) * self.index.line_count))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            step = self.page_size if unit == "pages" else 1
+            self.show_page(self.top_line + amount * step)
+
+    def goto_line(self):
+        try:
+            line_no = int(self.line_entry.get()) - 1
+        except ValueError:
+            return
+        self.show_page(line_no)
+
+    def goto_time(self):
+        try:
+            timestamp = datetime.fromisoformat(self.time_entry.get().strip())
+        except ValueError:
+            self.status_label.configure(text="Invalid time")
+            return
+        self.show_page(self.index.find_timestamp(timestamp))
+
+    def poll_progress(self):
+        """Refresh the status while the index is still being built"""
+        total = self.index.line_count
+        if self.index.complete:
+            self.status_label.configure(text=f"{total:,} lines")
+            self.show_page(self.top_line)
+            self._poll_id = None
+            return
+        if self.index.decompressing:
+            self.status_label.configure(text="Decompressing…")
+        else:
+            self.status_label.configure(
+                text=f"Indexing… {self.index.progress * 100:.0f}% ({total:,} lines)")
+        if self.text.index("end-1c") == "1.0":
+            self.show_page(self.top_line)
+        else:
+            # Keep the scrollbar proportional to the growing line count
+            self.v_scroll.set(self.top_line / max(total, 1),
+                              min(1.0, (self.top_line + self.page_size) / max(total, 1)))
+        self._poll_id = self.window.after(200, self.poll_progress)
+
+    def close(self):
+        if self._poll_id:
+            try:
+                self.window.after_cancel(self._poll_id)
+            except:
+                pass
+        self.index.close()
+        self.window.destroy()
@@ -0,0 +1,146 @@
+import sys
+import threading
+from datetime import datetime
+
+from records import RawEntry, Sample
+
+# Approximate CPython sizes used to charge buffered objects
+DATETIME_BYTES = sys.getsizeof(datetime.now())
+FLOAT_BYTES = sys.getsizeof(0.5)
+POINTER_BYTES = 8
+KEY_BYTES = 8  # one double in a TimeSeriesBuffer key array
+
+RAW_ENTRY_BYTES = sys.getsizeof(RawEntry(None, "")) + DATETIME_BYTES + POINTER_BYTES + KEY_BYTES
+SAMPLE_BYTES = sys.getsizeof(Sample(None, "", "", 0.0)) + FLOAT_BYTES + 2 * (POINTER_BYTES + KEY_BYTES)
+PLOT_POINT_BYTES = DATETIME_BYTES + FLOAT_BYTES + 2 * POINTER_BYTES
+
+
+def sizeof_raw_entry(entry):
+    """Bytes held by one buffered RawEntry (including its line text)"""
+    return RAW_ENTRY_BYTES + sys.getsizeof(entry.data)
+
+
+def sizeof_sample(sample):
+    """Bytes held by one buffered Sample (a shared RawEntry is charged to the raw buffer)"""
+    size = SAMPLE_BYTES
+    if isinstance(sample.line, str):
+        size += sys.getsizeof(sample.line) + DATETIME_BYTES
+    return size
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class BudgetAccount:
+    """Byte budget (and optional maximum age in seconds) for one buffer"""
+
+    def __init__(self, name, budget_bytes, max_age=None):
+        self.name = name
+        self.budget = budget_bytes
+        self.max_age = max_age
+        self.used = 0
+        self.evicted = 0
+
+    def charge(self, size):
+        self.used += size
+
+    def release(self, size, evicted=True):
+        self.used = max(0, self.used - size)
+        if evicted:
+            self.evicted += 1
+
+    def reset(self):
+        self.used = 0
+
+    @property
+    def over_budget(self):
+        return self.used > self.budget
+
+    def too_old(self, timestamp, newest):
+        """Whether an entry at `timestamp` has aged out relative to `newest`"""
+        return self.max_age is not None and (newest - timestamp).total_seconds() > self.max_age
+
+
+class MemoryBudget:
+    """
+    Central registry of per-buffer byte budgets. Buffers charge what they
+    store and evict oldest-first when over budget or past their maximum
+    age; usage() reports the totals per subsystem.
+    """
+
+    def __init__(self):
+        self.accounts = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, budget_bytes, max_age=None):
+        """Create (or replace) the account for buffer `name`"""
+        account = BudgetAccount(name, budget_bytes, max_age)
+        with self.lock:
+            self.accounts[name] = account
+        return account
+
+    def unregister(self, prefix):
+        """Drop every account whose name starts with `prefix` (a closed session)"""
+        with self.lock:
+            for name in [name for name in self.accounts if name.startswith(prefix)]:
+                del self.accounts[name]
+
+    def scoped(self, prefix, scale=1.0):
+        """View that registers accounts as '<prefix> <name>' with budgets scaled by `scale`"""
+        return ScopedBudget(self, prefix, scale)
+
+    def usage(self):
+        """Get {name: {'used', 'budget', 'evicted'}} for every buffer"""
+        with self.lock:
+            accounts = list(self.accounts.values())
+        return {
+            account.name: {
+                'used': account.used,
+                'budget': account.budget,
+                'evicted': account.evicted
+            }
+            for account in accounts
+        }
+
+    def total_used(self):
+        with self.lock:
+            return sum(account.used for account in self.accounts.values())
+
+    def describe(self):
+        """Human readable per-subsystem memory report"""
+        lines = []
+        for name, info in sorted(self.usage().items()):
+            percent = 100.0 * info['used'] / info['budget'] if info['budget'] else 0.0
+            lines.append(f"  {name}: {format_bytes(info['used'])} / "
+                         f"{format_bytes(info['budget'])} ({percent:.0f}%), "
+                         f"evicted {info['evicted']}")
+        return "\n".join(lines)
+
+
+class ScopedBudget:
+    """Registers accounts under a prefix (and scaled budget) in a shared MemoryBudget"""
+
+    def __init__(self, parent, prefix, scale=1.0):
+        self.parent = parent
+        self.prefix = prefix
+        self.scale = scale
+
+    def register(self, name, budget_bytes, max_age=None):
+        return self.parent.register(f"{self.prefix} {name}", int(budget_bytes * self.scale), max_age)
+
+    def release(self):
+        """Drop this scope's accounts from the shared budget"""
+        self.parent.unregister(f"{self.prefix} ")
+
+    def usage(self):
+        return self.parent.usage()
+
+    def total_used(self):
+        return self.parent.total_used()
+
+    def describe(self):
+        return self.parent.describe()
@@ -0,0 +1,219 @@
+import re
+import json
+import time
+
+import config
+
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+# k1=v1,k2=v2 (also ';' or whitespace separated); the value must end the pair
+KV_PAIR = re.compile(r'([A-Za-z_][\w.\-]*)\s*=\s*(' + NUMBER + r')(?=\s*(?:[,;\s]|$))')
+HEADER_FIELD = re.compile(r'^[A-Za-z_][\w.\-]*$')
+
+
+class TelemetryParser:
+    """
+    Base class for line parser plugins. A parser claims the lines whose
+    first non-blank character is in `first_chars` (None: every line no
+    other parser claims) and returns (type, name, value) tuples.
+    """
+
+    name = "parser"
+    first_chars = None
+    wants_headers = False
+
+    def __init__(self, data_type=config.TELEMETRY_DATA_TYPE):
+        self.data_type = data_type
+        self.lines = 0
+        self.samples = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def parse(self, line):
+        raise NotImplementedError
+
+    def accept_header(self, line):
+        """Offered lines no parser produced samples from (see wants_headers)"""
+        return False
+
+    def run(self, line):
+        """parse() with throughput and error accounting"""
+        started = time.perf_counter()
+        try:
+            results = self.parse(line)
+        except Exception:
+            self.errors += 1
+            results = []
+        self.seconds += time.perf_counter() - started
+        self.lines += 1
+        self.samples += len(results)
+        return results
+
+    def get_statistics(self):
+        return {
+            'parser': self.name,
+            'lines': self.lines,
+            'samples': self.samples,
+            'errors': self.errors,
+            'lines_per_second': self.lines / self.seconds if self.seconds > 0 else 0.0
+        }
+
+
+class JsonParser(TelemetryParser):
+    """One JSON object per line; nested keys are joined with '.'"""
+
+    name = "json"
+    first_chars = "{"
+
+    def parse(self, line):
+        if not line.rstrip().endswith("}"):
+            return []
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            self.errors += 1
+            return []
+        results = []
+        self._flatten(obj, "", results)
+        return results
+
+    def _flatten(self, obj, prefix, results):
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                self._flatten(value, f"{prefix}{key}.", results)
+        elif isinstance(obj, list):
+            for index, value in enumerate(obj):
+                self._flatten(value, f"{prefix}{index}.", results)
+        elif isinstance(obj, bool):
+            results.append((self.data_type, prefix[:-1], 1.0 if obj else 0.0))
+        elif isinstance(obj, (int, float)):
+            results.append((self.data_type, prefix[:-1], float(obj)))
+
+
+class KeyValueParser(TelemetryParser):
+    """`k1=v1,k2=v2` pairs with numeric values"""
+
+    name = "kv"
+    first_chars = None
+
+    def parse(self, line):
+        if '=' not in line:
+            return []
+        return [(self.data_type, key, float(value)) for key, value in KV_PAIR.findall(line)]
+
+
+class CsvRowParser(TelemetryParser):
+    """
+    Bare numeric CSV rows. Column names come from the last header line
+    seen (a comma-separated list of identifiers), else col1, col2, ...
+    """
+
+    name = "csv"
+    first_chars = "0123456789-+."
+    wants_headers = True
+
+    def __init__(self, data_type=config.TELEMETRY_DATA_TYPE, header=None):
+        super().__init__(data_type)
+        self.header = header
+
+    def accept_header(self, line):
+        fields = [field.strip() for field in line.lstrip('#').split(',')]
+        if len(fields) < 2 or not all(HEADER_FIELD.match(field) for field in fields):
+            return False
+        self.header = fields
+        return True
+
+    def parse(self, line):
+        if ',' not in line:
+            return []
+        try:
+            values = [float(field) for field in line.split(',')]
+        except ValueError:
+            return []
+        header = self.header
+        if header is None or len(header) != len(values):
+            header = [f"col{i}" for i in range(1, len(values) + 1)]
+        return [(self.data_type, name, value) for name, value in zip(header, values)]
+
+
+# Built-in parsers, by the names used in config.TELEMETRY_PARSERS
+PARSER_CLASSES = {
+    'json': JsonParser,
+    'kv': KeyValueParser,
+    'csv': CsvRowParser
+}
+
+
+class ParserRegistry:
+    """
+    Dispatches each line to one parser by its first non-blank character,
+    so a line costs a dict lookup plus one parser. Lines that yield
+    nothing and contain a ',' are offered to header-aware parsers.
+    """
+
+    def __init__(self, parsers=()):
+        self.parsers = []
+        self.by_char = {}
+        self.default = None
+        self.header_parsers = []
+        for parser in parsers:
+            self.register(parser)
+
+    def register(self, parser):
+        """Add a parser plugin (replacing one with the same name)"""
+        self.unregister(parser.name)
+        self.parsers.append(parser)
+        self._rebuild()
+
+    def unregister(self, name):
+        self.parsers = [parser for parser in self.parsers if parser.name != name]
+        self._rebuild()
+
+    def _rebuild(self):
+        self.by_char = {}
+        self.default = None
+        for parser in self.parsers:
+            if parser.first_chars is None:
+                self.default = parser
+            else:
+                for char in parser.first_chars:
+                    self.by_char[char] = parser
+        self.header_parsers = [parser for parser in self.parsers if parser.wants_headers]
+
+    def parse(self, line):
+        """Extract (type, name, value) tuples with the parser the line selects"""
+        line = line.strip()
+        if not line:
+            return []
+        parser = self.by_char.get(line[0], self.default)
+        results = parser.run(line) if parser is not None else []
+        if not results and self.header_parsers and ',' in line:
+            for header_parser in self.header_parsers:
+                header_parser.accept_header(line)
+        return results
+
+    def get_statistics(self):
+        return [parser.get_statistics() for parser in self.parsers]
+
+    def specs(self):
+        """(parser names, csv header) - enough to rebuild the registry in a worker"""
+        header = None
+        for parser in self.parsers:
+            if isinstance(parser, CsvRowParser):
+                header = parser.header
+        return (tuple(parser.name for parser in self.parsers if parser.name in PARSER_CLASSES),
+                tuple(header) if header else None)
+
+    @classmethod
+    def from_specs(cls, specs):
+        names, header = specs
+        registry = cls(PARSER_CLASSES[name]() for name in names)
+        for parser in registry.parsers:
+            if isinstance(parser, CsvRowParser) and header:
+                parser.header = list(header)
+        return registry
+
+    @classmethod
+    def default_registry(cls, names=None):
+        names = config.TELEMETRY_PARSERS if names is None else names
+        return cls(PARSER_CLASSES[name]() for name in names if name in PARSER_CLASSES)
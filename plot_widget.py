@@ -7,11 +7,15 @@ import numpy as np
 from collections import deque
 from datetime import datetime, timedelta
 import threading
+import config
+from memory_budget import MemoryBudget, PLOT_POINT_BYTES
 
 class PlotWidget:
-    def __init__(self, parent, max_points=1000):
+    def __init__(self, parent, max_points=None, memory_budget=None):
         self.parent = parent
-        self.max_points = max_points
+        self.max_points = max_points  # optional per-series cap on top of the byte budget
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.account = self.memory_budget.register("Plot", config.PLOT_BUDGET, config.PLOT_MAX_AGE)
         self.destroyed = False
         self.animation = None  # Initialize animation reference
         self.canvas = None
@@ -172,8 +176,6 @@ class PlotWidget:
         if self.destroyed:
             return
         
-        print(f"DEBUG: Adding data point - name: '{name}', value: {value}, timestamp: {timestamp}")
-        
         with self.lock:
             # Create series if it doesn't exist
             if name not in self.data_series:
@@ -184,21 +186,56 @@ class PlotWidget:
                     'values': deque(maxlen=self.max_points),
                     'color': color
                 }
-                print(f"DEBUG: Created new series '{name}' with color {color}")
                 # Update series listbox
                 try:
                     self.series_listbox.insert(tk.END, name)
                     # Auto-select new series
                     self.series_listbox.selection_set(tk.END)
                     self.selected_series.add(name)
-                    print(f"DEBUG: Added '{name}' to listbox and selected series")
                 except:
                     pass
             
             # Add data point
-            self.data_series[name]['timestamps'].append(timestamp)
-            self.data_series[name]['values'].append(value)
-            print(f"DEBUG: Added data point to series '{name}'. Series now has {len(self.data_series[name]['values'])} points")
+            series = self.data_series[name]
+            if series['timestamps'].maxlen == len(series['timestamps']):
+                self.account.release(PLOT_POINT_BYTES)  # the deque drops its oldest point
+            series['timestamps'].append(timestamp)
+            series['values'].append(value)
+            self.account.charge(PLOT_POINT_BYTES)
+            self._evict(series, timestamp)
+    
+    def _evict(self, series, newest):
+        """Drop aged-out points of `series`, then the oldest points overall while over budget"""
+        timestamps = series['timestamps']
+        while timestamps and self.account.too_old(timestamps[0], newest):
+            timestamps.popleft()
+            series['values'].popleft()
+            self.account.release(PLOT_POINT_BYTES)
+        
+        while self.account.over_budget:
+            candidates = [s for s in self.data_series.values() if s['timestamps']]
+            if not candidates:
+                break
+            oldest = min(candidates, key=lambda s: s['timestamps'][0])
+            oldest['timestamps'].popleft()
+            oldest['values'].popleft()
+            self.account.release(PLOT_POINT_BYTES)
+    
+    def add_data_points(self, name, timestamps, values):
+        """Add many points to a series at once (e.g. from an imported log)"""
+        if self.destroyed or not timestamps:
+            return
+        
+        # Create the series (and its listbox entry) through the normal path
+        self.add_data_point(timestamps[0], values[0], name)
+        with self.lock:
+            series = self.data_series[name]
+            before = len(series['timestamps'])
+            series['timestamps'].extend(timestamps[1:])
+            series['values'].extend(values[1:])
+            added = len(series['timestamps']) - before
+            self.account.charge(added * PLOT_POINT_BYTES)
+            self._evict(series, timestamps[-1])
     
     def update_plot(self, frame):
         """Update the plot with new data"""
@@ -464,6 +501,7 @@ class PlotWidget:
             for series_data in self.data_series.values():
                 series_data['timestamps'].clear()
                 series_data['values'].clear()
+            self.account.reset()
             
             # Clear plot lines
             for line in self.plot_lines.values():
@@ -0,0 +1,90 @@
+import os
+import json
+import threading
+
+import serial.tools.list_ports
+
+import config
+
+
+def describe_port(info):
+    """JSON-friendly summary of a comports() entry"""
+    return {
+        'device': info.device,
+        'description': info.description,
+        'vid': info.vid,
+        'pid': info.pid,
+        'serial_number': info.serial_number,
+        'location': info.location
+    }
+
+
+class PortScanner:
+    """
+    Enumerates serial ports on a background thread, so slow comports()
+    calls (many USB-serial adapters) never block Tk. The last list is
+    cached in a JSON file and available as `ports` right away at
+    startup; each scan is diffed against it and on_change(ports, added,
+    removed) runs (on the scanner thread) only when something changed.
+    """
+
+    def __init__(self, on_change=None, cache_path=config.PORT_CACHE_JSON):
+        self.on_change = on_change
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.thread = None
+        self.rescan = False
+        self.ports = self.load()
+
+    def load(self):
+        if not os.path.exists(self.cache_path):
+            return []
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return [port for port in json.load(f) if port.get('device')]
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Port cache load error: {e}")
+            return []
+
+    def save(self):
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.ports, f, indent=1)
+        except OSError as e:
+            print(f"Port cache save error: {e}")
+
+    def scan(self):
+        """Start a scan; a request while one is running triggers one more afterwards"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                self.rescan = True
+                return
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            self._scan()
+            with self.lock:
+                if not self.rescan:
+                    return
+                self.rescan = False
+
+    def _scan(self):
+        try:
+            ports = sorted((describe_port(info) for info in serial.tools.list_ports.comports()),
+                           key=lambda port: port['device'])
+        except Exception as e:
+            print(f"Port scan error: {e}")
+            return
+        if ports == self.ports:
+            return
+        previous = {port['device'] for port in self.ports}
+        current = {port['device'] for port in ports}
+        self.ports = ports
+        self.save()
+        if self.on_change:
+            try:
+                self.on_change(ports, sorted(current - previous), sorted(previous - current))
+            except Exception as e:
+                print(f"Port change callback error: {e}")
@@ -0,0 +1,162 @@
+import os
+import time
+import random
+import threading
+
+import serial
+import serial.tools.list_ports
+
+import config
+
+# Ports open in this process, so a watcher never follows its device onto
+# a port another session already holds
+_open_ports = set()
+_open_lock = threading.Lock()
+
+
+def claim_port(name):
+    with _open_lock:
+        _open_ports.add(name)
+
+
+def release_port(name):
+    with _open_lock:
+        _open_ports.discard(name)
+
+
+def open_ports():
+    with _open_lock:
+        return set(_open_ports)
+
+
+class Backoff:
+    """Exponential backoff: delays grow by `factor` up to `maximum`, each shortened by up to `jitter` (0-1)"""
+
+    def __init__(self, initial=config.RECONNECT_INITIAL_DELAY, maximum=config.RECONNECT_MAX_DELAY,
+                 factor=config.RECONNECT_FACTOR, jitter=config.RECONNECT_JITTER):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next(self):
+        delay = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts = min(self.attempts + 1, 64)
+        return delay * (1.0 - self.jitter * random.random())
+
+    def reset(self):
+        self.attempts = 0
+
+
+class DeviceIdentity:
+    """USB identity of a port, used to find the device again under another name"""
+
+    def __init__(self, vid, pid, serial_number=None, location=None):
+        self.vid = vid
+        self.pid = pid
+        self.serial_number = serial_number
+        self.location = location
+
+    @classmethod
+    def of(cls, device, ports=None):
+        """Identity of the port named `device`, or None (not a USB device / not present)"""
+        for info in ports if ports is not None else serial.tools.list_ports.comports():
+            if info.device == device and info.vid is not None:
+                return cls(info.vid, info.pid, info.serial_number, info.location)
+        return None
+
+    def matches(self, info):
+        if info.vid != self.vid or info.pid != self.pid:
+            return False
+        return self.serial_number is None or info.serial_number == self.serial_number
+
+    def __str__(self):
+        text = f"{self.vid:04X}:{self.pid:04X}"
+        return f"{text} SN {self.serial_number}" if self.serial_number else text
+
+
+class DeviceWatcher:
+    """
+    Finds a lost device again, by VID/PID/serial number when known (so a
+    device that comes back as another /dev/ttyUSBn or COMn is followed),
+    else by its port name. Arrivals are noticed cheaply: on POSIX by
+    listing /dev, elsewhere by polling the port list every
+    RECONNECT_SCAN_INTERVAL; the full port list is only read to match
+    the identity. Ports open in this process (see claim_port) are never
+    candidates, and when several identical devices remain without a
+    serial number or location to tell them apart, none is picked.
+    """
+
+    def __init__(self, port, identity=None):
+        self.port = port
+        self.identity = identity
+        self._signature = None
+
+    def identify(self):
+        """Look up the identity of the (present) port"""
+        try:
+            self.identity = DeviceIdentity.of(self.port)
+        except Exception as e:
+            print(f"Device lookup error: {e}")
+
+    def signature(self):
+        if os.name == 'posix' and os.path.isdir('/dev'):
+            return frozenset(os.listdir('/dev'))
+        return frozenset(info.device for info in serial.tools.list_ports.comports())
+
+    def locate(self):
+        """Current name of the device, or None while it is absent (or ambiguous)"""
+        taken = open_ports()
+        if self.identity is None:
+            if self.port in taken:
+                return None
+            if os.name == 'posix':
+                return self.port if os.path.exists(self.port) else None
+            return self.port  # nothing to match against; try the name
+        candidates = [info for info in serial.tools.list_ports.comports()
+                      if self.identity.matches(info) and info.device not in taken]
+        for info in candidates:
+            if info.device == self.port:
+                return info.device
+        for info in candidates:
+            if self.identity.location and info.location == self.identity.location:
+                return info.device
+        if len(candidates) == 1:
+            return candidates[0].device
+        return None
+
+    def wait(self, timeout, cancel):
+        """Wait up to `timeout` seconds; True as soon as ports appear or disappear, or `cancel` is set"""
+        deadline = time.monotonic() + timeout
+        previous = self._signature if self._signature is not None else self.signature()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._signature = previous
+                return False
+            if cancel.wait(min(remaining, config.RECONNECT_SCAN_INTERVAL)):
+                return True
+            current = self.signature()
+            if current != previous:
+                self._signature = current
+                return True
+
+
+def reopen(watcher, open_port, cancel):
+    """
+    Block until the watched device is present and open_port(name)
+    succeeds; returns (port, name), or None once `cancel` is set.
+    """
+    backoff = Backoff()
+    while not cancel.is_set():
+        name = watcher.locate()
+        if name is not None:
+            try:
+                port = open_port(name)
+                watcher.port = name
+                return port, name
+            except (serial.SerialException, OSError, ValueError):
+                pass
+        watcher.wait(backoff.next(), cancel)
+    return None
@@ -0,0 +1,134 @@
+import sys
+
+
+class RawEntry:
+    """
+    One received line. Replaces the old {'timestamp', 'data', 'raw'} dict:
+    the stripped copy is computed on demand instead of stored.
+    """
+
+    __slots__ = ('timestamp', 'data')
+
+    FIELDS = ('timestamp', 'data', 'raw')
+
+    def __init__(self, timestamp, data):
+        self.timestamp = timestamp
+        self.data = data
+
+    @property
+    def raw(self):
+        return self.data.strip()
+
+    # Mapping-style access for code written against the old dicts
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    copy = to_dict
+
+    def __repr__(self):
+        return f"RawEntry({self.timestamp!r}, {self.data!r})"
+
+
+class Sample:
+    """
+    One structured (type, name, value) sample. The series name is interned
+    and the source line is shared with the RawEntry rather than copied.
+    """
+
+    __slots__ = ('timestamp', 'type', 'name', 'value', 'line')
+
+    FIELDS = ('timestamp', 'type', 'name', 'value', 'raw_data')
+
+    def __init__(self, timestamp, data_type, name, value, line=None):
+        self.timestamp = timestamp
+        self.type = data_type
+        self.name = sys.intern(name)
+        self.value = value
+        self.line = line  # RawEntry, plain string or None
+
+    @property
+    def raw_data(self):
+        line = self.line
+        if line is None:
+            return ''
+        if isinstance(line, RawEntry):
+            return line.data.strip()
+        return line
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    copy = to_dict
+
+    def __repr__(self):
+        return f"Sample({self.timestamp!r}, {self.type!r}, {self.name!r}, {self.value!r})"
+
+
+def measure_footprint(count=100000):
+    """
+    Memory benchmark: bytes per buffered line (with one structured sample)
+    for the old dict layout versus the slotted records.
+    """
+    import tracemalloc
+    from datetime import datetime, timedelta
+
+    start = datetime.now()
+    lines = [f"[PLOT] voltage_{i % 8}: {i * 0.001:.3f}\n" for i in range(count)]
+    stamps = [start + timedelta(microseconds=i) for i in range(count)]
+
+    def build_dicts():
+        out = []
+        for timestamp, data in zip(stamps, lines):
+            out.append({'timestamp': timestamp, 'data': data, 'raw': data.strip()})
+            out.append({'timestamp': timestamp, 'type': 'PLOT', 'name': data[7:16].strip(),
+                        'value': float(data[18:]), 'raw_data': data.strip()})
+        return out
+
+    def build_records():
+        out = []
+        for timestamp, data in zip(stamps, lines):
+            entry = RawEntry(timestamp, data)
+            out.append(entry)
+            out.append(Sample(timestamp, 'PLOT', data[7:16].strip(), float(data[18:]), entry))
+        return out
+
+    results = {}
+    for label, build in (('dict', build_dicts), ('records', build_records)):
+        tracemalloc.start()
+        kept = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = size / count
+        del kept
+    return results
+
+
+if __name__ == "__main__":
+    footprint = measure_footprint()
+    for label, per_line in footprint.items():
+        print(f"{label:>8}: {per_line:7.1f} bytes per line (+ the shared line text)")
+    print(f"   ratio: {footprint['dict'] / footprint['records']:.2f}x")
@@ -0,0 +1,195 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import config
+
+
+class RepeatJob:
+    """
+    A command fired every `interval` seconds. Deadlines are computed from
+    the start time (start + k * interval), so late firings never push the
+    schedule back; ticks that are already a full interval late are
+    skipped and counted as missed.
+    """
+
+    def __init__(self, name, interval, action, count=None):
+        self.name = name
+        self.interval = interval
+        self.action = action
+        self.remaining = count
+        self.active = True
+        self.start = time.perf_counter()
+        self.tick = 0
+        self.fired = 0
+        self.missed = 0
+        self.errors = 0
+        self.deviations = deque(maxlen=config.REPEAT_JITTER_SAMPLES)
+
+    def deadline(self, tick):
+        return self.start + tick * self.interval
+
+    def jitter(self):
+        """{'min','mean','max','p99'} deviation from the deadline in seconds (None before the first tick)"""
+        if not self.deviations:
+            return None
+        deviations = np.fromiter(self.deviations, dtype=float, count=len(self.deviations))
+        return {
+            'min': float(deviations.min()),
+            'mean': float(deviations.mean()),
+            'max': float(deviations.max()),
+            'p99': float(np.percentile(deviations, 99))
+        }
+
+    def get_statistics(self):
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'fired': self.fired,
+            'missed': self.missed,
+            'errors': self.errors,
+            'jitter': self.jitter()
+        }
+
+
+class RepeatScheduler:
+    """
+    Fires repeat jobs from one thread against a deadline heap. The thread
+    sleeps on a condition until shortly before the next deadline (adding
+    or removing a job wakes it) and spins for the last `spin` seconds, so
+    intervals below the OS timer granularity stay precise and the UI
+    thread is never involved. Actions run on the scheduler thread and
+    must be quick (e.g. SerialComm.send_message, which only enqueues).
+    """
+
+    def __init__(self, spin=config.REPEAT_SPIN_THRESHOLD):
+        self.spin = spin
+        self.jobs = {}
+        self.heap = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        with self.condition:
+            self.running = True
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def add(self, name, interval, action, count=None):
+        """
+        Repeat `action()` every `interval` seconds (replacing a job with the
+        same name); raises ValueError below config.REPEAT_MIN_INTERVAL.
+        """
+        if not config.REPEAT_MIN_INTERVAL <= interval < float('inf'):
+            raise ValueError(f"Repeat interval must be at least {config.REPEAT_MIN_INTERVAL * 1000:g} ms")
+        job = RepeatJob(name, interval, action, count)
+        with self.condition:
+            old = self.jobs.get(name)
+            if old:
+                old.active = False
+            self.jobs[name] = job
+            self._push(job, 1)
+            self.condition.notify()
+        self.start()
+        return job
+
+    def remove(self, name):
+        with self.condition:
+            job = self.jobs.pop(name, None)
+            if job:
+                job.active = False
+                self.condition.notify()
+
+    def clear(self):
+        with self.condition:
+            for job in self.jobs.values():
+                job.active = False
+            self.jobs = {}
+            self.heap = []
+            self.condition.notify()
+
+    def _push(self, job, tick):
+        job.tick = tick
+        heapq.heappush(self.heap, (job.deadline(tick), next(self.sequence), job))
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                deadline, _, job = self.heap[0]
+                if not job.active:
+                    heapq.heappop(self.heap)
+                    continue
+                delay = deadline - time.perf_counter()
+                if delay > self.spin:
+                    self.condition.wait(delay - self.spin)
+                    continue
+                heapq.heappop(self.heap)
+
+            while time.perf_counter() < deadline:
+                time.sleep(0)  # yield the GIL while spinning
+            self._fire(job, deadline)
+
+    def _fire(self, job, deadline):
+        fired_at = time.perf_counter()
+        job.deviations.append(fired_at - deadline)
+        try:
+            job.action()
+        except Exception as e:
+            job.errors += 1
+            print(f"Repeat job error: {e}")
+        job.fired += 1
+
+        with self.condition:
+            if job.remaining is not None:
+                job.remaining -= 1
+                if job.remaining <= 0:
+                    job.active = False
+            if not job.active:
+                if self.jobs.get(job.name) is job:
+                    del self.jobs[job.name]
+                return
+            tick = job.tick + 1
+            now = time.perf_counter()
+            if job.deadline(tick) + job.interval < now:
+                # More than a whole interval behind: skip to the next future tick
+                behind = int((now - job.start) / job.interval) + 1
+                job.missed += behind - tick
+                tick = behind
+            self._push(job, tick)
+
+    def get_statistics(self):
+        with self.condition:
+            jobs = list(self.jobs.values())
+        return [job.get_statistics() for job in jobs]
+
+
+if __name__ == "__main__":
+    scheduler = RepeatScheduler()
+    for name, interval in (("fast", 0.002), ("medium", 0.005), ("slow", 0.05)):
+        scheduler.add(name, interval, lambda: None)
+    time.sleep(2.0)
+    for stats in scheduler.get_statistics():
+        jitter = stats['jitter']
+        print(f"{stats['name']}: every {stats['interval'] * 1000:.0f} ms, fired {stats['fired']}, "
+              f"missed {stats['missed']}, jitter min {jitter['min'] * 1e6:.0f} / "
+              f"mean {jitter['mean'] * 1e6:.0f} / max {jitter['max'] * 1e6:.0f} / "
+              f"p99 {jitter['p99'] * 1e6:.0f} µs")
+    scheduler.stop()
@@ -0,0 +1,252 @@
+import re
+import time
+import itertools
+import threading
+from collections import OrderedDict
+
+import config
+
+NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+class PollRequest:
+    """
+    A command the RequestEngine polls. `{tag}` in the message is replaced
+    by the request tag. The value is taken from the `value` group (or
+    the first group) of `response`, else from the first number in the
+    reply, and stored as channel `channel` (default: the request name).
+    """
+
+    def __init__(self, name, message, response=None, channel=None, data_type=config.REQUEST_DATA_TYPE):
+        self.name = name
+        self.message = message
+        self.response = re.compile(response) if response else None
+        self.channel = channel or name
+        self.data_type = data_type
+
+    def parse(self, line):
+        if self.response is None:
+            match = NUMBER.search(line)
+            return float(match.group(0)) if match else None
+        match = self.response.search(line)
+        if match is None:
+            return None
+        if 'value' in match.groupdict():
+            return float(match.group('value'))
+        return float(match.group(1) if match.re.groups else NUMBER.search(match.group(0)).group(0))
+
+    def matches(self, line):
+        return self.response is None or self.response.search(line) is not None
+
+
+class RequestEngine:
+    """
+    Pipelined polling on top of SerialComm: up to `window` requests are
+    in flight at once, so the link is not idle for a full round trip per
+    request. Replies are matched in order ('order': the oldest request
+    takes the next line its response pattern accepts, so every request
+    needs one) or by tag ('tag': `tag_pattern` extracts the tag from the
+    reply). Requests without a reply within `timeout` seconds are
+    dropped and counted; in order mode that drops everything in flight
+    and pauses for one timeout so late replies drain unmatched. Parsed
+    values go to DataProcessor.add_sample. The first `baseline` requests
+    run one at a time to measure the unpipelined rate for comparison.
+    on_stopped(engine) runs (on the engine thread) if polling stops by
+    itself because a send failed.
+    """
+
+    def __init__(self, serial_comm, data_processor, requests, window=config.REQUEST_WINDOW,
+                 timeout=config.REQUEST_TIMEOUT, match='order', tag_pattern=config.REQUEST_TAG_PATTERN,
+                 baseline=config.REQUEST_BASELINE_SAMPLES, on_stopped=None):
+        if not requests:
+            raise ValueError("No requests to poll")
+        if match not in ('order', 'tag'):
+            raise ValueError(f"Unknown match mode '{match}'")
+        if match == 'order' and any(request.response is None for request in requests):
+            raise ValueError("Matching by order needs a reply pattern, or use tag matching")
+        self.serial_comm = serial_comm
+        self.data_processor = data_processor
+        self.requests = list(requests)
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.match = match
+        self.tag_regex = re.compile(tag_pattern)
+        self.baseline = baseline
+        self.on_stopped = on_stopped
+
+        self.condition = threading.Condition()
+        self.outstanding = OrderedDict()  # tag -> (request, sent perf_counter)
+        self.tags = itertools.count(1)
+        self.cycle = itertools.cycle(self.requests)
+        self.running = False
+        self.thread = None
+
+        self.issued = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.late = 0
+        self.resync_until = 0.0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.baseline_count = 0
+        self.baseline_latency = 0.0
+        self.pipeline_started = None
+        self.pipeline_base = 0
+        self.started = None
+        self.stopped = None
+
+    def start(self):
+        self.serial_comm.add_line_callback(self.on_lines)
+        self.running = True
+        self.started = time.perf_counter()
+        self.stopped = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.serial_comm.remove_line_callback(self.on_lines)
+        if self.stopped is None:
+            self.stopped = time.perf_counter()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                now = time.perf_counter()
+                self._expire(now)
+                if now < self.resync_until:
+                    self.condition.wait(self.resync_until - now)
+                    continue
+                window = self.window
+                failed = False
+                if self.pipeline_started is None:
+                    if self.completed + self.timeouts < self.baseline:
+                        window = 1
+                    else:
+                        self.pipeline_started = now
+                        self.pipeline_base = self.completed
+                while len(self.outstanding) < window:
+                    if not self._issue(next(self.cycle)):
+                        failed = True
+                        break
+                if failed:
+                    break
+                if self.outstanding:
+                    oldest = next(iter(self.outstanding.values()))[1]
+                    self.condition.wait(max(0.0, oldest + self.timeout - time.perf_counter()))
+                else:
+                    self.condition.wait(self.timeout)
+        self.stop()
+        if self.on_stopped:
+            try:
+                self.on_stopped(self)
+            except Exception as e:
+                print(f"Polling stop callback error: {e}")
+
+    def _issue(self, request):
+        tag = next(self.tags)
+        message = request.message.replace("{tag}", str(tag))
+        self.outstanding[tag] = (request, time.perf_counter())
+        self.issued += 1
+        if not self.serial_comm.send_message(message, label=request.name, echo=False):
+            del self.outstanding[tag]
+            self.errors += 1
+            return False
+        return True
+
+    def _expire(self, now):
+        while self.outstanding:
+            tag, (request, sent) = next(iter(self.outstanding.items()))
+            if now - sent <= self.timeout:
+                return
+            if self.match == 'order':
+                # Replies are matched by position: once one is missing, the ones in
+                # flight can no longer be attributed, so drop them all and let late
+                # replies drain before sending again
+                self.timeouts += len(self.outstanding)
+                self.outstanding.clear()
+                self.resync_until = now + self.timeout
+                return
+            del self.outstanding[tag]
+            self.timeouts += 1
+
+    def on_lines(self, lines, timestamp):
+        """SerialComm line callback (reader thread): complete matching requests"""
+        completed = []
+        with self.condition:
+            now = time.perf_counter()
+            for line in lines:
+                found = self._match(line, now)
+                if found is None:
+                    continue
+                request, sent, text = found
+                self.latency_total += now - sent
+                self.completed += 1
+                if self.pipeline_started is None:
+                    self.baseline_count += 1
+                    self.baseline_latency += now - sent
+                completed.append((request, text, line))
+            if completed:
+                self.condition.notify()
+
+        for request, text, line in completed:
+            try:
+                value = request.parse(text)
+            except (ValueError, AttributeError):
+                value = None
+            if value is None:
+                self.errors += 1
+                continue
+            self.data_processor.add_sample(request.data_type, request.channel, value, timestamp, line)
+
+    def _match(self, line, now):
+        if not self.outstanding:
+            if now < self.resync_until and any(request.matches(line) for request in self.requests):
+                self.late += 1  # reply to a request dropped by the last timeout
+            return None
+        if self.match == 'tag':
+            tag_match = self.tag_regex.search(line)
+            if tag_match is None:
+                return None
+            entry = self.outstanding.pop(int(tag_match.group(1)), None)
+            if entry is None:
+                return None  # late reply to a request that already timed out
+            text = line[:tag_match.start()] + line[tag_match.end():]
+            return entry[0], entry[1], text
+        tag, (request, sent) = next(iter(self.outstanding.items()))
+        if not request.matches(line):
+            return None
+        del self.outstanding[tag]
+        return request, sent, line
+
+    def owns(self, line):
+        """True if `line` looks like a reply to one of the polled requests"""
+        if self.match == 'tag':
+            return self.tag_regex.search(line) is not None
+        return any(request.matches(line) for request in self.requests)
+
+    def get_statistics(self):
+        """Pipelined throughput, and the speedup over one request per round trip"""
+        end = self.stopped or time.perf_counter()
+        elapsed = end - self.pipeline_started if self.pipeline_started else 0.0
+        rate = (self.completed - self.pipeline_base) / elapsed if elapsed > 0 else 0.0
+        latency = self.latency_total / self.completed if self.completed else 0.0
+        baseline = self.baseline_count / self.baseline_latency if self.baseline_latency > 0 else 0.0
+        return {
+            'running': self.running,
+            'issued': self.issued,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'late': self.late,
+            'errors': self.errors,
+            'in_flight': len(self.outstanding),
+            'window': self.window,
+            'requests_per_second': rate,
+            'mean_latency': latency,
+            'baseline_per_second': baseline,
+            'speedup': rate / baseline if baseline > 0 else 0.0
+        }
@@ -1,14 +1,25 @@
 import tkinter as tk
+from collections import deque
+
+import config
+from memory_budget import MemoryBudget
 
 class ScrollController:
-    def __init__(self, text_widget):
+    def __init__(self, text_widget, memory_budget=None, budget_bytes=config.TERMINAL_BUDGET):
         """
         text_widget: the tkinter Text widget used as the terminal.
+        memory_budget: shared MemoryBudget; the terminal text is trimmed
+        oldest-line-first to stay within `budget_bytes`.
         """
         self.text_widget = text_widget
         self.paused = False
         self.buffer = ""
 
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.account = self.memory_budget.register("Terminal", budget_bytes)
+        self.line_sizes = deque()   # size of every complete line in the widget
+        self.open_line_size = 0     # size of the trailing line without '\n' yet
+
     def pause(self):
         """Pause auto‐scrolling."""
         self.paused = True
@@ -26,7 +37,9 @@ class ScrollController:
         self.text_widget.insert(tk.END, self.buffer)
         self.text_widget.see(tk.END)
         self.text_widget.config(state="disabled")
+        self._account_text(self.buffer)
         self.buffer = ""
+        self._trim()
 
     def append(self, text):
         """
@@ -41,10 +54,51 @@ class ScrollController:
             self.text_widget.see(tk.END)
             self.text_widget.config(state="disabled")
 
-            # trim oldest lines if we're over the cap
-            max_lines = 10000
-            curr = int(self.text_widget.index('end-1c').split('.')[0])
-            if curr > max_lines:
-                self.text_widget.config(state="normal")
-                self.text_widget.delete('1.0', f'{curr-max_lines}.0')
-                self.text_widget.config(state="disabled")
+            self._account_text(text)
+            self._trim()
+
+    def remove_last_line(self):
+        """Remove the last complete line, e.g. a hex row about to be redrawn"""
+        if self.paused and self.buffer:
+            self.buffer = self.buffer[:self.buffer.rfind("\n", 0, len(self.buffer) - 1) + 1]
+            return
+        if self.open_line_size or not self.line_sizes:
+            return
+        size = self.line_sizes.pop()
+        self.account.release(size)
+        self.text_widget.config(state="normal")
+        self.text_widget.delete(f"end-{size + 1}c", "end-1c")
+        self.text_widget.config(state="disabled")
+
+    def reset(self):
+        """Forget the accounting after the widget was cleared externally"""
+        self.line_sizes.clear()
+        self.open_line_size = 0
+        self.account.reset()
+
+    def _account_text(self, text):
+        """Charge inserted text to the budget, tracking per-line sizes"""
+        self.account.charge(len(text))
+        parts = text.split("\n")
+        if len(parts) == 1:
+            self.open_line_size += len(text)
+            return
+        self.line_sizes.append(self.open_line_size + len(parts[0]) + 1)
+        for part in parts[1:-1]:
+            self.line_sizes.append(len(part) + 1)
+        self.open_line_size = len(parts[-1])
+
+    def _trim(self):
+        """Delete the oldest lines while the terminal is over its byte budget"""
+        if not self.account.over_budget:
+            return
+        # Trim to 90% so we do not delete a line on every append
+        target = self.account.budget * 0.9
+        lines = 0
+        while self.line_sizes and self.account.used > target:
+            self.account.release(self.line_sizes.popleft())
+            lines += 1
+        if lines:
+            self.text_widget.config(state="normal")
+            self.text_widget.delete('1.0', f'{lines + 1}.0')
+            self.text_widget.config(state="disabled")
@@ -0,0 +1,171 @@
+import re
+import time
+import threading
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+import config
+from memory_budget import MemoryBudget
+
+# Words are runs of letters, digits and underscores, matched case-insensitively
+TOKEN = re.compile(r'\w+')
+
+# Approximate cost of one vocabulary entry (dict slot, key str, empty array)
+TOKEN_BYTES = 160
+
+
+class SearchIndex:
+    """
+    Incremental inverted index (token -> ascending array of line numbers)
+    over the lines of a HistoryStore.
+
+    A background thread indexes new history lines every `interval`
+    seconds, so the reader thread never pays for tokenizing. Word queries
+    intersect posting arrays and return in milliseconds; regex queries
+    fall back to a scan of the compressed history. When the postings
+    exceed their byte budget the oldest quarter of the indexed lines is
+    dropped from the index (regex scans still reach them).
+    """
+
+    def __init__(self, history, memory_budget=None,
+                 budget_bytes=config.SEARCH_INDEX_BUDGET,
+                 interval=config.SEARCH_INDEX_INTERVAL):
+        self.history = history
+        self.interval = interval
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.account = self.memory_budget.register("Search index", budget_bytes)
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.postings = {}
+            self.first_indexed = 0   # oldest line number still indexed
+            self.indexed_upto = 0    # next line number to index
+            self.account.reset()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            try:
+                self.update()
+            except Exception as e:
+                print(f"Search index error: {e}")
+            time.sleep(self.interval)
+
+    # ─── Indexing ───────────────────────────────────────────────────────────
+    def update(self):
+        """Index every history line not indexed yet"""
+        with self.lock:
+            history = self.history
+            first = history.first_line
+            stop = history.next_line
+            if stop < self.indexed_upto:
+                # History was cleared underneath us
+                self.postings = {}
+                self.account.reset()
+                self.indexed_upto = self.first_indexed = first
+            if self.first_indexed < first:
+                self._drop_before(first)
+            start = max(self.indexed_upto, first)
+
+            postings = self.postings
+            account = self.account
+            for line_no, _, line in history.iter_lines(start, stop):
+                tokens = set(TOKEN.findall(line.lower()))
+                for token in tokens:
+                    posting = postings.get(token)
+                    if posting is None:
+                        posting = postings[token] = array('Q')
+                        account.charge(TOKEN_BYTES + len(token))
+                    posting.append(line_no)
+                account.charge(8 * len(tokens))
+            self.indexed_upto = stop
+
+            if account.over_budget and stop > self.first_indexed:
+                self._drop_before(self.first_indexed + (stop - self.first_indexed) // 4 + 1)
+
+    def _drop_before(self, line_no):
+        """Remove postings of lines older than `line_no`; caller holds the lock"""
+        account = self.account
+        for token in list(self.postings):
+            posting = self.postings[token]
+            cut = bisect_left(posting, line_no)
+            if not cut:
+                continue
+            if cut == len(posting):
+                del self.postings[token]
+                account.release(TOKEN_BYTES + len(token) + 8 * cut)
+            else:
+                del posting[:cut]
+                account.release(8 * cut, evicted=False)
+        self.first_indexed = line_no
+
+    # ─── Queries ────────────────────────────────────────────────────────────
+    def search(self, query, regex=False, case_sensitive=False):
+        """
+        Return the ascending numpy array of history line numbers matching
+        `query`: all of its words (whole words, any case), or the regex.
+        """
+        if regex:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            return self.scan(re.compile(query, flags))
+
+        tokens = set(TOKEN.findall(query.lower()))
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+
+        self.update()
+        with self.lock:
+            postings = [self.postings.get(token) for token in tokens]
+            if any(posting is None for posting in postings):
+                return np.empty(0, dtype=np.uint64)
+            postings.sort(key=len)
+            result = np.array(postings[0], dtype=np.uint64)
+            for posting in postings[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, np.frombuffer(posting, dtype=np.uint64),
+                                        assume_unique=True)
+        if case_sensitive:
+            result = self._verify(result, query)
+        return result
+
+    def _verify(self, line_numbers, query):
+        """Keep lines that contain `query` verbatim"""
+        kept = []
+        for line_no in line_numbers.tolist():
+            found = self.history.get_line(line_no)
+            if found is not None and query in found[1]:
+                kept.append(line_no)
+        return np.array(kept, dtype=np.uint64)
+
+    def scan(self, pattern):
+        """Regex fallback: scan the whole retained history"""
+        hits = array('Q')
+        search = pattern.search
+        for line_no, _, line in self.history.iter_lines():
+            if search(line):
+                hits.append(line_no)
+        return np.frombuffer(hits, dtype=np.uint64) if hits else np.empty(0, dtype=np.uint64)
+
+    def get_statistics(self):
+        with self.lock:
+            return {
+                'search_tokens': len(self.postings),
+                'search_indexed_lines': self.indexed_upto - self.first_indexed,
+                'search_index_bytes': self.account.used
+            }
@@ -0,0 +1,271 @@
+import re
+import time
+import threading
+
+import config
+
+OPTION = re.compile(r'^(timeout|retries|else)=(\S+)$')
+ESCAPE = re.compile(r'\\(.)')
+ESCAPES = {'r': '\r', 'n': '\n', 't': '\t', '\\': '\\', '0': '\0'}
+
+
+def _unescape(text):
+    return ESCAPE.sub(lambda m: ESCAPES.get(m.group(1), m.group(0)), text)
+
+
+def _parse_seconds(text):
+    """'0.5', '500ms' or '2s' -> seconds"""
+    text = text.strip().lower()
+    if text.endswith("ms"):
+        return float(text[:-2]) / 1000.0
+    if text.endswith("s"):
+        return float(text[:-1])
+    return float(text)
+
+
+def compile_script(script):
+    """
+    Compile a sequence script into (program, labels). One step per line:
+
+        send AT+RST          text plus config.SEQUENCE_TERMINATOR (\\r \\n \\t escapes)
+        send @name           a saved command with its own terminator
+        expect OK timeout=2 retries=1 else=abort|continue|<label>
+        delay 250ms
+        loop 10 ... end      nested loops
+        label name / goto name
+
+    `expect` takes a regex matched against the lines received since the
+    last send; on timeout the last message is re-sent up to `retries`
+    times before `else` applies. Raises ValueError with the line number.
+    """
+    program = []
+    labels = {}
+    loops = []
+    jumps = []
+    for number, raw_line in enumerate(script.splitlines(), 1):
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        keyword, _, rest = line.partition(" ")
+        keyword = keyword.lower()
+        rest = rest.strip()
+        try:
+            if keyword == "send":
+                if rest.startswith("@"):
+                    program.append(("command", rest[1:].strip()))
+                else:
+                    program.append(("send", _unescape(rest) + config.SEQUENCE_TERMINATOR))
+            elif keyword == "expect":
+                tokens = rest.split(" ")
+                options = {}
+                while tokens and OPTION.match(tokens[-1]):
+                    key, value = OPTION.match(tokens.pop()).groups()
+                    options[key] = value
+                pattern = " ".join(tokens).strip()
+                if not pattern:
+                    raise ValueError("expect needs a pattern")
+                on_fail = options.get("else", "abort")
+                if on_fail not in ("abort", "continue"):
+                    jumps.append((number, on_fail))
+                program.append(("expect", re.compile(pattern),
+                                _parse_seconds(options.get("timeout", str(config.SEQUENCE_EXPECT_TIMEOUT))),
+                                int(options.get("retries", 0)), on_fail))
+            elif keyword == "delay":
+                program.append(("delay", _parse_seconds(rest)))
+            elif keyword == "loop":
+                loops.append(len(program))
+                program.append(("loop", int(rest), None))
+            elif keyword == "end":
+                if not loops:
+                    raise ValueError("end without loop")
+                start = loops.pop()
+                program[start] = ("loop", program[start][1], len(program))
+                program.append(("end", start))
+            elif keyword == "label":
+                if not rest:
+                    raise ValueError("label needs a name")
+                labels[rest] = len(program)
+            elif keyword == "goto":
+                jumps.append((number, rest))
+                program.append(("goto", rest))
+            else:
+                raise ValueError(f"unknown step '{keyword}'")
+        except (re.error, ValueError) as e:
+            raise ValueError(f"line {number}: {e}")
+    if loops:
+        raise ValueError("loop without end")
+    for number, label in jumps:
+        if label not in labels:
+            raise ValueError(f"line {number}: unknown label '{label}'")
+    return program, labels
+
+
+class Sequence:
+    """A named script stored in the command library (see compile_script)"""
+
+    def __init__(self, name, script, description=""):
+        self.name = name
+        self.script = script
+        self.description = description
+
+    def compile(self):
+        return compile_script(self.script)
+
+
+class SequenceRun:
+    """
+    Executes one sequence against a SerialComm on its own thread. Received
+    lines arrive through a line callback and wake the runner directly, so
+    expect steps never poll; delays sleep until shortly before their
+    deadline and spin the rest. Progress goes to on_event(run, text) on
+    the runner thread.
+    """
+
+    def __init__(self, sequence, serial_comm, resolve_command=None, on_event=None):
+        self.sequence = sequence
+        self.program, self.labels = sequence.compile()
+        self.serial_comm = serial_comm
+        self.resolve_command = resolve_command
+        self.on_event = on_event
+        self.condition = threading.Condition()
+        self.lines = []
+        self.last_sent = None
+        self.cancelled = False
+        self.status = "ready"
+        self.thread = None
+        self.started = None
+
+    def start(self):
+        self.serial_comm.add_line_callback(self.on_lines)
+        self.status = "running"
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify()
+
+    def on_lines(self, lines, timestamp):
+        """SerialComm line callback (reader thread)"""
+        with self.condition:
+            self.lines.extend(lines)
+            self.condition.notify()
+
+    def _event(self, text):
+        if self.on_event:
+            try:
+                self.on_event(self, text)
+            except Exception as e:
+                print(f"Sequence event error: {e}")
+
+    def _run(self):
+        try:
+            self.status = self._execute()
+        except Exception as e:
+            self.status = "failed"
+            self._event(f"error: {e}")
+        finally:
+            self.serial_comm.remove_line_callback(self.on_lines)
+        elapsed = time.perf_counter() - self.started
+        self._event(f"{self.status} after {elapsed:.3f}s")
+
+    def _execute(self):
+        program = self.program
+        counters = {}
+        pc = 0
+        while pc < len(program):
+            if self.cancelled:
+                return "cancelled"
+            step = program[pc]
+            kind = step[0]
+            if kind == "send":
+                if not self._send(step[1]):
+                    return "failed"
+            elif kind == "command":
+                data = self.resolve_command(step[1]) if self.resolve_command else None
+                if not data:
+                    self._event(f"unknown command '{step[1]}'")
+                    return "failed"
+                if not self._send(data["cmd"] + data["terminator"]):
+                    return "failed"
+            elif kind == "expect":
+                _, regex, timeout, retries, on_fail = step
+                if not self._expect(regex, timeout, retries):
+                    if self.cancelled:
+                        return "cancelled"
+                    if on_fail == "abort":
+                        self._event(f"expect /{regex.pattern}/ timed out")
+                        return "failed"
+                    if on_fail != "continue":
+                        pc = self.labels[on_fail]
+                        continue
+            elif kind == "delay":
+                self._sleep_until(time.perf_counter() + step[1])
+            elif kind == "loop":
+                if step[1] <= 0:
+                    pc = step[2] + 1
+                    continue
+                counters[pc] = step[1]
+            elif kind == "end":
+                start = step[1]
+                counters[start] -= 1
+                if counters[start] > 0:
+                    pc = start + 1
+                    continue
+            elif kind == "goto":
+                pc = self.labels[step[1]]
+                continue
+            pc += 1
+        return "passed"
+
+    def _send(self, message):
+        with self.condition:
+            self.lines = []  # expect only sees replies to this message
+        self.last_sent = message
+        if not self.serial_comm.send_message(message, label=f"sequence {self.sequence.name}"):
+            self._event("port is not open")
+            return False
+        return True
+
+    def _expect(self, regex, timeout, retries):
+        for attempt in range(retries + 1):
+            if attempt:
+                self._event(f"retry {attempt}/{retries}")
+                if not self._send(self.last_sent):
+                    return False
+            started = time.perf_counter()
+            deadline = started + timeout
+            matched = None
+            with self.condition:
+                while not self.cancelled and matched is None:
+                    for i, line in enumerate(self.lines):
+                        if regex.search(line):
+                            matched = line
+                            del self.lines[:i + 1]
+                            break
+                    else:
+                        self.lines = []
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+            if matched is not None:
+                self._event(f"matched /{regex.pattern}/ in "
+                            f"{(time.perf_counter() - started) * 1000:.1f} ms: {matched}")
+                return True
+            if self.cancelled or self.last_sent is None:
+                return False
+        return False
+
+    def _sleep_until(self, deadline):
+        spin = config.REPEAT_SPIN_THRESHOLD
+        with self.condition:
+            while not self.cancelled:
+                remaining = deadline - time.perf_counter() - spin
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+        while not self.cancelled and time.perf_counter() < deadline:
+            time.sleep(0)
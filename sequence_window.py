@@ -0,0 +1,132 @@
+import tkinter as tk
+import tkinter.ttk as ttk
+import customtkinter as ctk
+from tkinter import messagebox
+
+from sequence_runner import compile_script
+
+EXAMPLE_SCRIPT = """# send / expect <regex> [timeout= retries= else=abort|continue|label] / delay / loop N ... end
+send AT
+expect ^OK timeout=1 retries=2
+loop 5
+  send @read_temp
+  expect T=\\d+ timeout=500ms else=continue
+  delay 100ms
+end
+"""
+
+
+class SequenceWindow:
+    """Editor for scripted command sequences stored in the command library"""
+
+    def __init__(self, parent, command_manager, run_sequence, stop_sequences):
+        self.parent = parent
+        self.command_manager = command_manager
+        self.run_sequence = run_sequence
+        self.stop_sequences = stop_sequences
+
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title("Command Sequences")
+        self.window.geometry("760x560")
+        self.window.transient(parent)
+
+        self.setup_ui()
+        self.refresh_sequence_list()
+
+    def setup_ui(self):
+        main = ctk.CTkFrame(self.window)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(main, columns=("Description",), show="tree headings", height=8)
+        self.tree.heading("#0", text="Sequence")
+        self.tree.heading("Description", text="Description")
+        self.tree.column("#0", width=180)
+        self.tree.column("Description", width=480)
+        self.tree.pack(fill="x")
+        self.tree.bind("<<TreeviewSelect>>", self.on_sequence_selected)
+
+        form = ctk.CTkFrame(main)
+        form.pack(fill="x", pady=5)
+        ctk.CTkLabel(form, text="Name:").pack(side="left", padx=5)
+        self.name_entry = ctk.CTkEntry(form, width=160)
+        self.name_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(form, text="Description:").pack(side="left", padx=5)
+        self.description_entry = ctk.CTkEntry(form, width=320)
+        self.description_entry.pack(side="left", padx=5, fill="x", expand=True)
+
+        self.script_text = ctk.CTkTextbox(main, height=240, font=("Courier", 12))
+        self.script_text.pack(fill="both", expand=True, pady=5)
+        self.script_text.insert("1.0", EXAMPLE_SCRIPT)
+
+        self.status_label = ctk.CTkLabel(main, text="", anchor="w")
+        self.status_label.pack(fill="x")
+
+        buttons = ctk.CTkFrame(self.window)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        ctk.CTkButton(buttons, text="Save", command=self.save_sequence).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Delete", command=self.delete_sequence).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Check", command=self.check_script).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Run", command=self.run_selected).pack(side="left", padx=(20, 2))
+        ctk.CTkButton(buttons, text="Stop All", command=self.stop_sequences).pack(side="left", padx=2)
+        ctk.CTkButton(buttons, text="Close", command=self.window.destroy).pack(side="right", padx=2)
+
+    def refresh_sequence_list(self):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for name, sequence in self.command_manager.sequences.items():
+            self.tree.insert("", "end", iid=name, text=name, values=(sequence.description,))
+
+    def on_sequence_selected(self, event):
+        selection = self.tree.selection()
+        sequence = self.command_manager.get_sequence(selection[0]) if selection else None
+        if sequence is None:
+            return
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, sequence.name)
+        self.description_entry.delete(0, tk.END)
+        self.description_entry.insert(0, sequence.description)
+        self.script_text.delete("1.0", tk.END)
+        self.script_text.insert("1.0", sequence.script)
+
+    def _script(self):
+        return self.script_text.get("1.0", tk.END).rstrip() + "\n"
+
+    def check_script(self):
+        try:
+            program, labels = compile_script(self._script())
+            self.status_label.configure(text=f"OK: {len(program)} steps, {len(labels)} labels")
+        except ValueError as e:
+            self.status_label.configure(text=f"Error: {e}")
+
+    def save_sequence(self):
+        name = self.name_entry.get().strip()
+        if not name:
+            messagebox.showerror("Invalid Sequence", "Please enter a sequence name", parent=self.window)
+            return
+        try:
+            self.command_manager.add_sequence(name, self._script(), self.description_entry.get().strip())
+        except ValueError as e:
+            messagebox.showerror("Invalid Sequence", str(e), parent=self.window)
+            return
+        self.refresh_sequence_list()
+        self.status_label.configure(text=f"Saved '{name}'")
+
+    def delete_sequence(self):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        if messagebox.askyesno("Delete Sequence", f"Delete '{selection[0]}'?", parent=self.window):
+            self.command_manager.delete_sequence(selection[0])
+            self.refresh_sequence_list()
+
+    def run_selected(self):
+        selection = self.tree.selection()
+        name = selection[0] if selection else self.name_entry.get().strip()
+        sequence = self.command_manager.get_sequence(name)
+        if sequence is None:
+            self.status_label.configure(text="Save the sequence before running it")
+            return
+        if self.run_sequence(sequence):
+            self.status_label.configure(text=f"Running '{name}'")
+        else:
+            self.status_label.configure(text="Not connected")
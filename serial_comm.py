@@ -1,8 +1,12 @@
 import threading
-import time
+from datetime import datetime
 
 import serial
 
+import config
+from tx_writer import TxWriter
+from reconnect import DeviceWatcher, reopen, claim_port, release_port
+
 class SerialComm:
     def __init__(self, port_combo, baud_combo, connect_button, terminal, port_map, get_button_style):
         # References to GUI elements (passed from the GUI module)
@@ -20,45 +24,107 @@ class SerialComm:
         self.last_port = None
         self.last_baud = None
 
+        # Follows the device (VID/PID/serial) across re-enumeration; set stops reconnecting
+        self.watcher = None
+        self.reconnect_cancel = threading.Event()
+
+        # Complete lines are handed to these callbacks from the reader thread. The
+        # lists are replaced, never changed in place, so dispatch needs no lock
+        self.callback_lock = threading.Lock()
+        self.line_callbacks = []
+        self._partial_line = ""
+
+        # Binary mode: a BinaryDecoder replaces text decoding entirely
+        self.frame_decoder = None
+        self.frame_callbacks = []
+
+        # Optional framing stage (COBS/SLIP) in front of the decoders
+        self.framing = None
+
+        # Raw bytes are kept for the text/hex views; a HexView replaces text output
+        self.byte_history = None
+        self.hex_view = None
+
+        # Writes go through a queue drained by the TX writer thread
+        self.tx_writer = TxWriter()
+
+    def add_line_callback(self, callback):
+        """Add callback(lines, timestamp) for every batch of complete received lines"""
+        with self.callback_lock:
+            self.line_callbacks = self.line_callbacks + [callback]
+
+    def remove_line_callback(self, callback):
+        with self.callback_lock:
+            self.line_callbacks = [cb for cb in self.line_callbacks if cb != callback]
+
+    def add_frame_callback(self, callback):
+        """Add callback(batch, timestamp) for every FrameBatch decoded in binary mode"""
+        with self.callback_lock:
+            self.frame_callbacks = self.frame_callbacks + [callback]
+
+    def set_frame_decoder(self, decoder):
+        """Switch to binary frame decoding (a BinaryDecoder), or back to text with None"""
+        self.frame_decoder = decoder
+        self._partial_line = ""
+
+    def set_framing(self, framing):
+        """Delimit received bytes with a FramingStage (see framing.py), or None for a raw stream"""
+        self.framing = framing
+        self._partial_line = ""
+
+    def set_byte_history(self, history):
+        """Append every received chunk to a ByteHistory (see hex_view.py)"""
+        self.byte_history = history
+
+    def set_hex_view(self, hex_view):
+        """Show received bytes through a HexView instead of as text, or None for text"""
+        self.hex_view = hex_view
+
     def connect(self, port, baud):
         if not port:
-            self.terminal.after(0,
-                lambda: self.terminal.append("⚠ No port selected.\n"))
+            self._ui(lambda: self.terminal.append("⚠ No port selected.\n"))
             return False
 
+        self.reconnect_cancel.clear()
+        self.watcher = DeviceWatcher(port)
         try:
-            self.serial_port = serial.Serial(port, baud, timeout=0.1)
+            self.serial_port = serial.Serial(port, baud, timeout=0.1,
+                                             write_timeout=config.TX_WRITE_TIMEOUT)
             self.running     = True
             self.last_port   = port
             self.last_baud   = baud
-            self.connect_button.after(0, lambda: self.connect_button.configure(
+            claim_port(port)
+            self._ui(lambda: self.connect_button.configure(
                 text="Disconnect",
                 fg_color=self.get_button_style("red")[0]
             ))
-            self.terminal.after(0,
-                lambda: self.terminal.append(f"✅ Connected to {port} @ {baud} baud\n"))
-            # Start reader
+            self._ui(lambda: self.terminal.append(f"✅ Connected to {port} @ {baud} baud\n"))
+            # Start reader and writer
+            self.tx_writer.attach(self.serial_port)
+            self.tx_writer.start()
             self.serial_thread = threading.Thread(target=self.read_serial, daemon=True)
             self.serial_thread.start()
             return True
 
         except serial.SerialException:
-            self.terminal.after(0,
-                lambda: self.terminal.append(f"❌ Failed to connect to {port}. Retrying...\n"))
+            self._ui(lambda: self.terminal.append(f"❌ Failed to connect to {port}. Retrying...\n"))
             self.start_reconnect_thread()
             return False
 
     def disconnect(self):
         self.running = False
+        self.reconnect_cancel.set()
+        self.tx_writer.attach(None)
+        self.tx_writer.stop()
         if self.serial_port:
             self.serial_port.close()
             self.serial_port = None
-        self.connect_button.after(0, lambda: self.connect_button.configure(
+            release_port(self.last_port)
+        self._ui(lambda: self.connect_button.configure(
             text="Connect",
             fg_color=self.get_button_style("green")[0]
         ))
-        self.terminal.after(0,
-            lambda: self.terminal.append("🔌 Disconnected.\n"))
+        self._ui(lambda: self.terminal.append("🔌 Disconnected.\n"))
 
     def start_reconnect_thread(self):
         if self.reconnect_thread and self.reconnect_thread.is_alive():
@@ -67,45 +133,162 @@ class SerialComm:
         self.reconnect_thread.start()
 
     def reconnect_serial(self):
-        # Continuously try to reconnect
-        while not self.running:
-            try:
-                self.serial_port = serial.Serial(self.last_port, self.last_baud, timeout=0.1)
-                self.running = True
-                self.connect_button.after(0, lambda: self.connect_button.configure(
-                    text="Disconnect",
-                    fg_color=self.get_button_style("red")[0]
-                ))
-                self.terminal.after(0,
-                    lambda: self.terminal.append(f"✅ Reconnected to {self.last_port}\n"))
-                self.serial_thread = threading.Thread(target=self.read_serial, daemon=True)
-                self.serial_thread.start()
-                return
-            except serial.SerialException:
-                time.sleep(1)
+        """
+        Reopen the port with exponential backoff, waking early when a
+        device arrives; follows the device to a new port name. The same
+        SerialComm is reattached, so buffers, decoders, callbacks and
+        queued sends carry over.
+        """
+        result = reopen(self.watcher, lambda name: serial.Serial(name, self.last_baud, timeout=0.1,
+                                                                 write_timeout=config.TX_WRITE_TIMEOUT),
+                        self.reconnect_cancel)
+        if result is None:
+            return
+        port, name = result
+        if self.reconnect_cancel.is_set():
+            port.close()  # disconnected while opening
+            return
+        previous, self.last_port = self.last_port, name
+        claim_port(name)
+        self.serial_port = port
+        self.running = True
+        self.tx_writer.attach(self.serial_port)
+        self.tx_writer.start()
+        self._ui(lambda: self.connect_button.configure(
+            text="Disconnect",
+            fg_color=self.get_button_style("red")[0]
+        ))
+        moved = f" (was {previous})" if name != previous else ""
+        self._ui(lambda: self.terminal.append(f"✅ Reconnected to {name}{moved}\n"))
+        self.serial_thread = threading.Thread(target=self.read_serial, daemon=True)
+        self.serial_thread.start()
 
     def read_serial(self):
+        if self.watcher.identity is None:
+            self.watcher.identify()
         while self.running and self.serial_port:
             try:
-                if self.serial_port.in_waiting > 0:
-                    data = self.serial_port.read(self.serial_port.in_waiting)\
-                                       .decode('utf-8', errors='ignore')
-                    if data:
-                        # device data itself may contain '\n' and is handled by insertPlainText
-                        self.terminal.after(0, lambda d=data: self.terminal.insertPlainText(d))
-            except serial.SerialException:
-                self.terminal.after(0,
-                    lambda: self.terminal.append("⚠ Device disconnected. Reconnecting...\n"))
+                # Block (up to the port timeout) for the first byte instead of
+                # spinning on in_waiting, then take everything already buffered
+                raw = self.serial_port.read(1)
+                if not raw:
+                    continue
+                waiting = self.serial_port.in_waiting
+                if waiting:
+                    raw += self.serial_port.read(waiting)
+            except (serial.SerialException, OSError, TypeError, AttributeError):
+                if not self.running:
+                    break  # port closed by disconnect() (pyserial raises TypeError mid-read)
+                self._ui(lambda: self.terminal.append("⚠ Device disconnected. Reconnecting...\n"))
                 self.running = False
+                release_port(self.last_port)
                 self.start_reconnect_thread()
                 break
+            self._process_chunk(raw)
 
-    def send_message(self, message):
-        if self.serial_port and self.serial_port.is_open:
+    def _process_chunk(self, raw, timestamp=None):
+        """
+        Route one chunk of received bytes (bytes or a memoryview) to the
+        history, views and decoders. `timestamp` is when the chunk was
+        read, if not now.
+        """
+        if self.byte_history is not None:
+            self.byte_history.append(raw)
+        hex_view = self.hex_view
+        if hex_view is not None:
+            hex_view.notify()
+        decoder = self.frame_decoder
+        framing = self.framing
+        if framing is not None:
+            frames = framing.feed(raw)
+            if frames:
+                self._dispatch_packets(frames, decoder, timestamp)
+            return
+        if decoder is not None:
+            # Binary frames bypass the text terminal
+            self._dispatch_frames(decoder, raw, timestamp)
+            return
+        data = str(raw, 'utf-8', 'ignore')
+        if data:
+            # device data itself may contain '\n' and is handled by insertPlainText
+            if hex_view is None:
+                self._ui(lambda d=data: self.terminal.insertPlainText(d))
+            if self.line_callbacks:
+                self._dispatch_lines(data, timestamp)
+
+    def _ui(self, callback):
+        """Run `callback` on the Tk thread"""
+        self.terminal.after(0, callback)
+
+    def _dispatch_lines(self, data, timestamp=None):
+        """Split a received chunk into complete lines and notify line callbacks"""
+        lines = (self._partial_line + data).split('\n')
+        self._partial_line = lines.pop()
+        if not lines:
+            return
+        timestamp = timestamp or datetime.now()
+        lines = [line.rstrip('\r') for line in lines]
+        for callback in self.line_callbacks:
             try:
-                self.serial_port.write(message.encode('utf-8'))
-                self.terminal.after(0,
-                    lambda: self.terminal.append(f"➡ {message.strip()}\n"))
-            except serial.SerialException:
-                self.terminal.after(0,
-                    lambda: self.terminal.append("⚠ Failed to send message.\n"))
\ No newline at end of file
+                callback(lines, timestamp)
+            except Exception as e:
+                print(f"Line callback error: {e}")
+
+    def _dispatch_frames(self, decoder, raw, timestamp=None):
+        """Decode received bytes into frames and notify frame callbacks"""
+        batch = decoder.feed(raw)
+        if not len(batch):
+            return
+        timestamp = timestamp or datetime.now()
+        for callback in self.frame_callbacks:
+            try:
+                callback(batch, timestamp)
+            except Exception as e:
+                print(f"Frame callback error: {e}")
+
+    def _dispatch_packets(self, frames, decoder, timestamp=None):
+        """Hand a batch of delimited frames to the binary decoder, or show them as text lines"""
+        if decoder is not None:
+            batch = decoder.decode_frames(frames)
+            if not len(batch):
+                return
+            timestamp = timestamp or datetime.now()
+            for callback in self.frame_callbacks:
+                try:
+                    callback(batch, timestamp)
+                except Exception as e:
+                    print(f"Frame callback error: {e}")
+            return
+
+        data = "\n".join(frame.decode('utf-8', errors='replace') for frame in frames) + "\n"
+        if self.hex_view is None:
+            self._ui(lambda d=data: self.terminal.insertPlainText(d))
+        if self.line_callbacks:
+            self._dispatch_lines(data, timestamp)
+
+    def send_message(self, message, callback=None, label=None, echo=True):
+        """
+        Queue a message for the TX writer thread (never blocks the caller).
+        callback(request, error) runs on the writer thread once the message
+        was written, with error None on success. echo=False skips the
+        terminal echo (for high-rate repeats).
+        """
+        if not (self.serial_port and self.serial_port.is_open):
+            return False
+
+        def on_written(request, error):
+            if error:
+                self._ui(lambda: self.terminal.append(f"⚠ Failed to send message: {error}\n"))
+            elif echo:
+                self._ui(lambda: self.terminal.append(f"➡ {message.strip()}\n"))
+            if callback:
+                callback(request, error)
+
+        if not self.tx_writer.send(message.encode('utf-8'), label, on_written):
+            self._ui(lambda: self.terminal.append("⚠ Send queue full, message dropped.\n"))
+            return False
+        return True
+
+    def set_tx_pacing(self, inter_byte_delay, inter_command_delay):
+        """Seconds between written bytes and between messages"""
+        self.tx_writer.set_pacing(inter_byte_delay, inter_command_delay)
\ No newline at end of file
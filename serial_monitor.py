@@ -1,5 +1,8 @@
+import multiprocessing
 from gui import SerialMonitorGUI
 
 if __name__ == "__main__":
+    # Needed by the log importer's process pool in frozen builds
+    multiprocessing.freeze_support()
     app = SerialMonitorGUI()
     app.mainloop()
@@ -0,0 +1,192 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Late entries in one batch above which a single merge beats one insert each
+MERGE_THRESHOLD = 64
+
+
+class SeriesView:
+    """
+    Lightweight read-only window [lo, hi) over a TimeSeriesBuffer.
+
+    A view references the buffer's lists instead of copying entries. The
+    buffer only appends to those lists in place; trimming and inserting
+    late entries swap in new ones while a view may be out, so a view
+    stays valid after the buffer moves on.
+    """
+
+    __slots__ = ('_keys', '_items', 'lo', 'hi')
+
+    def __init__(self, keys, items, lo, hi):
+        self._keys = keys
+        self._items = items
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __iter__(self):
+        items = self._items
+        for i in range(self.lo, self.hi):
+            yield items[i]
+
+    def __reversed__(self):
+        items = self._items
+        for i in range(self.hi - 1, self.lo - 1, -1):
+            yield items[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SeriesView index out of range")
+        return self._items[self.lo + index]
+
+    def __bool__(self):
+        return self.hi > self.lo
+
+    def timestamps(self):
+        """Epoch-second timestamps of the entries in the view"""
+        return self._keys[self.lo:self.hi]
+
+    def values(self):
+        return [item.value for item in self]
+
+    def to_list(self):
+        return self._items[self.lo:self.hi]
+
+
+class TimeSeriesBuffer:
+    """
+    Bounded, time-ordered buffer of entries with a parallel array of
+    epoch-second keys, so time ranges are found by binary search in
+    O(log n) and returned as O(1) views.
+
+    Entries must have a `timestamp` datetime attribute (see records). An
+    entry older than the newest one (imported logs, a clock stepping
+    backwards) is inserted at its sorted position under its own time; a
+    large batch of them is merged in one pass.
+    """
+
+    def __init__(self, maxlen=None):
+        self.maxlen = maxlen
+        self._keys = array('d')
+        self._items = []
+        self._start = 0
+        self._shared = False  # a view may reference the current lists
+
+    def append(self, item):
+        key = item.timestamp.timestamp()
+        if len(self) and key < self._keys[-1]:
+            self._insert([(key, item)])
+        else:
+            self._keys.append(key)
+            self._items.append(item)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.drop_oldest(len(self) - self.maxlen)
+
+    def extend(self, items):
+        late = []
+        for item in items:
+            key = item.timestamp.timestamp()
+            if len(self) and key < self._keys[-1]:
+                late.append((key, item))
+            else:
+                self._keys.append(key)
+                self._items.append(item)
+        if len(late) > MERGE_THRESHOLD:
+            self._merge(late)
+        elif late:
+            self._insert(late)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.drop_oldest(len(self) - self.maxlen)
+
+    def _unshare(self):
+        """Copy the lists before changing them in place if a view may hold them"""
+        if self._shared:
+            self._keys = self._keys[self._start:]
+            self._items = self._items[self._start:]
+            self._start = 0
+            self._shared = False
+
+    def _insert(self, entries):
+        """Insert a few out-of-order (key, item) entries one by one at their sorted positions"""
+        self._unshare()
+        keys, items = self._keys, self._items
+        for key, item in entries:
+            index = bisect_right(keys, key, self._start)
+            keys.insert(index, key)
+            items.insert(index, item)
+
+    def _merge(self, entries):
+        """Merge many out-of-order (key, item) entries in one pass; builds new lists"""
+        entries.sort(key=lambda entry: entry[0])
+        live = zip(self._keys[self._start:], self._items[self._start:])
+        merged = list(heapq.merge(live, entries, key=lambda entry: entry[0]))
+        self._keys = array('d', [key for key, _ in merged])
+        self._items = [item for _, item in merged]
+        self._start = 0
+        self._shared = False
+
+    def drop_oldest(self, count=1):
+        """Forget the `count` oldest entries"""
+        self._start = min(self._start + count, len(self._items))
+        # Compact once half of the lists is dead; new lists keep views valid
+        if self._start > len(self._items) // 2:
+            self._keys = self._keys[self._start:]
+            self._items = self._items[self._start:]
+            self._start = 0
+            self._shared = False
+
+    def head(self):
+        """Oldest entry (the buffer must not be empty)"""
+        return self._items[self._start]
+
+    def popleft(self):
+        item = self._items[self._start]
+        self.drop_oldest(1)
+        return item
+
+    def clear(self):
+        self._keys = array('d')
+        self._items = []
+        self._start = 0
+        self._shared = False
+
+    def __len__(self):
+        return len(self._items) - self._start
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    # ─── Views ──────────────────────────────────────────────────────────────
+    def view(self):
+        self._shared = True
+        return SeriesView(self._keys, self._items, self._start, len(self._items))
+
+    def tail(self, count):
+        """View of the `count` most recent entries"""
+        hi = len(self._items)
+        self._shared = True
+        return SeriesView(self._keys, self._items, max(self._start, hi - count), hi)
+
+    def range(self, start=None, end=None):
+        """View of the entries with start <= timestamp <= end (datetimes or None)"""
+        keys = self._keys
+        lo, hi = self._start, len(self._items)
+        if start is not None:
+            lo = bisect_left(keys, start.timestamp(), lo, hi)
+        if end is not None:
+            hi = bisect_right(keys, end.timestamp(), lo, hi)
+        self._shared = True
+        return SeriesView(keys, self._items, lo, hi)
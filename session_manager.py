@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import config
+from data_processor import DataProcessor
+from hex_view import ByteHistory
+
+
+class SerialSession:
+    """
+    One additional port: its own SerialComm, DataProcessor and byte
+    history, with buffer budgets scoped (and scaled) per session. PLOT
+    samples are forwarded as '<session>:<channel>' so all sessions can
+    share one plot.
+    """
+
+    def __init__(self, name, serial_comm, memory_budget, on_plot=None):
+        self.name = name
+        self.serial_comm = serial_comm
+        self.budget = memory_budget.scoped(name, config.SESSION_BUDGET_SCALE)
+        self.data_processor = DataProcessor(memory_budget=self.budget)
+        self.byte_history = ByteHistory(self.budget)
+        self.lines = 0
+        self.opened = datetime.now()
+
+        serial_comm.set_byte_history(self.byte_history)
+        serial_comm.add_line_callback(self.on_lines)
+        if on_plot:
+            self.data_processor.add_plot_callback(
+                lambda timestamp, value, channel: on_plot(timestamp, value, f"{name}:{channel}"))
+
+    def on_lines(self, lines, timestamp):
+        """Callback (reader thread) for received lines"""
+        self.lines += len(lines)
+        for line in lines:
+            self.data_processor.process_data(line, timestamp)
+
+    def connect(self, port, baud):
+        return self.serial_comm.connect(port, baud)
+
+    def close(self):
+        self.serial_comm.disconnect()
+        self.budget.release()
+
+    def get_statistics(self):
+        tx = self.serial_comm.tx_writer.get_statistics()
+        return {
+            'session': self.name,
+            'connected': self.serial_comm.running,
+            'lines': self.lines,
+            'rx_bytes': self.byte_history.end,
+            'tx_messages': tx['tx_messages'],
+            'tx_errors': tx['tx_errors'],
+            'samples': sum(len(buffer) for buffer in self.data_processor.type_buffers.values())
+        }
+
+
+class SessionManager:
+    """
+    Opens and tracks the sessions for additional ports. Each session only
+    adds a blocking reader and a TX writer thread (both idle while the
+    port is quiet); repeated commands of every session run on the one
+    shared RepeatScheduler.
+    """
+
+    def __init__(self, memory_budget, scheduler, on_plot=None, max_sessions=config.SESSION_MAX):
+        self.memory_budget = memory_budget
+        self.scheduler = scheduler
+        self.on_plot = on_plot
+        self.max_sessions = max_sessions
+        self.sessions = {}
+
+    def create(self, name, serial_comm):
+        """Register a session for `serial_comm` (not connected yet)"""
+        if name in self.sessions:
+            raise ValueError(f"{name} is already open")
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError(f"At most {self.max_sessions} sessions can be open")
+        session = SerialSession(name, serial_comm, self.memory_budget, self.on_plot)
+        self.sessions[name] = session
+        return session
+
+    def get(self, name):
+        return self.sessions.get(name)
+
+    def close(self, name):
+        session = self.sessions.pop(name, None)
+        if session is None:
+            return
+        self.stop_repeats(name)
+        session.close()
+
+    def close_all(self):
+        for name in list(self.sessions):
+            self.close(name)
+
+    def repeat(self, name, message, interval):
+        """Send `message` to session `name` every `interval` seconds on the shared scheduler"""
+        session = self.sessions[name]
+        echo = interval >= config.REPEAT_ECHO_MIN_INTERVAL
+        return self.scheduler.add(f"{name}:{message.strip()}", interval,
+                                  lambda: session.serial_comm.send_message(message, echo=echo))
+
+    def stop_repeats(self, name):
+        for job in self.scheduler.get_statistics():
+            if job['name'].startswith(f"{name}:"):
+                self.scheduler.remove(job['name'])
+
+    def get_statistics(self):
+        return [session.get_statistics() for session in self.sessions.values()]
@@ -0,0 +1,252 @@
+import os
+import gzip
+import json
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import config
+
+
+class SessionRecorder:
+    """
+    Always-on recorder that appends every received line to rotating
+    segment files in the background.
+
+    The ingest path only appends to an in-memory batch; a writer thread
+    formats and writes the batch every `flush_interval` seconds, rotates
+    segments by size or age, gzips closed segments and keeps the total
+    disk usage under `max_total_bytes`.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, directory=None,
+                 segment_bytes=config.RECORD_SEGMENT_BYTES,
+                 segment_seconds=config.RECORD_SEGMENT_SECONDS,
+                 compress=config.RECORD_COMPRESS,
+                 max_total_bytes=config.RECORD_MAX_TOTAL_BYTES,
+                 flush_interval=config.RECORD_FLUSH_INTERVAL):
+        self.directory = directory or config.get_recordings_path()
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compress = compress
+        self.max_total_bytes = max_total_bytes
+        self.flush_interval = flush_interval
+
+        self.index_path = os.path.join(self.directory, self.INDEX_NAME)
+        self.index = []  # [{'file', 'start', 'end', 'lines', 'bytes', 'compressed', 'open'}]
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = []  # [(timestamp, [line, ...]), ...]
+        self.running = False
+        self.thread = None
+
+        # Currently open segment
+        self._file = None
+        self._entry = None
+        self._opened_at = 0.0
+        self._sequence = 0
+
+        # Counters
+        self.lines_recorded = 0
+        self.bytes_written = 0
+
+    # ─── Public API ─────────────────────────────────────────────────────────
+    def start(self):
+        """Start the background writer thread"""
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+        self.running = True
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Flush pending lines, close the open segment and stop the writer"""
+        if not self.running:
+            return
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def record_lines(self, lines, timestamp=None):
+        """Queue complete lines for recording (cheap; called from the reader thread)"""
+        if not self.running or not lines:
+            return
+        if timestamp is None:
+            timestamp = datetime.now()
+        with self.lock:
+            self.pending.append((timestamp, lines))
+
+    def record_line(self, line, timestamp=None):
+        """Queue a single line for recording"""
+        self.record_lines([line], timestamp)
+
+    def segments_for_range(self, start=None, end=None):
+        """Return paths of the segments (the open one included) overlapping [start, end]"""
+        with self.lock:
+            entries = list(self.index)
+        paths = []
+        for entry in entries:
+            seg_start = datetime.fromisoformat(entry['start'])
+            seg_end = datetime.fromisoformat(entry['end'])
+            if start and seg_end < start:
+                continue
+            if end and seg_start > end:
+                continue
+            paths.append(os.path.join(self.directory, entry['file']))
+        return paths
+
+    def get_statistics(self):
+        """Get counters describing the recording"""
+        # The open segment is already in the index
+        with self.lock:
+            disk_usage = sum(entry['bytes'] for entry in self.index)
+            segments = len(self.index)
+        return {
+            'recording': self.running,
+            'lines_recorded': self.lines_recorded,
+            'bytes_written': self.bytes_written,
+            'segments': segments,
+            'disk_usage': disk_usage
+        }
+
+    # ─── Writer thread ──────────────────────────────────────────────────────
+    def _writer_loop(self):
+        while self.running:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self._flush()
+                if self._file is not None and time.monotonic() - self._opened_at >= self.segment_seconds:
+                    self._close_segment()  # rotate by age even while the port is quiet
+            except OSError as e:
+                print(f"Recorder write error: {e}")
+        try:
+            self._flush()
+            self._close_segment()
+        except OSError as e:
+            print(f"Recorder write error: {e}")
+
+    def _flush(self):
+        """Write every pending batch with a single write() per segment"""
+        with self.lock:
+            batches, self.pending = self.pending, []
+        if not batches:
+            return
+
+        if self._file is None:
+            self._open_segment(batches[0][0])
+
+        parts = []
+        for timestamp, lines in batches:
+            stamp = timestamp.isoformat()
+            for line in lines:
+                parts.append(f"{stamp}\t{line}\n")
+            self._entry['end'] = stamp
+            self._entry['lines'] += len(lines)
+            self.lines_recorded += len(lines)
+
+        payload = "".join(parts).encode('utf-8')
+        self._file.write(payload)
+        self._file.flush()
+        self._entry['bytes'] += len(payload)
+        self.bytes_written += len(payload)
+
+        if self._entry['bytes'] >= self.segment_bytes:
+            self._close_segment()
+
+    def _open_segment(self, timestamp):
+        while True:
+            self._sequence += 1
+            name = f"session_{timestamp.strftime('%Y%m%d_%H%M%S')}_{self._sequence:04d}.log"
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) and not os.path.exists(path + ".gz"):
+                break
+        self._file = open(path, 'ab')
+        self._opened_at = time.monotonic()
+        self._entry = {
+            'file': name,
+            'start': timestamp.isoformat(),
+            'end': timestamp.isoformat(),
+            'lines': 0,
+            'bytes': 0,
+            'compressed': False,
+            'open': True
+        }
+        # List the segment right away so the index covers what is being recorded
+        with self.lock:
+            self.index.append(self._entry)
+        self._save_index()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        entry = self._entry
+        self._file = None
+        self._entry = None
+
+        if self.compress and entry['lines']:
+            self._compress_segment(entry)
+
+        with self.lock:
+            entry['open'] = False
+        self._enforce_disk_limit()
+        self._save_index()
+
+    def _compress_segment(self, entry):
+        """Replace a closed segment file with its gzip'ed version, updating its entry in place"""
+        path = os.path.join(self.directory, entry['file'])
+        gz_path = path + ".gz"
+        with open(path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        with self.lock:
+            entry['file'] += ".gz"
+            entry['bytes'] = os.path.getsize(gz_path)
+            entry['compressed'] = True
+        os.remove(path)
+
+    def _enforce_disk_limit(self):
+        """Delete the oldest segments until the total size is within budget"""
+        with self.lock:
+            total = sum(entry['bytes'] for entry in self.index)
+            while self.index and total > self.max_total_bytes and not self.index[0].get('open'):
+                oldest = self.index.pop(0)
+                total -= oldest['bytes']
+                try:
+                    os.remove(os.path.join(self.directory, oldest['file']))
+                except OSError:
+                    pass
+
+    # ─── Index persistence ──────────────────────────────────────────────────
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        # Drop entries whose files were removed by hand
+        entries = [entry for entry in entries
+                   if os.path.exists(os.path.join(self.directory, entry['file']))]
+        # A segment still open when the last run ended was never closed
+        for entry in entries:
+            if entry.get('open'):
+                entry['bytes'] = os.path.getsize(os.path.join(self.directory, entry['file']))
+                entry['open'] = False
+        with self.lock:
+            self.index = entries
+
+    def _save_index(self):
+        with self.lock:
+            entries = list(self.index)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.index_path)
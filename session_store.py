@@ -0,0 +1,210 @@
+import os
+import csv
+import sqlite3
+import threading
+from datetime import datetime
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lines (
+    id    INTEGER PRIMARY KEY,
+    ts    REAL NOT NULL,
+    line  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lines_ts ON lines(ts);
+
+CREATE TABLE IF NOT EXISTS samples (
+    ts     REAL NOT NULL,
+    type   TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    value  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_name_ts ON samples(name, ts);
+CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples(ts);
+"""
+
+
+class SessionStore:
+    """
+    Optional SQLite backend for raw lines and structured samples.
+
+    Producers only append to in-memory batches; a single writer thread owns
+    the write connection and commits each batch in one transaction (WAL
+    mode, so readers never block the writer). Queries open their own
+    read connection and stream rows, so arbitrary time ranges and channels
+    can be pulled without loading the session into memory.
+    """
+
+    def __init__(self, path=None, batch_size=config.SESSION_DB_BATCH_SIZE,
+                 flush_interval=config.SESSION_DB_FLUSH_INTERVAL):
+        self.path = path or config.get_session_db_path()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending_lines = []    # [(ts, line), ...]
+        self.pending_samples = []  # [(ts, type, name, value), ...]
+        self.running = False
+        self.thread = None
+
+        # Counters
+        self.lines_written = 0
+        self.samples_written = 0
+        self.transactions = 0
+
+    # ─── Lifecycle ──────────────────────────────────────────────────────────
+    def open(self):
+        """Create the schema and start the writer thread"""
+        if self.running:
+            return
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+        self.running = True
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Flush pending rows and stop the writer thread"""
+        if not self.running:
+            return
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ─── Producers (any thread) ─────────────────────────────────────────────
+    def add_lines(self, lines, timestamp):
+        """Queue a batch of raw lines sharing one timestamp"""
+        if not self.running:
+            return
+        ts = timestamp.timestamp()
+        with self.lock:
+            self.pending_lines.extend((ts, line) for line in lines)
+            if len(self.pending_lines) >= self.batch_size:
+                self.wakeup.set()
+
+    def add_sample(self, data_type, name, value, timestamp):
+        """Queue one structured sample (matches DataProcessor's structured callback)"""
+        if not self.running:
+            return
+        with self.lock:
+            self.pending_samples.append((timestamp.timestamp(), data_type, name, value))
+            if len(self.pending_samples) >= self.batch_size:
+                self.wakeup.set()
+
+    # ─── Writer thread ──────────────────────────────────────────────────────
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while self.running:
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                self._flush(conn)
+            self._flush(conn)
+        except sqlite3.Error as e:
+            print(f"Session store error: {e}")
+            self.running = False
+        finally:
+            conn.close()
+
+    def _flush(self, conn):
+        with self.lock:
+            lines, self.pending_lines = self.pending_lines, []
+            samples, self.pending_samples = self.pending_samples, []
+        if not lines and not samples:
+            return
+        with conn:  # one transaction per batch
+            if lines:
+                conn.executemany("INSERT INTO lines (ts, line) VALUES (?, ?)", lines)
+            if samples:
+                conn.executemany(
+                    "INSERT INTO samples (ts, type, name, value) VALUES (?, ?, ?, ?)", samples)
+        self.lines_written += len(lines)
+        self.samples_written += len(samples)
+        self.transactions += 1
+
+    # ─── Queries (any thread) ───────────────────────────────────────────────
+    def query_lines(self, start=None, end=None, limit=None):
+        """Yield (timestamp, line) for lines in [start, end]"""
+        sql = "SELECT ts, line FROM lines"
+        where, params = self._time_clause(start, end)
+        sql += where + " ORDER BY ts, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for ts, line in self._query(sql, params):
+            yield datetime.fromtimestamp(ts), line
+
+    def query_samples(self, names=None, start=None, end=None, types=None, limit=None):
+        """Yield (timestamp, type, name, value) for the given channels and time range"""
+        sql = "SELECT ts, type, name, value FROM samples"
+        where, params = self._time_clause(start, end)
+        clauses = [where[len(" WHERE "):]] if where else []
+        if names:
+            clauses.append(f"name IN ({','.join('?' * len(names))})")
+            params.extend(names)
+        if types:
+            clauses.append(f"type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for ts, data_type, name, value in self._query(sql, params):
+            yield datetime.fromtimestamp(ts), data_type, name, value
+
+    def get_names(self):
+        """Return the distinct channel names stored so far"""
+        return [row[0] for row in self._query("SELECT DISTINCT name FROM samples ORDER BY name", [])]
+
+    def _time_clause(self, start, end):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end.timestamp())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _query(self, sql, params):
+        if not os.path.exists(self.path):
+            return
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def export_samples_csv(self, filename, names=None, start=None, end=None, types=None):
+        """Stream stored samples straight into a CSV file"""
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['timestamp', 'type', 'name', 'value'])
+            for timestamp, data_type, name, value in self.query_samples(names, start, end, types):
+                writer.writerow([timestamp.isoformat(), data_type, name, value])
+
+    def get_statistics(self):
+        return {
+            'db_enabled': self.running,
+            'db_lines_written': self.lines_written,
+            'db_samples_written': self.samples_written,
+            'db_transactions': self.transactions
+        }
@@ -0,0 +1,177 @@
+import tkinter as tk
+import customtkinter as ctk
+
+import config
+from async_serial import create_serial_comm
+from scroll_pause import ScrollController
+from sequence_runner import SequenceRun
+from sequence_window import SequenceWindow
+
+
+class SessionTab:
+    """Terminal tab for one additional port session"""
+
+    def __init__(self, tabview, manager, name, port, baud, port_map, get_button_style, on_closed=None,
+                 cmd_manager=None):
+        self.tabview = tabview
+        self.manager = manager
+        self.name = name
+        self.port = port
+        self.baud = baud
+        self.on_closed = on_closed
+        self.cmd_manager = cmd_manager
+        self.sequence_runs = []
+
+        self.frame = tabview.add(name)
+        self.setup_ui()
+
+        self.serial_comm = create_serial_comm(None, None, self.connect_button, self.terminal,
+                                              port_map, get_button_style)
+        try:
+            self.session = manager.create(name, self.serial_comm)
+        except ValueError:
+            tabview.delete(name)
+            raise
+        # The scoped budget already applies SESSION_BUDGET_SCALE
+        self.scroll_controller = ScrollController(self.terminal, self.session.budget,
+                                                  config.TERMINAL_BUDGET)
+        self.terminal.append = self.scroll_controller.append
+        self.terminal.insertPlainText = self.scroll_controller.append
+        self.session.connect(port, baud)
+
+    def setup_ui(self):
+        terminal_frame = ctk.CTkFrame(self.frame, fg_color=config.BG_COLOR, border_width=0)
+        terminal_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        terminal_frame.grid_columnconfigure(0, weight=1)
+        terminal_frame.grid_rowconfigure(0, weight=1)
+
+        self.terminal = tk.Text(
+            terminal_frame,
+            bg=config.TERMINAL_BG,
+            fg=config.TERMINAL_FG,
+            font=("Courier", 10),
+            state="disabled",
+            bd=0,
+            highlightthickness=0,
+            wrap="none"
+        )
+        self.terminal.grid(row=0, column=0, sticky="nsew")
+        v_scroll = tk.Scrollbar(terminal_frame, orient="vertical", command=self.terminal.yview)
+        v_scroll.grid(row=0, column=1, sticky="ns")
+        self.terminal.config(yscrollcommand=v_scroll.set)
+        self.terminal.bind("<Button-1>", lambda e: self.scroll_controller.pause())
+        self.terminal.bind("<Button-3>", lambda e: self.scroll_controller.resume())
+
+        row = ctk.CTkFrame(self.frame, fg_color=config.BG_COLOR, border_width=0)
+        row.pack(fill="x", padx=10, pady=5)
+        self.message_input = ctk.CTkEntry(row, placeholder_text=f"Message to {self.name}",
+                                          font=config.DEFAULT_FONT)
+        self.message_input.pack(side="left", fill="x", expand=True, padx=5)
+        self.message_input.bind("<Return>", lambda e: self.send_message())
+        ctk.CTkButton(
+            row, text="Send", width=70, command=self.send_message,
+            fg_color=config.BUTTON_STYLES["green"][0],
+            hover_color=config.BUTTON_STYLES["green"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=5)
+
+        self.interval_entry = ctk.CTkEntry(row, width=70, placeholder_text="Interval ms",
+                                           font=config.DEFAULT_FONT)
+        self.interval_entry.insert(0, "1000")
+        self.interval_entry.pack(side="left", padx=5)
+        ctk.CTkButton(
+            row, text="Repeat", width=70, command=self.start_repeat,
+            fg_color=config.BUTTON_STYLES["blue"][0],
+            hover_color=config.BUTTON_STYLES["blue"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=2)
+        ctk.CTkButton(
+            row, text="Stop", width=60, command=lambda: self.manager.stop_repeats(self.name),
+            fg_color=config.BUTTON_STYLES["red"][0],
+            hover_color=config.BUTTON_STYLES["red"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=2)
+        if self.cmd_manager is not None:
+            ctk.CTkButton(
+                row, text="Sequences", width=90, command=self.open_sequences,
+                fg_color=config.BUTTON_STYLES["blue"][0],
+                hover_color=config.BUTTON_STYLES["blue"][1],
+                font=config.DEFAULT_FONT
+            ).pack(side="left", padx=2)
+
+        self.connect_button = ctk.CTkButton(
+            row, text="Disconnect", width=100, command=self.toggle_connection,
+            fg_color=config.BUTTON_STYLES["red"][0],
+            hover_color=config.BUTTON_STYLES["red"][1],
+            font=config.DEFAULT_FONT
+        )
+        self.connect_button.pack(side="left", padx=(15, 2))
+        ctk.CTkButton(
+            row, text="Close Tab", width=90, command=self.close,
+            fg_color=config.BUTTON_STYLES["red"][0],
+            hover_color=config.BUTTON_STYLES["red"][1],
+            font=config.DEFAULT_FONT
+        ).pack(side="left", padx=2)
+
+    def _message(self):
+        text = self.message_input.get().strip()
+        return text + "\r\n" if text else ""
+
+    def send_message(self):
+        message = self._message()
+        if message:
+            self.serial_comm.send_message(message)
+            self.message_input.delete(0, tk.END)
+
+    def start_repeat(self):
+        message = self._message()
+        if not message:
+            return
+        try:
+            interval = float(self.interval_entry.get()) / 1000.0
+        except ValueError:
+            interval = 1.0
+        try:
+            self.manager.repeat(self.name, message, interval)
+        except ValueError as e:
+            self.terminal.append(f"⚠ {e}\n")
+            return
+        self.terminal.append(f"🔁 Repeating '{message.strip()}' every {interval * 1000:g} ms\n")
+
+    def open_sequences(self):
+        SequenceWindow(self.frame.winfo_toplevel(), self.cmd_manager, self.run_sequence, self.stop_sequences)
+
+    def run_sequence(self, sequence):
+        """Start a sequence on its own thread against this tab's port"""
+        if not self.serial_comm.running:
+            return False
+        try:
+            run = SequenceRun(sequence, self.serial_comm, self.cmd_manager.get, self.on_sequence_event)
+        except ValueError as e:
+            self.terminal.append(f"⚠ Sequence '{sequence.name}': {e}\n")
+            return False
+        self.sequence_runs = [r for r in self.sequence_runs if r.status == "running"] + [run]
+        self.terminal.append(f"▶ [{sequence.name}] started\n")
+        run.start()
+        return True
+
+    def stop_sequences(self):
+        for run in self.sequence_runs:
+            run.cancel()
+
+    def on_sequence_event(self, run, text):
+        """Callback (sequence thread) with progress of a running sequence"""
+        self.terminal.after(0, lambda: self.terminal.append(f"▶ [{run.sequence.name}] {text}\n"))
+
+    def toggle_connection(self):
+        if self.serial_comm.running:
+            self.serial_comm.disconnect()
+        else:
+            self.session.connect(self.port, self.baud)
+
+    def close(self):
+        self.stop_sequences()
+        self.manager.close(self.name)
+        self.tabview.delete(self.name)
+        if self.on_closed:
+            self.on_closed(self)
@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+import select
+import asyncio
+import tempfile
+import threading
+
+import pytest
+
+termios = pytest.importorskip("termios")  # the asyncio backend is POSIX only
+
+# config creates its data folder under PROGRAMDATA at import time
+os.environ.setdefault("PROGRAMDATA", tempfile.mkdtemp())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_serial import AsyncIOLoop, AsyncSerialComm  # noqa: E402
+
+
+class FakeWidget:
+    """Stands in for the Tk terminal and connect button; records what the backend does"""
+
+    def __init__(self):
+        self.text = []
+        self.options = {}
+        self.threads = set()
+
+    def after(self, ms, callback):
+        callback()
+
+    def append(self, text):
+        self.threads.add(threading.get_ident())
+        self.text.append(text)
+
+    def insertPlainText(self, text):
+        self.threads.add(threading.get_ident())
+        self.text.append(text)
+
+    def configure(self, **options):
+        self.threads.add(threading.get_ident())
+        self.options.update(options)
+
+    @property
+    def contents(self):
+        return "".join(self.text)
+
+
+def wait_for(condition, io_loop=None, timeout=5.0):
+    """Poll `condition` (draining the UI queue like the Tk timer would) until true"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if io_loop is not None:
+            io_loop.drain_ui()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def read_master(fd, size, timeout=5.0):
+    data = b""
+    deadline = time.monotonic() + timeout
+    while len(data) < size and time.monotonic() < deadline:
+        ready, _, _ = select.select([fd], [], [], 0.05)
+        if ready:
+            data += os.read(fd, size - len(data))
+    return data
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = os.openpty()
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+@pytest.fixture
+def comm(pty_pair):
+    io_loop = AsyncIOLoop()
+    terminal = FakeWidget()
+    button = FakeWidget()
+    serial_comm = AsyncSerialComm(None, None, button, terminal, {},
+                                  lambda color: ("#00C800", "#009600"), io_loop=io_loop)
+    yield serial_comm, io_loop, terminal, button
+    serial_comm.disconnect()
+    io_loop.drain_ui()
+    # Let the cancelled writer task finish before the loop stops
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), io_loop.loop).result(2.0)
+    io_loop.loop.call_soon_threadsafe(io_loop.loop.stop)
+    io_loop.thread.join(2.0)
+
+
+def test_connect_and_disconnect(pty_pair, comm):
+    _, name = pty_pair
+    serial_comm, io_loop, terminal, button = comm
+
+    assert serial_comm.connect(name, 115200)
+    assert wait_for(lambda: "Connected to" in terminal.contents, io_loop)
+    assert button.options["text"] == "Disconnect"
+    assert serial_comm.running
+
+    serial_comm.disconnect()
+    assert wait_for(lambda: "Disconnected" in terminal.contents, io_loop)
+    assert button.options["text"] == "Connect"
+    assert not serial_comm.running
+
+
+def test_received_lines(pty_pair, comm):
+    master, name = pty_pair
+    serial_comm, io_loop, terminal, _ = comm
+    lines = []
+    serial_comm.add_line_callback(lambda batch, timestamp: lines.extend(batch))
+    assert serial_comm.connect(name, 115200)
+    assert wait_for(lambda: serial_comm.tx_task is not None)
+
+    os.write(master, b"hello\r\nwor")
+    os.write(master, b"ld\n")
+    assert wait_for(lambda: len(lines) == 2, io_loop)
+    assert lines == ["hello", "world"]
+    assert wait_for(lambda: "hello\r\nworld\n" in terminal.contents, io_loop)
+
+
+def test_send_message(pty_pair, comm):
+    master, name = pty_pair
+    serial_comm, io_loop, terminal, _ = comm
+    results = []
+    assert serial_comm.connect(name, 115200)
+    assert wait_for(lambda: serial_comm.tx_task is not None)
+
+    assert serial_comm.send_message("ping\r\n", callback=lambda request, error: results.append(error))
+    assert read_master(master, 6) == b"ping\r\n"
+    assert wait_for(lambda: results == [None])
+    assert wait_for(lambda: "➡ ping" in terminal.contents, io_loop)
+
+
+def test_ui_runs_on_draining_thread(pty_pair, comm):
+    master, name = pty_pair
+    serial_comm, io_loop, terminal, button = comm
+    assert serial_comm.connect(name, 115200)
+    assert wait_for(lambda: serial_comm.tx_task is not None)
+    os.write(master, b"data\n")
+
+    # Nothing reaches the widgets until the UI queue is drained
+    time.sleep(0.2)
+    assert terminal.text == [] and button.options == {}
+    assert wait_for(lambda: "data\n" in terminal.contents, io_loop)
+    assert terminal.threads | button.threads == {threading.get_ident()}
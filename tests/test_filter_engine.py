@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filter_engine import FilterEngine, split_terms  # noqa: E402
+
+
+def test_split_terms():
+    assert list(split_terms(" error, /warn(ing)?/ ,timeout,, ")) == [
+        ("error", False), ("warn(ing)?", True), ("timeout", False)]
+
+
+def test_regex_with_comma():
+    engine = FilterEngine.from_text("/x{1,3}y/, boot")
+    assert [rule.describe() for rule in engine.rules] == ["+/x{1,3}y/", "+boot"]
+    assert engine.matches("xxy")
+    assert engine.matches("booting")
+    assert not engine.matches("xxxxz")
+
+
+def test_exclude_regex_with_comma():
+    engine = FilterEngine.from_text("", "/^(a,b|c)$/")
+    assert not engine.matches("a,b")
+    assert engine.matches("a")
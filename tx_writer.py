@@ -0,0 +1,177 @@
+import time
+import queue
+import threading
+
+import serial
+
+import config
+
+
+class TxRequest:
+    """One queued write; `callback(request, error)` runs on the writer thread once written"""
+
+    __slots__ = ('data', 'label', 'callback', 'queued_at', 'written_at')
+
+    def __init__(self, data, label=None, callback=None):
+        self.data = data
+        self.label = label
+        self.callback = callback
+        self.queued_at = time.perf_counter()
+        self.written_at = None
+
+
+class TxWriter:
+    """
+    Owns the TX side of a serial port. send() only enqueues, so the Tk
+    thread never blocks on a slow or flow-controlled port; a writer
+    thread drains the bounded queue, optionally spacing bytes and
+    commands apart, and reports each completed write through its
+    callback. Counts bytes and messages sent per second.
+    """
+
+    def __init__(self, queue_size=config.TX_QUEUE_SIZE,
+                 inter_byte_delay=config.TX_INTER_BYTE_DELAY,
+                 inter_command_delay=config.TX_INTER_COMMAND_DELAY):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.inter_byte_delay = inter_byte_delay
+        self.inter_command_delay = inter_command_delay
+        self.port = None
+        self.running = False
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.next_write = 0.0
+
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.errors = 0
+        self.dropped = 0
+        self.bytes_per_second = 0.0
+        self.messages_per_second = 0.0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_messages = 0
+
+    def attach(self, port):
+        """Write to `port` (a serial.Serial), or None to fail queued writes"""
+        self.port = port
+
+    def set_pacing(self, inter_byte_delay, inter_command_delay):
+        self.inter_byte_delay = inter_byte_delay
+        self.inter_command_delay = inter_command_delay
+
+    def start(self):
+        """Start the writer thread; a no-op while it runs, so only one thread drains the queue"""
+        with self.thread_lock:
+            if self.thread and self.thread.is_alive():
+                if self.running:
+                    return
+                # Stopped but not exited yet (e.g. reconnecting right after a loss)
+                try:
+                    self.queue.put_nowait(None)
+                except queue.Full:
+                    pass
+                self.thread.join()
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop the writer thread; requests still queued complete with an error"""
+        self.running = False
+        self.cancel_pending("writer stopped")
+        try:
+            self.queue.put_nowait(None)  # wake the thread
+        except queue.Full:
+            pass
+
+    def send(self, data, label=None, callback=None):
+        """Queue bytes for writing; returns False (and counts a drop) if the queue is full"""
+        try:
+            self.queue.put_nowait(TxRequest(data, label, callback))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    @property
+    def pending(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        while self.running:
+            request = self.queue.get()
+            if request is None:
+                continue
+            if not self.running:
+                self._complete(request, "writer stopped")
+                return
+            delay = self.next_write - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._write(request.data)
+                request.written_at = time.perf_counter()
+                self._count(len(request.data))
+                error = None
+            except (serial.SerialException, OSError, AttributeError) as e:
+                self.errors += 1
+                error = str(e) or e.__class__.__name__
+            self.next_write = time.monotonic() + self.inter_command_delay
+            self._complete(request, error)
+
+    def _write(self, data):
+        port = self.port
+        if port is None or not port.is_open:
+            raise serial.SerialException("port is not open")
+        if self.inter_byte_delay <= 0:
+            port.write(data)
+            port.flush()
+            return
+        for i in range(len(data)):
+            port.write(data[i:i + 1])
+            port.flush()
+            time.sleep(self.inter_byte_delay)
+
+    def _complete(self, request, error):
+        if request.callback is None:
+            return
+        try:
+            request.callback(request, error)
+        except Exception as e:
+            print(f"TX callback error: {e}")
+
+    def cancel_pending(self, error="cancelled"):
+        """Complete every queued request with `error` without writing it"""
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                self._complete(request, error)
+
+    def _count(self, size):
+        self.bytes_sent += size
+        self.messages_sent += 1
+        self._window_bytes += size
+        self._window_messages += 1
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.bytes_per_second = self._window_bytes / elapsed
+            self.messages_per_second = self._window_messages / elapsed
+            self._window_start = now
+            self._window_bytes = 0
+            self._window_messages = 0
+
+    def get_statistics(self):
+        idle = time.monotonic() - self._window_start > 2.0
+        return {
+            'tx_bytes': self.bytes_sent,
+            'tx_messages': self.messages_sent,
+            'tx_errors': self.errors,
+            'tx_dropped': self.dropped,
+            'tx_pending': self.pending,
+            'tx_bytes_per_second': 0.0 if idle else self.bytes_per_second,
+            'tx_messages_per_second': 0.0 if idle else self.messages_per_second
+        }